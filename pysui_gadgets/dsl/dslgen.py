@@ -46,7 +46,11 @@ def main():
         parsed.excludes = set(parsed.excludes) if parsed.excludes else set()
         parsed.includes = set(parsed.includes) if parsed.includes else set()
         ir_builder = IRBuilder(
-            config=cfg, package=parsed.package_id, includes=parsed.includes, excludes=parsed.excludes
+            config=cfg,
+            package=parsed.package_id,
+            includes=parsed.includes,
+            excludes=parsed.excludes,
+            use_cache=not parsed.no_cache,
         )
         package_gen = PackageGen(
             package_ir=ir_builder.generate_ir(),
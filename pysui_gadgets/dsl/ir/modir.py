@@ -29,6 +29,7 @@ from pysui.sui.sui_txresults.package_meta import (
 )
 
 from pysui_gadgets.utils import filters
+from pysui_gadgets.utils.package_cache import PackageCache
 from pysui_gadgets.dsl.ir.ir_types import PackageIR, ModuleIR, FunctionIR, StructIR, FieldIR
 
 
@@ -81,7 +82,13 @@ class IRBuilder:
     """
 
     def __init__(
-        self, *, config: SuiConfig, package: ObjectID, includes: list[str] = None, excludes: list[str] = None
+        self,
+        *,
+        config: SuiConfig,
+        package: ObjectID,
+        includes: list[str] = None,
+        excludes: list[str] = None,
+        use_cache: bool = True,
     ) -> None:
         """__init__ Initialize the IR interpreter with SUI package metadata.
 
@@ -93,12 +100,14 @@ class IRBuilder:
         :type includes: list[str], optional
         :param excludes: List of module names to exclude from generation of DSL, defaults to None
         :type excludes: list[str], optional
+        :param use_cache: Use the on disk package metadata cache, defaults to True
+        :type use_cache: bool, optional
         :raises ValueError: If error interfacing with SUI blockchain
         """
         self.client: SuiClient = SuiClient(config)
         self.includes = includes
         self.excludes = excludes
-        getp_result = self.client.get_package(package_id=package)
+        getp_result = PackageCache(self.client, enabled=use_cache).get_package(package)
         if getp_result.is_ok():
             self.package_ir = Package(package, getp_result.result_data)
         else:
@@ -223,23 +232,19 @@ class IRBuilder:
         :return: True if successful
         :rtype: bool
         """
-        modules = self.package_ir.package.modules
-        if self.includes:
-            modules = filters.filter_include_modules(
-                mods=modules, includes=self.includes)
-        elif self.excludes:
-            modules = filters.filter_modules_excluding(
-                mods=modules, excludes=self.excludes)
-
+        query = (
+            filters.module_query(self.package_ir.package.modules, self.includes, self.excludes)
+            .functions(filters.is_entry())
+            .structs(filters.has_abilities("Key"))
+        )
         # Only get modules whose functions contain at least 1 entry point function
-        modules = list(filter(filters.mod_with_entry_points, modules.items()))
+        modules = list(query.with_functions().iter_modules())
         # We want all Key StructIR with FieldIRs
         # Getting those first so that function args may reference by ir struct class
         for mod_name, mod_def in modules:
-            self._struct_ir(
-                mod_name, filters.filter_key_structs(mod_def.structs))
+            self._struct_ir(mod_name, query.structs_of(mod_def))
         # We want all entry point only FunctionIR with FieldIRs
         for mod_name, mod_def in modules:
-            self._func_ir(mod_name, filters.filter_entry_points(mod_def))
+            self._func_ir(mod_name, query.functions_of(mod_def))
         # print(self.package_ir.package_data)
         return self.package_ir.package_data
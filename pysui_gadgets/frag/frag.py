@@ -0,0 +1,170 @@
+#    Copyright Frank V. Castellucci
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+# -*- coding: utf-8 -*-
+
+"""Frag - Coin fragmentation report across addresses."""
+
+import sys
+import bisect
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
+from dataclasses_json import DataClassJsonMixin
+from pysui import SuiConfig, SyncClient, SuiAddress
+from pysui.sui.sui_types.scalars import SuiString
+
+from pysui_gadgets.utils.cmdlines import frag_parser
+
+_PERCENTILES: list[int] = [10, 25, 50, 75, 90, 99]
+
+
+@dataclass
+class FragReport(DataClassJsonMixin):
+    """Fragmentation statistics of one address's coins."""
+
+    address: str
+    coin_count: int = 0
+    total_balance: int = 0
+    dust_count: int = 0
+    dust_balance: int = 0
+    min_balance: int = 0
+    max_balance: int = 0
+    mean_balance: float = 0.0
+    percentiles: dict[str, int] = field(default_factory=dict)
+    projected_transactions: int = 0
+    error: Optional[str] = None
+
+    @classmethod
+    def from_balances(cls, address: str, balances: list[int], dust: int, merge_threshold: int) -> "FragReport":
+        """Compute statistics from coin balances.
+
+        :param address: The owning address
+        :type address: str
+        :param balances: Balance of every coin
+        :type balances: list[int]
+        :param dust: Balances strictly below this are dust
+        :type dust: int
+        :param merge_threshold: Coins merged per transaction when projecting a to-one run
+        :type merge_threshold: int
+        :return: The report
+        :rtype: FragReport
+        """
+        report = cls(address)
+        if not balances:
+            return report
+        balances = sorted(balances)
+        count = len(balances)
+        dust_count = bisect.bisect_left(balances, dust)
+        report.coin_count = count
+        report.total_balance = sum(balances)
+        report.dust_count = dust_count
+        report.dust_balance = sum(balances[:dust_count])
+        report.min_balance = balances[0]
+        report.max_balance = balances[-1]
+        report.mean_balance = report.total_balance / count
+        # Nearest rank percentiles over the sorted balances
+        report.percentiles = {f"p{x}": balances[max(0, math.ceil(x / 100 * count) - 1)] for x in _PERCENTILES}
+        report.projected_transactions = math.ceil((count - 1) / max(1, merge_threshold))
+        return report
+
+
+def _address_report(
+    client: SyncClient, address: SuiAddress, coin_type: str, dust: int, merge_threshold: int
+) -> FragReport:
+    """Fetch all coins of coin_type for address and summarize."""
+    result = client.get_coin(SuiString(coin_type), address, True)
+    if not result.is_ok():
+        return FragReport(address.address, error=str(result.result_string))
+    balances = [int(x.balance) for x in result.result_data.data]
+    return FragReport.from_balances(address.address, balances, dust, merge_threshold)
+
+
+def frag_reports(
+    client: SyncClient,
+    addresses: list[SuiAddress],
+    coin_type: str,
+    dust: int,
+    merge_threshold: int,
+    workers: Optional[int] = None,
+) -> list[FragReport]:
+    """Concurrently fetch coins for each address and report fragmentation.
+
+    :param client: The client to fetch with
+    :type client: SyncClient
+    :param addresses: The addresses to report on
+    :type addresses: list[SuiAddress]
+    :param coin_type: The coin type to report on
+    :type coin_type: str
+    :param dust: Balances strictly below this are dust
+    :type dust: int
+    :param merge_threshold: Coins merged per transaction when projecting a to-one run
+    :type merge_threshold: int
+    :param workers: Maximum concurrent fetches, defaults to None
+    :type workers: Optional[int], optional
+    :return: A report per address, in address order
+    :rtype: list[FragReport]
+    """
+    with ThreadPoolExecutor(max_workers=max(1, workers) if workers is not None else None) as executor:
+        return list(
+            executor.map(lambda x: _address_report(client, x, coin_type, dust, merge_threshold), addresses)
+        )
+
+
+def _print_reports(reports: list[FragReport]):
+    """Print reports as a table."""
+    header = f"{'Address':<66} {'Coins':>8} {'Dust':>8} {'p10':>14} {'p50':>14} {'p90':>14} {'Txns':>6}"
+    print(header)
+    print("-" * len(header))
+    for report in reports:
+        if report.error:
+            print(f"{report.address:<66} {report.error}")
+            continue
+        pct = report.percentiles
+        print(
+            f"{report.address:<66} {report.coin_count:>8} {report.dust_count:>8} "
+            f"{pct.get('p10', 0):>14} {pct.get('p50', 0):>14} {pct.get('p90', 0):>14} "
+            f"{report.projected_transactions:>6}"
+        )
+    print("-" * len(header))
+    print(
+        f"{'Total':<66} {sum(x.coin_count for x in reports):>8} {sum(x.dust_count for x in reports):>8} "
+        f"{'':>14} {'':>14} {'':>14} {sum(x.projected_transactions for x in reports):>6}"
+    )
+
+
+def main():
+    """Main entry point."""
+    arg_line = sys.argv[1:].copy()
+    cfg_file = False
+    # Handle a different client.yaml other than default
+    if arg_line and arg_line[0] == "--local":
+        cfg_file = True
+        arg_line = arg_line[1:]
+    parsed = frag_parser(arg_line)
+    if cfg_file:
+        cfg = SuiConfig.sui_base_config()
+    else:
+        cfg = SuiConfig.default_config()
+    client = SyncClient(cfg)
+    addresses = parsed.addresses or [SuiAddress(x) for x in cfg.addresses]
+    reports = frag_reports(client, addresses, parsed.coin_type, parsed.dust, parsed.merge_threshold, parsed.workers)
+    if parsed.json:
+        print(json.dumps([x.to_dict() for x in reports], indent=2))
+    else:
+        _print_reports(reports)
+
+
+if __name__ == "__main__":
+    main()
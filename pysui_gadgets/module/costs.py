@@ -0,0 +1,214 @@
+#    Copyright  Frank V. Castellucci
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+# -*- coding: utf-8 -*-
+
+"""pysui_gadgets: Static cost profile of Move functions.
+
+Every instruction of a function is weighed by its opcode class, and instructions
+inside a loop, the range between a backward branch and its target, weigh
+_LOOP_FACTOR times more. The estimate ranks functions against each other, it is
+not a gas prediction.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from pysui.sui_move.model.common_types import OpCode
+
+from pysui_gadgets.module.xref import handle_keys
+
+# Opcode class and weight of every instruction
+_CLASSES: dict[str, tuple[int, tuple[OpCode, ...]]] = {
+    "load": (
+        1,
+        (
+            OpCode.LdU8,
+            OpCode.LdU16,
+            OpCode.LdU32,
+            OpCode.LdU64,
+            OpCode.LdU128,
+            OpCode.LdU256,
+            OpCode.LdConst,
+            OpCode.LdTrue,
+            OpCode.LdFalse,
+        ),
+    ),
+    "local": (
+        1,
+        (OpCode.CopyLoc, OpCode.MoveLoc, OpCode.StLoc, OpCode.MutBorrowLoc, OpCode.ImmBorrowLoc),
+    ),
+    "arithmetic": (
+        1,
+        (
+            OpCode.Add,
+            OpCode.Sub,
+            OpCode.Mul,
+            OpCode.Mod,
+            OpCode.Div,
+            OpCode.BitOr,
+            OpCode.BitAnd,
+            OpCode.Xor,
+            OpCode.Or,
+            OpCode.And,
+            OpCode.Not,
+            OpCode.Eq,
+            OpCode.Neq,
+            OpCode.Lt,
+            OpCode.Gt,
+            OpCode.Le,
+            OpCode.Ge,
+            OpCode.Shl,
+            OpCode.Shr,
+            OpCode.CastU8,
+            OpCode.CastU16,
+            OpCode.CastU32,
+            OpCode.CastU64,
+            OpCode.CastU128,
+            OpCode.CastU256,
+        ),
+    ),
+    "control": (
+        1,
+        (OpCode.BrTrue, OpCode.BrFalse, OpCode.Branch, OpCode.Ret, OpCode.Abort, OpCode.Pop, OpCode.Nop),
+    ),
+    "reference": (
+        2,
+        (
+            OpCode.ReadRef,
+            OpCode.WriteRef,
+            OpCode.FreezeRef,
+            OpCode.MutBorrowField,
+            OpCode.ImmBorrowField,
+            OpCode.MutBorrowFieldGeneric,
+            OpCode.ImmBorrowFieldGeneric,
+        ),
+    ),
+    "struct": (3, (OpCode.Pack, OpCode.Unpack, OpCode.PackGeneric, OpCode.UnpackGeneric)),
+    "vector": (
+        4,
+        (
+            OpCode.VecPack,
+            OpCode.VecLen,
+            OpCode.VecImmBorrow,
+            OpCode.VecMutBorrow,
+            OpCode.VecPushBack,
+            OpCode.VecPopBack,
+            OpCode.VecUnpack,
+            OpCode.VecSwap,
+        ),
+    ),
+    "call": (8, (OpCode.Call, OpCode.CallGeneric)),
+    "global": (
+        10,
+        (
+            OpCode.Exists,
+            OpCode.ExistsGeneric,
+            OpCode.MutBorrowGlobal,
+            OpCode.MutBorrowGlobalGeneric,
+            OpCode.ImmBorrowGlobal,
+            OpCode.ImmBorrowGlobalGeneric,
+            OpCode.MoveFrom,
+            OpCode.MoveFromGeneric,
+            OpCode.MoveTo,
+            OpCode.MoveToGeneric,
+        ),
+    ),
+}
+_OPCODE_CLASS: dict[OpCode, tuple[str, int]] = {op: (x, y[0]) for x, y in _CLASSES.items() for op in y[1]}
+_BRANCHES: frozenset = frozenset({OpCode.BrTrue, OpCode.BrFalse, OpCode.Branch})
+# Weight multiplier of instructions inside a loop
+_LOOP_FACTOR: int = 10
+
+
+@dataclass
+class FunctionProfile:
+    """Static measures of one function's bytecode."""
+
+    function: str
+    instructions: int = 0
+    classes: dict[str, int] = field(default_factory=dict)
+    loops: int = 0
+    fan_out: int = 0
+    cost: int = 0
+
+
+@dataclass
+class ModuleProfile:
+    """Table sizes and function profiles of one module."""
+
+    module: str
+    table_sizes: dict[str, int]
+    functions: list[FunctionProfile] = field(default_factory=list)
+
+
+def _function_profile(
+    key: str, code: list[tuple[OpCode, list]], function_keys: list[str], insts: list[str]
+) -> FunctionProfile:
+    """Profile of one function's instructions."""
+    profile = FunctionProfile(key, len(code))
+    in_loop = bytearray(len(code))
+    callees: set[str] = set()
+    for position, (opcode, operand) in enumerate(code):
+        kind = _OPCODE_CLASS.get(opcode, ("other", 1))[0]
+        profile.classes[kind] = profile.classes.get(kind, 0) + 1
+        if opcode in _BRANCHES and operand[0] <= position:
+            profile.loops += 1
+            in_loop[operand[0] : position + 1] = b"\x01" * (position + 1 - operand[0])
+        elif opcode == OpCode.Call:
+            callees.add(function_keys[operand[0]])
+        elif opcode == OpCode.CallGeneric:
+            callees.add(insts[operand[0]])
+    profile.fan_out = len(callees)
+    profile.cost = sum(
+        _OPCODE_CLASS.get(opcode, ("other", 1))[1] * (_LOOP_FACTOR if in_loop[position] else 1)
+        for position, (opcode, _operand) in enumerate(code)
+    )
+    return profile
+
+
+def module_profile(raw_tables: Any) -> ModuleProfile:
+    """module_profile Profile every function of a module.
+
+    :param raw_tables: LazyModuleContent of the module, for the table sizes
+    :type raw_tables: Any
+    :return: Module table sizes and its functions' profiles
+    :rtype: ModuleProfile
+    """
+    module_keys, function_keys, _struct_keys = handle_keys(raw_tables)
+    insts = [function_keys[x.function_handle_index] for x in raw_tables.function_instantiations or []]
+    profile = ModuleProfile(module_keys[raw_tables.module_self], raw_tables.table_sizes())
+    for func_def in raw_tables.function_definitions or []:
+        code = func_def.code_units[1] if func_def.code_units else []
+        profile.functions.append(
+            _function_profile(function_keys[func_def.function_handle_index], code, function_keys, insts)
+        )
+    return profile
+
+
+def print_profiles(profiles: list[ModuleProfile], limit: int) -> None:
+    """print_profiles Prints functions ranked by estimated cost and module table sizes.
+
+    :param profiles: Profiles of the modules
+    :type profiles: list[ModuleProfile]
+    :param limit: Most costly functions shown, 0 for all
+    :type limit: int
+    """
+    ranked = sorted((y for x in profiles for y in x.functions), key=lambda x: x.cost, reverse=True)
+    print(f"{'cost':>8} {'instrs':>7} {'loops':>5} {'calls':>5}  function")
+    for func in ranked[:limit] if limit else ranked:
+        print(f"{func.cost:>8} {func.instructions:>7} {func.loops:>5} {func.fan_out:>5}  {func.function}")
+        print(f"{'':>30}{', '.join(f'{x} {y}' for x, y in sorted(func.classes.items()))}")
+    for mod in profiles:
+        code = sum(x.instructions for x in mod.functions)
+        tables = ", ".join(f"{x} {y}" for x, y in mod.table_sizes.items() if y)
+        print(f"\nModule {mod.module}: {len(mod.functions)} functions, {code} instructions")
+        print(f"    table bytes: {tables}")
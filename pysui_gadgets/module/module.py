@@ -14,13 +14,26 @@
 """pysui_gadgets: Module deserialize and analyze *.mv files."""
 
 import sys
+from dataclasses import dataclass
 from pathlib import Path
-from typing import get_type_hints
+from typing import Any, Optional, Union
 from pysui import SuiConfig, SyncClient, ObjectID
 from pysui.sui.sui_utils import publish_build, CompiledPackage
 from pysui.sui.sui_builders.get_builders import GetObject
-from pysui.sui_move.module.deserialize import from_base64, RawModuleContent
+from pysui.sui_move.module.deserialize import RawModuleContent
+from pysui_gadgets.utils.bytecode import (
+    BuildCache,
+    LazyModuleContent,
+    ModuleCache,
+    ModuleSource,
+    base64_modules,
+    build_modules,
+    deserialize_modules,
+)
+from pysui_gadgets.module.costs import module_profile, print_profiles
+from pysui_gadgets.module.xref import CrossReference, module_references, print_cross_reference
 from pysui_gadgets.utils.cmdlines import module_parser
+from pysui_gadgets.utils.filters import name_matches
 
 
 def _project_to_base64(project_path: Path) -> list[str]:
@@ -31,7 +44,7 @@ def _project_to_base64(project_path: Path) -> list[str]:
     :return: The base64 encoded string of the core module of project
     :rtype: str
     """
-    package: CompiledPackage = publish_build(project_path)
+    package: CompiledPackage = publish_build(project_path, [])
     return [x.value for x in package.compiled_modules]
 
 
@@ -60,7 +73,7 @@ def _address_to_base64(package_object: ObjectID, config: SuiConfig) -> list[str]
 class Module:
     """."""
 
-    def __init__(self, raw_tables: RawModuleContent, mod_index: int):
+    def __init__(self, raw_tables: Union[RawModuleContent, LazyModuleContent], mod_index: int):
         """."""
         _handle = raw_tables.module_handles[mod_index]
         self.name = raw_tables.identifiers[_handle.identifier_index].identifier
@@ -71,32 +84,65 @@ class Module:
         return f"Module(name:'{self.name}', package_address:{self.package_address})"
 
 
-def tables_summary(raw_tables: RawModuleContent):
+def resolve_modules(raw_tables: Union[RawModuleContent, LazyModuleContent]) -> list[Module]:
     """."""
-    for field_name, _field_type in get_type_hints(raw_tables).items():
-        infield = getattr(raw_tables, field_name)
-        if isinstance(infield, list):
-            print(f"Table: '{field_name}' entries = {len(infield)}")
-        else:
-            print(f"Field: '{field_name}' = {infield}")
+    return [Module(raw_tables, mod_index) for mod_index in range(len(raw_tables.module_handles))]
 
 
-def resolve_modules(raw_tables: RawModuleContent) -> list[Module]:
-    """."""
-    return [Module(raw_tables, mod_index) for mod_index in range(len(raw_tables.module_handles))]
+@dataclass
+class ModuleSummary:
+    """Compact summary of a module's tables, cheap to return from worker processes."""
+
+    module: Module
+    fields: dict[str, Any]
+    tables: dict[str, int]
+    modules: list[Module]
+
 
+def summarize(raw_tables: LazyModuleContent) -> ModuleSummary:
+    """summarize Reduce a module's tables to their summary.
 
-def _deserialize(modules_b64: list[str]) -> list[RawModuleContent]:
+    Only the identifier, address and module handle tables are decoded, table sizes
+    come from the table directory.
+
+    :param raw_tables: The lazily read module tables
+    :type raw_tables: LazyModuleContent
+    :return: The module, its scalar fields, table byte sizes and referenced modules
+    :rtype: ModuleSummary
+    """
+    fields = {x: getattr(raw_tables, x) for x in ("magic", "version", "module_self")}
+    return ModuleSummary(Module(raw_tables, 0), fields, raw_tables.table_sizes(), resolve_modules(raw_tables))
+
+
+def tables_summary(summary: ModuleSummary):
+    """."""
+    for field_name, infield in summary.fields.items():
+        print(f"Field: '{field_name}' = {infield}")
+    for field_name, size in summary.tables.items():
+        print(f"Table: '{field_name}' bytes = {size}")
+
+
+def _deserialize(
+    modules: list[ModuleSource],
+    includes: Optional[list[str]] = None,
+    workers: Optional[int] = None,
+    use_cache: bool = True,
+) -> list[ModuleSummary]:
     """."""
-    # return [from_base64(x) for x in modules_b64]
-    mod_tables: list[RawModuleContent] = [from_base64(x) for x in modules_b64]
-    for mtable in mod_tables:
-        print(Module(mtable, 0))
-    for mtable in mod_tables:
-        tables_summary(mtable)
+    summaries: list[ModuleSummary] = deserialize_modules(
+        modules, workers, form=None, analyze=summarize, cache=ModuleCache(enabled=use_cache)
+    )
+    if includes:
+        wanted = name_matches(*includes)
+        summaries = [x for x in summaries if wanted(x.module.name, x)]
+    for summary in summaries:
+        print(summary.module)
+    for summary in summaries:
+        tables_summary(summary)
         print()
-        for mod in resolve_modules(mtable):
+        for mod in summary.modules:
             print(mod)
+    return summaries
 
 
 def main():
@@ -110,17 +156,43 @@ def main():
 
     parsed = module_parser(arg_line)
     print(parsed)
-    if parsed.prj_folder:
+    if parsed.build_dir:
+        print(f"Reading from {parsed.build_dir}")
+        modules: list[ModuleSource] = build_modules(parsed.build_dir, parsed.dependencies)
+    elif parsed.prj_folder:
         print(f"Fetching from {parsed.prj_folder}")
-        b64_str = _project_to_base64(parsed.prj_folder)
+        modules = base64_modules(BuildCache(enabled=not parsed.no_cache).modules(parsed.prj_folder, _project_to_base64))
     elif parsed.chn_package:
         if cfg_file:
             cfg = SuiConfig.sui_base_config()
         else:
             cfg = SuiConfig.default_config()
-        print(f"Fetching from {parsed.chn_package.value}")
-        b64_str = _address_to_base64(parsed.chn_package, cfg)
-    _deserialize(b64_str)
+        modules = []
+        for package_id in parsed.chn_package:
+            print(f"Fetching from {package_id.value}")
+            modules.extend(base64_modules(_address_to_base64(package_id, cfg)))
+    if parsed.profile is not None:
+        profiles = deserialize_modules(
+            modules, parsed.workers, form=None, analyze=module_profile, cache=ModuleCache(enabled=not parsed.no_cache)
+        )
+        if parsed.includes:
+            wanted = name_matches(*parsed.includes)
+            profiles = [x for x in profiles if wanted(x.module.rsplit("::", 1)[1], x)]
+        print_profiles(profiles, parsed.profile)
+        return
+    if parsed.xref:
+        xref = CrossReference(
+            deserialize_modules(
+                modules,
+                parsed.workers,
+                form=None,
+                analyze=module_references,
+                cache=ModuleCache(enabled=not parsed.no_cache),
+            )
+        )
+        print_cross_reference(xref, parsed.xref, parsed.includes)
+        return
+    _deserialize(modules, parsed.includes, parsed.workers, not parsed.no_cache)
 
 
 if __name__ == "__main__":
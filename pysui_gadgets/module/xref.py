@@ -0,0 +1,279 @@
+#    Copyright  Frank V. Castellucci
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+# -*- coding: utf-8 -*-
+
+"""pysui_gadgets: Bytecode cross reference and call graph.
+
+Each module's instruction streams are reduced, in the deserializing workers, to
+the functions it defines, the functions each one calls and the structs each one
+packs, unpacks or borrows. Those are merged across modules into an index where
+functions and structs are interned to integer ids and edges are held in array
+backed adjacency tables, in both directions.
+"""
+
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional
+
+from pysui.sui_move.model.common_types import OpCode
+
+from pysui_gadgets.utils.addresses import short_address
+from pysui_gadgets.utils.filters import Predicate, name_matches
+
+# Instructions whose operand is a struct definition index
+_STRUCT_OPS: frozenset = frozenset(
+    {
+        OpCode.Pack,
+        OpCode.Unpack,
+        OpCode.Exists,
+        OpCode.MutBorrowGlobal,
+        OpCode.ImmBorrowGlobal,
+        OpCode.MoveFrom,
+        OpCode.MoveTo,
+    }
+)
+# Instructions whose operand is a struct instantiation index
+_STRUCT_GENERIC_OPS: frozenset = frozenset(
+    {
+        OpCode.PackGeneric,
+        OpCode.UnpackGeneric,
+        OpCode.ExistsGeneric,
+        OpCode.MutBorrowGlobalGeneric,
+        OpCode.ImmBorrowGlobalGeneric,
+        OpCode.MoveFromGeneric,
+        OpCode.MoveToGeneric,
+    }
+)
+# Instructions whose operand is a field handle, or field instantiation, index
+_FIELD_OPS: frozenset = frozenset({OpCode.MutBorrowField, OpCode.ImmBorrowField})
+_FIELD_GENERIC_OPS: frozenset = frozenset({OpCode.MutBorrowFieldGeneric, OpCode.ImmBorrowFieldGeneric})
+
+
+def handle_keys(raw_tables: Any) -> tuple[list[str], list[str], list[str]]:
+    """Keys of a module's module, function and struct handles.
+
+    :param raw_tables: RawModuleContent or LazyModuleContent of the module
+    :type raw_tables: Any
+    :return: address::module keys of module handles, address::module::name keys of function and struct handles
+    :rtype: tuple[list[str], list[str], list[str]]
+    """
+    identifiers = raw_tables.identifiers
+    addresses = raw_tables.addresses
+    module_keys = [
+        f"{short_address(addresses[x.address_index].address)}::{identifiers[x.identifier_index].identifier}"
+        for x in raw_tables.module_handles
+    ]
+
+    def _handle_key(handle: Any) -> str:
+        return f"{module_keys[handle.module_handle_index]}::{identifiers[handle.identifier_index].identifier}"
+
+    return (
+        module_keys,
+        [_handle_key(x) for x in raw_tables.function_handles or []],
+        [_handle_key(x) for x in raw_tables.structure_handles or []],
+    )
+
+
+@dataclass
+class ModuleReferences:
+    """Functions of one module with the functions they call and the structs they access."""
+
+    module: str
+    functions: list[str] = field(default_factory=list)
+    calls: list[tuple[int, str]] = field(default_factory=list)
+    touches: list[tuple[int, str]] = field(default_factory=list)
+
+
+def module_references(raw_tables: Any) -> ModuleReferences:
+    """module_references Reduce a module's bytecode to its call and struct references.
+
+    Signatures and constants are not needed, so lazily read tables skip them.
+
+    :param raw_tables: RawModuleContent or LazyModuleContent of the module
+    :type raw_tables: Any
+    :return: Functions as address::module::name keys, calls and struct accesses by function position
+    :rtype: ModuleReferences
+    """
+    module_keys, function_keys, struct_keys = handle_keys(raw_tables)
+    struct_defs = [struct_keys[x.struct_handle_index] for x in raw_tables.structure_definitions or []]
+    # Instantiations and field handles refer to the struct definition index
+    struct_insts = [struct_defs[x.struct_handle_index] for x in raw_tables.structure_instantiations or []]
+    field_owners = [struct_defs[x.structure_definition_index] for x in raw_tables.field_handles or []]
+    field_insts = [field_owners[x.field_handle_index] for x in raw_tables.field_instantiations or []]
+    function_insts = [function_keys[x.function_handle_index] for x in raw_tables.function_instantiations or []]
+
+    refs = ModuleReferences(module_keys[raw_tables.module_self])
+    for position, func_def in enumerate(raw_tables.function_definitions or []):
+        refs.functions.append(function_keys[func_def.function_handle_index])
+        calls: dict[str, None] = {}
+        touches: dict[str, None] = {}
+        for opcode, operand in func_def.code_units[1] if func_def.code_units else []:
+            if opcode == OpCode.Call:
+                calls[function_keys[operand[0]]] = None
+            elif opcode == OpCode.CallGeneric:
+                calls[function_insts[operand[0]]] = None
+            elif opcode in _STRUCT_OPS:
+                touches[struct_defs[operand[0]]] = None
+            elif opcode in _STRUCT_GENERIC_OPS:
+                touches[struct_insts[operand[0]]] = None
+            elif opcode in _FIELD_OPS:
+                touches[field_owners[operand[0]]] = None
+            elif opcode in _FIELD_GENERIC_OPS:
+                touches[field_insts[operand[0]]] = None
+        refs.calls.extend((position, x) for x in calls)
+        refs.touches.extend((position, x) for x in touches)
+    return refs
+
+
+class _Adjacency:
+    """Compressed sparse rows of integer edges, a row of targets per source id."""
+
+    def __init__(self, size: int, edges: list[tuple[int, int]]):
+        """Build from (source, target) pairs over source ids below size."""
+        self.offsets = array("I", [0] * (size + 1))
+        for source, _target in edges:
+            self.offsets[source + 1] += 1
+        for index in range(size):
+            self.offsets[index + 1] += self.offsets[index]
+        self.targets = array("I", [0] * len(edges))
+        fill = array("I", self.offsets[:-1])
+        for source, target in edges:
+            self.targets[fill[source]] = target
+            fill[source] += 1
+
+    def row(self, source: int) -> array:
+        """Targets of source."""
+        return self.targets[self.offsets[source] : self.offsets[source + 1]]
+
+
+class CrossReference:
+    """Call graph and struct access index across modules."""
+
+    def __init__(self, modules: list[ModuleReferences]):
+        """Intern the modules' functions and structs and build the adjacency tables.
+
+        :param modules: References of every module, including dependencies to resolve calls into them
+        :type modules: list[ModuleReferences]
+        """
+        self.functions: list[str] = []
+        self.structs: list[str] = []
+        self._function_ids: dict[str, int] = {}
+        self._struct_ids: dict[str, int] = {}
+        self.defined = bytearray()
+        calls: list[tuple[int, int]] = []
+        touches: list[tuple[int, int]] = []
+        for mod in modules:
+            ids = [self._function_id(x) for x in mod.functions]
+            for x in ids:
+                self.defined[x] = 1
+            calls.extend((ids[x], self._function_id(y)) for x, y in mod.calls)
+            touches.extend((ids[x], self._struct_id(y)) for x, y in mod.touches)
+        self._callees = _Adjacency(len(self.functions), calls)
+        self._callers = _Adjacency(len(self.functions), [(y, x) for x, y in calls])
+        self._touches = _Adjacency(len(self.functions), touches)
+        self._touched_by = _Adjacency(len(self.structs), [(y, x) for x, y in touches])
+
+    def _function_id(self, key: str) -> int:
+        """Id of a function key, interned on first sight."""
+        fid = self._function_ids.get(key)
+        if fid is None:
+            fid = self._function_ids[key] = len(self.functions)
+            self.functions.append(key)
+            self.defined.append(0)
+        return fid
+
+    def _struct_id(self, key: str) -> int:
+        """Id of a struct key, interned on first sight."""
+        sid = self._struct_ids.get(key)
+        if sid is None:
+            sid = self._struct_ids[key] = len(self.structs)
+            self.structs.append(key)
+        return sid
+
+    def callees(self, function: str) -> list[str]:
+        """Functions called by function.
+
+        :param function: The address::module::name key
+        :type function: str
+        :return: Called function keys
+        :rtype: list[str]
+        """
+        return [self.functions[x] for x in self._callees.row(self._function_ids[function])]
+
+    def callers(self, function: str) -> list[str]:
+        """Functions calling function."""
+        return [self.functions[x] for x in self._callers.row(self._function_ids[function])]
+
+    def structs_touched(self, function: str) -> list[str]:
+        """Structs function packs, unpacks or borrows."""
+        return [self.structs[x] for x in self._touches.row(self._function_ids[function])]
+
+    def functions_touching(self, struct: str) -> list[str]:
+        """Functions packing, unpacking or borrowing struct."""
+        return [self.functions[x] for x in self._touched_by.row(self._struct_ids[struct])]
+
+    def reachable(self, function: str) -> list[str]:
+        """Every function transitively called by function, breadth first.
+
+        :param function: The address::module::name key
+        :type function: str
+        :return: Reachable function keys, excluding function unless it is recursive
+        :rtype: list[str]
+        """
+        seen = bytearray(len(self.functions))
+        order: list[int] = []
+        pending = deque(self._callees.row(self._function_ids[function]))
+        while pending:
+            fid = pending.popleft()
+            if not seen[fid]:
+                seen[fid] = 1
+                order.append(fid)
+                pending.extend(self._callees.row(fid))
+        return [self.functions[x] for x in order]
+
+    def matching_functions(self, match: Callable[[str], Any]) -> Iterator[str]:
+        """Function keys, defined in the indexed modules, that match."""
+        return (x for i, x in enumerate(self.functions) if self.defined[i] and match(x))
+
+    def matching_structs(self, match: Callable[[str], Any]) -> Iterator[str]:
+        """Accessed struct keys that match."""
+        return (x for x in self.structs if match(x))
+
+
+def print_cross_reference(xref: CrossReference, pattern: str, modules: Optional[list[str]] = None) -> None:
+    """print_cross_reference Prints calls and struct accesses of matching functions and structs.
+
+    :param xref: The index
+    :type xref: CrossReference
+    :param pattern: Glob pattern matched against address::module::name keys
+    :type pattern: str
+    :param modules: Only print functions and structs of modules with these names, glob patterns allowed,
+        defaults to all
+    :type modules: Optional[list[str]], optional
+    """
+    matches = name_matches(pattern)
+    if modules:
+        in_modules = name_matches(*modules)
+        matches = matches & Predicate(lambda n, d: in_modules(n.split("::")[1], d))
+    for key in xref.matching_functions(lambda x: matches(x, None)):
+        print(f"\nFunction {key}")
+        for label, keys in (
+            ("calls", xref.callees(key)),
+            ("called by", xref.callers(key)),
+            ("accesses", xref.structs_touched(key)),
+        ):
+            if keys:
+                print(f"    {label}: {', '.join(keys)}")
+    for key in xref.matching_structs(lambda x: matches(x, None)):
+        print(f"\nStruct {key}")
+        print(f"    accessed by: {', '.join(xref.functions_touching(key))}")
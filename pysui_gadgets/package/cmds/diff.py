@@ -0,0 +1,127 @@
+#    Copyright  Frank V. Castellucci
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+# -*- coding: utf-8 -*-
+
+"""Package ABI diff commands and utilities.
+
+Every exposed function and struct is reduced to a hash of its canonical JSON,
+with references to the package's own types made address independent, so an
+upgrade (new package id, same original types) only differs where the ABI does.
+"""
+
+import hashlib
+import json
+from argparse import Namespace
+from dataclasses import dataclass, field
+from typing import Any
+
+from dataclasses_json import DataClassJsonMixin
+
+from pysui_gadgets.package.cmds.render import SignatureRenderer
+from pysui_gadgets.utils.addresses import short_address
+
+# Stand in for the package's own address in canonical forms
+_SELF: str = "self"
+
+
+def _self_relative(value: Any, self_address: str) -> Any:
+    """Copy of a normalized value with struct addresses of self_address replaced."""
+    if isinstance(value, dict):
+        relative = {x: _self_relative(y, self_address) for x, y in value.items()}
+        if isinstance(relative.get("address"), str) and short_address(relative["address"]) == self_address:
+            relative["address"] = _SELF
+        return relative
+    if isinstance(value, list):
+        return [_self_relative(x, self_address) for x in value]
+    return value
+
+
+def abi_hashes(modules: dict, renderer: SignatureRenderer) -> dict[str, tuple[str, str]]:
+    """Hash and rendered signature of every exposed function and struct of a package.
+
+    :param modules: Normalized package modules
+    :type modules: dict
+    :param renderer: Renders the signatures
+    :type renderer: SignatureRenderer
+    :return: 'module::name' keys (functions suffixed '()') to (hash, signature)
+    :rtype: dict[str, tuple[str, str]]
+    """
+    hashes: dict[str, tuple[str, str]] = {}
+    for module_name, module in modules.items():
+        self_address = short_address(module.get("address", "0x0"))
+        items = [
+            (f"{module_name}::{x}()", x, y, renderer.function_signature) for x, y in module["exposedFunctions"].items()
+        ]
+        items += [(f"{module_name}::{x}", x, y, renderer.struct_signature) for x, y in module["structs"].items()]
+        for key, name, item, render in items:
+            canonical = json.dumps(_self_relative(item, self_address), sort_keys=True, separators=(",", ":"))
+            hashes[key] = (hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest(), render(name, item))
+    return hashes
+
+
+@dataclass
+class AbiDiff(DataClassJsonMixin):
+    """Differences between two packages' exposed functions and structs."""
+
+    added: dict[str, str] = field(default_factory=dict)
+    removed: dict[str, str] = field(default_factory=dict)
+    changed: dict[str, list[str]] = field(default_factory=dict)
+    unchanged: int = 0
+
+    @classmethod
+    def compare(cls, old_modules: dict, new_modules: dict) -> "AbiDiff":
+        """Diff two normalized packages by item hash.
+
+        :param old_modules: Normalized modules of the old package
+        :type old_modules: dict
+        :param new_modules: Normalized modules of the new package
+        :type new_modules: dict
+        :return: The differences, changed items map to [old, new] signatures
+        :rtype: AbiDiff
+        """
+        renderer = SignatureRenderer()
+        old, new = abi_hashes(old_modules, renderer), abi_hashes(new_modules, renderer)
+        diff = cls()
+        for key in sorted(old.keys() | new.keys()):
+            if key not in new:
+                diff.removed[key] = old[key][1]
+            elif key not in old:
+                diff.added[key] = new[key][1]
+            elif old[key][0] != new[key][0]:
+                diff.changed[key] = [old[key][1], new[key][1]]
+            else:
+                diff.unchanged += 1
+        return diff
+
+
+def print_abi_diff(diff: AbiDiff, args: Namespace) -> None:
+    """print_abi_diff Prints added, removed and changed items to stdout.
+
+    :param diff: The differences
+    :type diff: AbiDiff
+    :param args: Holds the package addresses and output format
+    :type args: Namespace
+    """
+    if args.diff_format == "json":
+        print(diff.to_json(indent=2))
+        return
+    old_id, new_id = args.move_package_id
+    print(f"\nDiff {old_id} -> {new_id}")
+    for key, signature in diff.removed.items():
+        print(f"- {key}: {signature}")
+    for key, signature in diff.added.items():
+        print(f"+ {key}: {signature}")
+    for key, (old_sig, new_sig) in diff.changed.items():
+        print(f"~ {key}:\n    - {old_sig}\n    + {new_sig}")
+    print(
+        f"{len(diff.added)} added, {len(diff.removed)} removed, {len(diff.changed)} changed, {diff.unchanged} unchanged"
+    )
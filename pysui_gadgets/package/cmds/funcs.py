@@ -13,161 +13,47 @@
 
 """Package function commands and utilities."""
 
+import itertools
 from argparse import Namespace
-from typing import Any
+from typing import Optional
 
-from pysui.sui.sui_txresults.package_meta import (
-    SuiMoveScalarArgument,
-    SuiMoveVector,
-    SuiParameterReference,
-    SuiMoveParameterType,
-    SuiParameterStruct,
-    SuiMoveFunction,
-    SuiMoveModule,
-)
+from pysui.sui.sui_txresults.package_meta import SuiMoveModule
 
-from pysui_gadgets.utils.filters import (
-    filter_modules_excluding,
-    filter_modules_with_including,
-    filter_modules_with_entry_points,
-)
+from pysui_gadgets.package.cmds.records import RecordWriter
+from pysui_gadgets.package.cmds.render import SignatureRenderer
+from pysui_gadgets.utils.filters import is_entry, module_query, takes_type
 
 
-def _sig_parm_types(holder: list, sig: str) -> str:
-    """."""
-    if holder:
-        tlen = len(holder)
-        tcount = 0
-        sig += "<"
-        for abiltity_set in holder:
-            if abiltity_set.abilities:
-                sig += f"T{tcount}: {' + '.join(abiltity_set.abilities)}"
-                tcount += 1
-                if tcount < tlen:
-                    sig += ", "
-            else:
-                sig += f"T{tcount}"
-        sig += ">"
-    return sig
-
-
-def _func_sig(fname: str, dfunc: SuiMoveFunction) -> str:
-    """_func_sig Builds the signature prefix.
-
-    :param fname: Function name
-    :type fname: str
-    :param dfunc: Function object
-    :type dfunc: SuiMoveFunction
-    :return: Signature prefix
-    :rtype: str
-    """
-    sig = ""
-    if dfunc.is_entry:
-        sig = f"public entry fun {fname}"
-    elif dfunc.visibility == "Public":
-        sig = f"public fun {fname}"
-    else:
-        sig = f"fun {fname}"
-    # Setup type abilities
-    sig = _sig_parm_types(dfunc.type_parameters, sig) + "("
-    return sig
-
-
-def _new_func_params(parm: Any, sig: str) -> str:
-    """_new_func_params Incrementally builds argument or return list.
-
-    :param parm: Input function argument or return data type
-    :type parm: Any
-    :param sig: Accumulator
-    :type sig: str
-    :raises AttributeError: If type of parm is not handled
-    :return: signature current state
-    :rtype: str
-    """
-    if isinstance(parm, str):
-        sig += parm
-    elif isinstance(parm, SuiParameterReference):
-        sig += "&" if not parm.is_mutable else "&mut "
-        sig = _new_func_params(parm.reference_to, sig)
-    elif isinstance(parm, SuiParameterStruct):
-        sig += parm.name
-        if parm.type_arguments:
-            sig += "<"
-            for smpt in parm.type_arguments:
-                sig = _new_func_params(smpt, sig)
-            sig += ">"
-    elif isinstance(parm, SuiMoveParameterType):
-        sig += f"<T{str(parm.type_parameters_index)}>"
-    elif isinstance(parm, SuiMoveVector):
-        sig += "vector<"
-        sig = _new_func_params(parm.vector_of, sig)
-        sig += ">"
-    elif isinstance(parm, SuiMoveScalarArgument):
-        sig += parm.scalar_type
-    else:
-        raise AttributeError(f"Not handling {parm}")
-    return sig
-
-
-def _build_func_signature(func_desc: dict[str, SuiMoveFunction]) -> str:
-    """_build_func_signature Builds a functions signature string.
-
-    :param func_desc: Dictionary with func_name:func_definition
-    :type func_desc: dict[str, SuiMoveFunction]
-    :return: Signature string
-    :rtype: str
-    """
-    # Get name and function
-    func_name, func_entry = list(func_desc.items())[0]
-    # Setup initial signature
-    sig = _func_sig(func_name, func_entry)
-
-    # Build Signature argument
-    parm_count = len(func_entry.parameters)
-    parm_index = 0
-    for parm in func_entry.parameters:
-        sig = _new_func_params(parm, sig)
-        if parm_index + 1 < parm_count:
-            sig += ", "
-        parm_index = parm_index + 1
-
-    # Build Signature return
-    if func_entry.returns:
-        parm_count = len(func_entry.returns)
-        parm_index = 0
-        retsig = ") : "
-        if parm_count > 1:
-            retsig += "("
-        for parm in func_entry.returns:
-            retsig = _new_func_params(parm, retsig)
-            if parm_index + 1 < parm_count:
-                retsig += ", "
-            parm_index = parm_index + 1
-        if parm_count > 1:
-            retsig += ")"
-        sig += retsig
-    else:
-        sig += ")"
-    return sig
-
-
-def print_function_signatures(mods: dict[str, SuiMoveModule], args: Namespace) -> None:
+def print_function_signatures(
+    mods: dict[str, SuiMoveModule],
+    args: Namespace,
+    writer: Optional[RecordWriter] = None,
+    renderer: Optional[SignatureRenderer] = None,
+) -> None:
     """function_signatures Generate function signatures from package's modules.
 
     :param mods: Package's modules dictionary
     :type mods: dict[str, SuiMoveModule]
     :param args: Filtering criteria
     :type args: argparse.Namespace
+    :param writer: Stream one record per function to writer instead of printing text, defaults to None
+    :type writer: Optional[RecordWriter], optional
+    :param renderer: Renderer shared across packages, defaults to a new one
+    :type renderer: Optional[SignatureRenderer], optional
     """
-    if args.includes:
-        modules = filter_modules_with_including(mods=mods, includes=args.includes, nonentries=args.nonentries)
-    elif args.excludes:
-        modules = filter_modules_excluding(mods=mods, excludes=args.excludes, nonentries=args.nonentries)
-    else:
-        modules = filter_modules_with_entry_points(mods=mods, nonentries=args.nonentries)
-
-    # modules = _filter_functions(mods, args)
-    for mod_key, mod_func_list in modules.items():
+    query = module_query(mods, args.includes, args.excludes)
+    if not args.nonentries:
+        query = query.functions(is_entry())
+    if getattr(args, "takes", None):
+        query = query.functions(takes_type(*args.takes))
+
+    renderer = renderer or SignatureRenderer()
+    if writer is not None:
+        package_id = str(args.move_package_id)
+        for func_hit in query.iter_functions():
+            writer.write({"package": package_id, **renderer.record(*func_hit)})
+        return
+    for mod_key, mod_funcs in itertools.groupby(query.iter_functions(), key=lambda x: x[0]):
         print(f"For module {mod_key}")
-        for func_hit in mod_func_list:
-            print(_build_func_signature(func_hit))
+        for _mod_key, func_name, func_def in mod_funcs:
+            print(renderer.signature(func_name, func_def))
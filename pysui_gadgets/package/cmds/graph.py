@@ -0,0 +1,234 @@
+#    Copyright  Frank V. Castellucci
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+# -*- coding: utf-8 -*-
+
+"""Struct dependency graph commands and utilities.
+
+Starting from the structs of a package's modules, follows every struct a field
+type refers to, across packages, until the transitive closure is reached.
+Referenced packages are fetched only when reached, each once, and all packages
+first reached at the same depth are fetched concurrently.
+"""
+
+import json
+import threading
+from argparse import Namespace
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator, Optional, Union
+
+from pysui import SyncClient
+
+from pysui_gadgets.package.cmds.render import SignatureRenderer
+from pysui_gadgets.utils.addresses import short_address
+from pysui_gadgets.utils.filters import name_matches
+from pysui_gadgets.utils.package_cache import PackageCache
+
+
+def struct_key(address: str, module: str, name: str) -> str:
+    """Graph node key of a struct.
+
+    :param address: The struct's package address
+    :type address: str
+    :param module: The struct's module name
+    :type module: str
+    :param name: The struct name
+    :type name: str
+    :return: address::module::name with a short form address
+    :rtype: str
+    """
+    return f"{short_address(address)}::{module}::{name}"
+
+
+def _struct_refs(ntype: Union[str, dict]) -> Iterator[str]:
+    """Keys of every struct a normalized type mentions, including type arguments."""
+    if isinstance(ntype, str):
+        return
+    key, value = next(iter(ntype.items()), (None, None))
+    match key:
+        case "Struct":
+            yield struct_key(value["address"], value["module"], value["name"])
+            for type_arg in value.get("typeArguments") or []:
+                yield from _struct_refs(type_arg)
+        case "Reference" | "MutableReference" | "Vector":
+            yield from _struct_refs(value)
+
+
+class StructGraph:
+    """Transitive struct dependency graph across packages."""
+
+    def __init__(self, client: SyncClient, workers: int = 8, use_cache: bool = True, from_bytecode: bool = False):
+        """Initialize an empty graph.
+
+        :param client: The client used to fetch packages
+        :type client: SyncClient
+        :param workers: Maximum packages fetched concurrently, defaults to 8
+        :type workers: int, optional
+        :param use_cache: Fetch packages through the package cache, defaults to True
+        :type use_cache: bool, optional
+        :param from_bytecode: Normalize packages locally from bytecode, defaults to False
+        :type from_bytecode: bool, optional
+        """
+        self._cache = PackageCache(client, enabled=use_cache, from_bytecode=from_bytecode)
+        self._workers = max(1, workers)
+        self._packages: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._renderer = SignatureRenderer()
+        self.nodes: dict[str, dict] = {}
+        self.edges: dict[str, list[tuple[str, str]]] = {}
+        self.unresolved: dict[str, str] = {}
+
+    def _fetch(self, address: str) -> dict:
+        """Normalized modules of a package."""
+        result = self._cache.raw_package(address)
+        if not result.is_ok():
+            raise ValueError(f"Failed retrieving package {address} with return {result.result_string}")
+        return result.result_data
+
+    def _package(self, executor: ThreadPoolExecutor, address: str) -> Future:
+        """Future of a package's normalized modules, submitted on first request."""
+        with self._lock:
+            if short_address(address) not in self._packages:
+                self._packages[short_address(address)] = executor.submit(self._fetch, address)
+            return self._packages[short_address(address)]
+
+    def _add_node(self, key: str, struct: dict) -> list[str]:
+        """Add a struct node and its field edges, returning the structs it refers to."""
+        self.nodes[key] = {
+            "abilities": struct["abilities"]["abilities"],
+            "type_parameters": len(struct["typeParameters"]),
+            "fields": [{"name": x["name"], "type": self._renderer.render_type(x["type"])} for x in struct["fields"]],
+        }
+        self.edges[key] = []
+        for field in struct["fields"]:
+            for ref in _struct_refs(field["type"]):
+                if (field["name"], ref) not in self.edges[key]:
+                    self.edges[key].append((field["name"], ref))
+        return [x[1] for x in self.edges[key]]
+
+    def build(
+        self,
+        package_ids: list[str],
+        includes: Optional[set[str]] = None,
+        struct_names: Optional[set[str]] = None,
+        max_depth: Optional[int] = None,
+    ) -> "StructGraph":
+        """Resolve the struct closure of packages' modules.
+
+        :param package_ids: The root packages
+        :type package_ids: list[str]
+        :param includes: Only start from modules matching these names or glob patterns, defaults to all
+        :type includes: Optional[set[str]], optional
+        :param struct_names: Only start from these structs, defaults to all
+        :type struct_names: Optional[set[str]], optional
+        :param max_depth: Stop following references after this many hops, defaults to no limit
+        :type max_depth: Optional[int], optional
+        :return: This graph
+        :rtype: StructGraph
+        """
+        included = name_matches(*includes or ["*"])
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            level: list[str] = []
+            for package_id in package_ids:
+                self._package(executor, package_id)
+            for package_id in package_ids:
+                try:
+                    modules = self._package(executor, package_id).result()
+                except ValueError as verr:
+                    self.unresolved[short_address(package_id)] = str(verr)
+                    continue
+                for module_name, module in modules.items():
+                    if not included(module_name, module):
+                        continue
+                    level.extend(
+                        struct_key(package_id, module_name, x)
+                        for x in module.get("structs", {})
+                        if not struct_names or x in struct_names
+                    )
+            depth = 0
+            while level:
+                # Submit every package of this depth before waiting on any
+                for key in level:
+                    self._package(executor, key.split("::", 1)[0])
+                following: list[str] = []
+                for key in level:
+                    if key in self.nodes or key in self.unresolved:
+                        continue
+                    address, module_name, name = key.split("::")
+                    try:
+                        struct = self._package(executor, address).result()[module_name]["structs"][name]
+                    except ValueError as verr:
+                        self.unresolved[key] = str(verr)
+                        continue
+                    except KeyError:
+                        self.unresolved[key] = "Struct not found in package"
+                        continue
+                    refs = self._add_node(key, struct)
+                    if max_depth is None or depth < max_depth:
+                        following.extend(x for x in refs if x not in self.nodes)
+                level = list(dict.fromkeys(following))
+                depth += 1
+        return self
+
+    def to_dict(self) -> dict:
+        """Graph as a JSON serializable dictionary.
+
+        :return: Nodes, edges as [field, struct] pairs and unresolved references
+        :rtype: dict
+        """
+        return {
+            "nodes": self.nodes,
+            "edges": {x: [list(y) for y in z] for x, z in self.edges.items()},
+            "unresolved": self.unresolved,
+        }
+
+    def to_dot(self) -> str:
+        """Graph in graphviz dot syntax.
+
+        :return: The dot digraph
+        :rtype: str
+        """
+        lines = ["digraph structs {", "    node [shape=box];"]
+        for key, node in self.nodes.items():
+            label = key + (f"\\nhas {', '.join(node['abilities'])}" if node["abilities"] else "")
+            lines.append(f'    "{key}" [label="{label}"];')
+        for key, edges in self.edges.items():
+            for field, target in edges:
+                lines.append(f'    "{key}" -> "{target}" [label="{field}"];')
+        lines.append("}")
+        return "\n".join(lines)
+
+
+def print_struct_graph(graph: StructGraph, args: Namespace) -> None:
+    """print_struct_graph Prints the struct graph to stdout.
+
+    :param graph: The resolved graph
+    :type graph: StructGraph
+    :param args: Holds the output format
+    :type args: Namespace
+    """
+    match args.graph_format:
+        case "json":
+            print(json.dumps(graph.to_dict(), indent=2))
+        case "dot":
+            print(graph.to_dot())
+        case _:
+            for key, node in graph.nodes.items():
+                abilities = f" has {', '.join(node['abilities'])}" if node["abilities"] else ""
+                print(f"\n{key}{abilities}")
+                targets: dict[str, list[str]] = {}
+                for field, target in graph.edges[key]:
+                    targets.setdefault(field, []).append(target)
+                for field in node["fields"]:
+                    refs = f" -> {', '.join(targets[field['name']])}" if field["name"] in targets else ""
+                    print(f"    {field['name']}: {field['type']}{refs}")
+            for key, reason in graph.unresolved.items():
+                print(f"\nUnresolved {key}: {reason}")
@@ -14,15 +14,16 @@
 """List commands and utilities."""
 
 from argparse import Namespace
+from typing import Iterable, Union
 from pysui.sui.sui_txresults import SuiMoveModule
 
 
-def print_module_list(mods: dict[str, SuiMoveModule], args: Namespace) -> None:
+def print_module_list(mods: Union[dict[str, SuiMoveModule], Iterable[str]], args: Namespace) -> None:
     """list_mods Prints list of the SuiMovePackage modules to stdout.
 
-    :param mods: SuiMovePackage's module dictionary
-    :type package: list[str,SuiMoveModule
+    :param mods: SuiMovePackage's module dictionary or module names
+    :type package: Union[dict[str, SuiMoveModule], Iterable[str]]
     """
     print(f"\nModules from package: {args.move_package_id}")
-    for mod_name in mods.keys():
+    for mod_name in mods:
         print(f"\tName: {mod_name}")
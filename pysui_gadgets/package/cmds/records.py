@@ -0,0 +1,84 @@
+#    Copyright  Frank V. Castellucci
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+# -*- coding: utf-8 -*-
+
+"""Structured record output.
+
+Records are serialized as they are produced and written in batches, so output for
+large packages starts before the package is fully walked. The ``json`` format is
+an array with one record per line, ``ndjson`` is one record per line.
+"""
+
+import json
+import sys
+from typing import Optional, TextIO
+
+# Structured output formats
+FORMATS: tuple[str, ...] = ("json", "ndjson")
+
+
+class RecordWriter:
+    """Buffered writer streaming records as a JSON array or newline delimited JSON."""
+
+    def __init__(self, output_format: str, stream: Optional[TextIO] = None, batch_size: int = 256):
+        """Initialize writer.
+
+        :param output_format: Either 'json' or 'ndjson'
+        :type output_format: str
+        :param stream: Output stream, defaults to stdout
+        :type stream: Optional[TextIO], optional
+        :param batch_size: Records buffered between writes, defaults to 256
+        :type batch_size: int, optional
+        :raises ValueError: If output_format is not supported
+        """
+        if output_format not in FORMATS:
+            raise ValueError(f"Unsupported record format {output_format}")
+        self._array = output_format == "json"
+        self._stream = stream or sys.stdout
+        self._batch_size = max(1, batch_size)
+        self._pending: list[str] = []
+        self.count = 0
+
+    def __enter__(self) -> "RecordWriter":
+        """Start output."""
+        if self._array:
+            self._pending.append("[\n")
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        """Finish output."""
+        self.close()
+
+    def write(self, record: dict) -> None:
+        """Serialize and buffer one record, writing the buffer when full.
+
+        :param record: JSON serializable record
+        :type record: dict
+        """
+        prefix = ",\n" if self._array and self.count else ""
+        self._pending.append(prefix + json.dumps(record) + ("" if self._array else "\n"))
+        self.count += 1
+        if len(self._pending) >= self._batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered records through to the stream."""
+        if self._pending:
+            self._stream.write("".join(self._pending))
+            self._pending.clear()
+        self._stream.flush()
+
+    def close(self) -> None:
+        """Write the remaining records and close the array."""
+        if self._array:
+            self._pending.append("\n]\n" if self.count else "]\n")
+        self.flush()
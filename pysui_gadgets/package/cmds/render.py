@@ -0,0 +1,249 @@
+#    Copyright  Frank V. Castellucci
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+# -*- coding: utf-8 -*-
+
+"""Function signature rendering.
+
+Parameter and return types are reduced to hashable keys and each distinct key
+is rendered once per renderer, so types repeated across a package, such as
+``&mut TxContext`` or ``Coin<T0>``, are joined into strings only the first time.
+Both the pysui package objects and the normalized package JSON reduce to the
+same keys, so every command renders the same text for the same type.
+"""
+
+from typing import Any, Hashable, Optional
+
+from pysui.sui.sui_txresults.package_meta import (
+    SuiMoveScalarArgument,
+    SuiMoveVector,
+    SuiParameterReference,
+    SuiMoveParameterType,
+    SuiParameterStruct,
+    SuiMoveFunction,
+    SuiMoveStruct,
+)
+
+# Type key tags
+_STRUCT: str = "S"
+_REFERENCE: str = "R"
+_VECTOR: str = "V"
+# Normalized JSON reference kinds to mutability
+_NORMALIZED_REFERENCES: dict[str, bool] = {"Reference": False, "MutableReference": True}
+
+
+class SignatureRenderer:
+    """Renders function signatures, memoizing rendered types."""
+
+    def __init__(self):
+        """Initialize with an empty type memo."""
+        self._rendered: dict[Hashable, str] = {}
+
+    def _key(self, parm: Any) -> Hashable:
+        """Hashable structural key of a function parameter or return type."""
+        # Exact type dispatch, isinstance on the dataclass_json ABCs dominates otherwise
+        kind = type(parm)
+        if kind is SuiMoveScalarArgument:
+            return parm.scalar_type
+        if kind is SuiParameterStruct:
+            return (_STRUCT, parm.name, tuple(map(self._key, parm.type_arguments)) if parm.type_arguments else ())
+        if kind is SuiParameterReference:
+            return (_REFERENCE, parm.is_mutable, self._key(parm.reference_to))
+        if kind is SuiMoveVector:
+            return (_VECTOR, self._key(parm.vector_of))
+        if kind is SuiMoveParameterType:
+            return parm.type_parameters_index
+        if kind is str:
+            return parm
+        if kind is dict:
+            return self._normalized_key(parm)
+        raise AttributeError(f"Not handling {parm}")
+
+    def _normalized_key(self, ntype: dict) -> Hashable:
+        """Hashable structural key of a normalized JSON type."""
+        tag, value = next(iter(ntype.items()))
+        if tag == "Struct":
+            args = value.get("typeArguments")
+            return (_STRUCT, value["name"], tuple(map(self._key, args)) if args else ())
+        if tag in _NORMALIZED_REFERENCES:
+            return (_REFERENCE, _NORMALIZED_REFERENCES[tag], self._key(value))
+        if tag == "Vector":
+            return (_VECTOR, self._key(value))
+        if tag == "TypeParameter":
+            return value
+        raise AttributeError(f"Not handling {ntype}")
+
+    def _render_key(self, key: Hashable) -> str:
+        """Rendered type of a key, from the memo when seen before."""
+        rendered = self._rendered.get(key)
+        if rendered is None:
+            if isinstance(key, str):
+                rendered = key
+            elif isinstance(key, int):
+                rendered = f"T{key}"
+            elif key[0] == _REFERENCE:
+                rendered = ("&mut " if key[1] else "&") + self._render_key(key[2])
+            elif key[0] == _VECTOR:
+                rendered = f"vector<{self._render_key(key[1])}>"
+            elif key[2]:
+                rendered = f"{key[1]}<{', '.join(self._render_key(x) for x in key[2])}>"
+            else:
+                rendered = key[1]
+            self._rendered[key] = rendered
+        return rendered
+
+    def render_type(self, parm: Any) -> str:
+        """Rendered function parameter, return or field type.
+
+        :param parm: Package object or normalized JSON type
+        :type parm: Any
+        :raises AttributeError: If type of parm is not handled
+        :return: The rendered type
+        :rtype: str
+        """
+        return self._render_key(self._key(parm))
+
+    @staticmethod
+    def _type_parameters(constraints: list[list[str]], phantoms: Optional[list[bool]] = None) -> str:
+        """Rendered type parameters with their ability constraints."""
+        if not constraints:
+            return ""
+        phantoms = phantoms or [False] * len(constraints)
+        return (
+            "<"
+            + ", ".join(
+                ("phantom " if phantom else "") + (f"T{index}: {' + '.join(x)}" if x else f"T{index}")
+                for index, (x, phantom) in enumerate(zip(constraints, phantoms))
+            )
+            + ">"
+        )
+
+    @staticmethod
+    def type_parameters(func: SuiMoveFunction) -> str:
+        """Rendered type parameters with their ability constraints."""
+        return SignatureRenderer._type_parameters([x.abilities for x in func.type_parameters])
+
+    def _signature(
+        self, name: str, is_entry: bool, visibility: str, type_parameters: str, parameters: list, returns: list
+    ) -> str:
+        """Rendered function signature from its parts."""
+        if is_entry:
+            prefix = "public entry fun"
+        elif visibility == "Public":
+            prefix = "public fun"
+        else:
+            prefix = "fun"
+        params = ", ".join(self.render_type(x) for x in parameters)
+        rendered = [self.render_type(x) for x in returns]
+        if not rendered:
+            ret_sig = ""
+        elif len(rendered) == 1:
+            ret_sig = f" : {rendered[0]}"
+        else:
+            ret_sig = f" : ({', '.join(rendered)})"
+        return f"{prefix} {name}{type_parameters}({params}){ret_sig}"
+
+    def signature(self, name: str, func: SuiMoveFunction) -> str:
+        """Rendered function signature.
+
+        :param name: Function name
+        :type name: str
+        :param func: Function object
+        :type func: SuiMoveFunction
+        :return: The signature
+        :rtype: str
+        """
+        return self._signature(
+            name, func.is_entry, func.visibility, self.type_parameters(func), func.parameters, func.returns
+        )
+
+    def function_signature(self, name: str, func: dict) -> str:
+        """Rendered signature of a normalized JSON function.
+
+        :param name: Function name
+        :type name: str
+        :param func: The normalized function
+        :type func: dict
+        :return: The signature
+        :rtype: str
+        """
+        return self._signature(
+            name,
+            func["isEntry"],
+            func["visibility"],
+            self._type_parameters([x["abilities"] for x in func["typeParameters"]]),
+            func["parameters"],
+            func["return"],
+        )
+
+    def struct_signature(self, name: str, struct: dict) -> str:
+        """Rendered declaration of a normalized JSON struct.
+
+        :param name: Struct name
+        :type name: str
+        :param struct: The normalized struct
+        :type struct: dict
+        :return: The declaration
+        :rtype: str
+        """
+        type_params = self._type_parameters(
+            [x["constraints"]["abilities"] for x in struct["typeParameters"]],
+            [x["isPhantom"] for x in struct["typeParameters"]],
+        )
+        abilities = struct["abilities"]["abilities"]
+        fields = ", ".join(f"{x['name']}: {self.render_type(x['type'])}" for x in struct["fields"])
+        has = f" has {', '.join(abilities)}" if abilities else ""
+        return f"struct {name}{type_params}{has} {{ {fields} }}"
+
+    def record(self, module: str, name: str, func: SuiMoveFunction) -> dict:
+        """Machine readable function description.
+
+        :param module: Module name
+        :type module: str
+        :param name: Function name
+        :type name: str
+        :param func: Function object
+        :type func: SuiMoveFunction
+        :return: Function description with rendered types and signature
+        :rtype: dict
+        """
+        return {
+            "module": module,
+            "function": name,
+            "visibility": func.visibility,
+            "entry": func.is_entry,
+            "type_parameters": [x.abilities for x in func.type_parameters],
+            "parameters": [self.render_type(x) for x in func.parameters],
+            "returns": [self.render_type(x) for x in func.returns],
+            "signature": self.signature(name, func),
+        }
+
+    def struct_record(self, module: str, name: str, struct: SuiMoveStruct) -> dict:
+        """Machine readable struct description.
+
+        :param module: Module name
+        :type module: str
+        :param name: Struct name
+        :type name: str
+        :param struct: Struct object
+        :type struct: SuiMoveStruct
+        :return: Struct description with rendered field types
+        :rtype: dict
+        """
+        return {
+            "module": module,
+            "struct": name,
+            "abilities": struct.abilities.abilities,
+            "type_parameters": [
+                {"constraints": x.constraints.abilities, "phantom": x.is_phantom} for x in struct.type_parameters
+            ],
+            "fields": [{"name": x.name, "type": self.render_type(x.field_type)} for x in struct.fields],
+        }
@@ -0,0 +1,223 @@
+#    Copyright  Frank V. Castellucci
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+# -*- coding: utf-8 -*-
+
+"""Package search commands and utilities.
+
+The index holds one document per function and struct of every cached package,
+with parameter, return and field types rendered in Move syntax. It is persisted
+next to the package cache entries and only re-reads entries that changed.
+"""
+
+import json
+import re
+from argparse import Namespace
+from pathlib import Path
+from typing import Optional
+
+from pysui_gadgets.package.cmds.render import SignatureRenderer
+from pysui_gadgets.utils.package_cache import atomic_write, read_entry
+
+# Index file name within a network's package cache directory
+INDEX_FILE: str = "search-index.json"
+# Bumped when documents are rendered differently, older indexes are rebuilt
+_INDEX_VERSION: int = 2
+
+_TYPE_PARAMETER = re.compile(r"\bT\d*\b")
+_WHITESPACE = re.compile(r"\s+")
+_WORD = re.compile(r"[A-Za-z0-9_]+")
+
+
+def _canonical(type_str: str) -> str:
+    """Comparable form of a rendered or queried type, any type parameter matches any other."""
+    return _WHITESPACE.sub("", _TYPE_PARAMETER.sub("T", type_str)).lower()
+
+
+def _documents(package_id: str, modules: dict, renderer: SignatureRenderer) -> list[dict]:
+    """Search documents of a normalized package's functions and structs."""
+    docs: list[dict] = []
+    for module_name, module in modules.items():
+        for name, func in module.get("exposedFunctions", {}).items():
+            params = [renderer.render_type(x) for x in func["parameters"]]
+            returns = [renderer.render_type(x) for x in func["return"]]
+            signature = renderer.function_signature(name, func)
+            docs.append(
+                {
+                    "package": package_id,
+                    "module": module_name,
+                    "kind": "function",
+                    "name": name,
+                    "params": params,
+                    "returns": returns,
+                    "signature": signature,
+                }
+            )
+        for name, struct in module.get("structs", {}).items():
+            abilities = [x.lower() for x in struct["abilities"]["abilities"]]
+            fields = [f"{x['name']}: {renderer.render_type(x['type'])}" for x in struct["fields"]]
+            docs.append(
+                {
+                    "package": package_id,
+                    "module": module_name,
+                    "kind": "struct",
+                    "name": name,
+                    "abilities": abilities,
+                    "fields": fields,
+                    "signature": renderer.struct_signature(name, struct),
+                }
+            )
+    return docs
+
+
+class SearchIndex:
+    """Persisted function and struct index over cached packages."""
+
+    def __init__(self, path: Path):
+        """Initialize an empty index.
+
+        :param path: File the index is persisted to
+        :type path: Path
+        """
+        self.path = path
+        self.sources: dict[str, str] = {}
+        self.docs: list[dict] = []
+        self._postings: Optional[dict[str, set[int]]] = None
+
+    @classmethod
+    def load(cls, path: Path) -> "SearchIndex":
+        """Load the index from path, empty if missing or unreadable.
+
+        :param path: File the index is persisted to
+        :type path: Path
+        :return: The index
+        :rtype: SearchIndex
+        """
+        index = cls(path)
+        try:
+            stored = json.loads(path.read_text(encoding="utf8"))
+            if stored.get("version") != _INDEX_VERSION:
+                return index
+            index.sources = stored["sources"]
+            index.docs = stored["docs"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return index
+
+    def save(self) -> None:
+        """Write the index atomically."""
+        with atomic_write(self.path) as tmp:
+            json.dump({"version": _INDEX_VERSION, "sources": self.sources, "docs": self.docs}, tmp)
+
+    def update(self, entries: dict[str, Path]) -> int:
+        """Index the cache entries not yet indexed at their current version.
+
+        :param entries: Package id to newest cache entry, see cached_entries
+        :type entries: dict[str, Path]
+        :return: Number of packages (re)indexed
+        :rtype: int
+        """
+        stale = {x: y for x, y in entries.items() if self.sources.get(x) != y.name}
+        if not stale:
+            return 0
+        self.docs = [x for x in self.docs if x["package"] not in stale]
+        renderer = SignatureRenderer()
+        for package_id, entry in stale.items():
+            modules = read_entry(entry)
+            if modules is not None:
+                self.docs.extend(_documents(package_id, modules, renderer))
+                self.sources[package_id] = entry.name
+        self._postings = None
+        return len(stale)
+
+    def _words(self) -> dict[str, set[int]]:
+        """Inverted index of lower case words to document positions, built on first use."""
+        if self._postings is None:
+            self._postings = {}
+            for pos, doc in enumerate(self.docs):
+                text = " ".join(
+                    [doc["module"], doc["name"], doc["signature"]] + doc.get("params", []) + doc.get("returns", [])
+                )
+                for word in set(_WORD.findall(text.lower())):
+                    self._postings.setdefault(word, set()).add(pos)
+        return self._postings
+
+    def search(
+        self,
+        *,
+        text: Optional[str] = None,
+        param: Optional[str] = None,
+        returns: Optional[str] = None,
+        abilities: Optional[list[str]] = None,
+        kind: Optional[str] = None,
+        packages: Optional[set[str]] = None,
+    ) -> list[dict]:
+        """Documents matching all of the given criteria.
+
+        :param text: Words all appearing in names, signature or types, defaults to None
+        :type text: Optional[str], optional
+        :param param: Type a function parameter contains, e.g. '&mut Pool<T>', defaults to None
+        :type param: Optional[str], optional
+        :param returns: Type a function return contains, defaults to None
+        :type returns: Optional[str], optional
+        :param abilities: Abilities a struct has at least, defaults to None
+        :type abilities: Optional[list[str]], optional
+        :param kind: Either 'function' or 'struct', defaults to None
+        :type kind: Optional[str], optional
+        :param packages: Only search these package ids, defaults to None
+        :type packages: Optional[set[str]], optional
+        :return: Matching documents
+        :rtype: list[dict]
+        """
+        candidates: Optional[set[int]] = None
+        if text:
+            postings = self._words()
+            for word in _WORD.findall(text.lower()):
+                hits = postings.get(word, set())
+                candidates = hits if candidates is None else candidates & hits
+        positions = sorted(candidates) if candidates is not None else range(len(self.docs))
+        param_c = _canonical(param) if param else None
+        returns_c = _canonical(returns) if returns else None
+        wanted = {x.lower() for x in abilities} if abilities else None
+        if param_c or returns_c:
+            kind = "function"
+        elif wanted:
+            kind = "struct"
+        results: list[dict] = []
+        for pos in positions:
+            doc = self.docs[pos]
+            if kind and doc["kind"] != kind:
+                continue
+            if packages is not None and doc["package"] not in packages:
+                continue
+            if param_c and not any(param_c in _canonical(x) for x in doc["params"]):
+                continue
+            if returns_c and not any(returns_c in _canonical(x) for x in doc["returns"]):
+                continue
+            if wanted and not wanted.issubset(doc["abilities"]):
+                continue
+            results.append(doc)
+        return results
+
+
+def print_search_results(docs: list[dict], args: Namespace) -> None:
+    """print_search_results Prints matching functions and structs to stdout.
+
+    :param docs: Matching documents
+    :type docs: list[dict]
+    :param args: Holds the result limit
+    :type args: Namespace
+    """
+    for doc in docs[: args.limit] if args.limit else docs:
+        print(f"{doc['package']}::{doc['module']}: {doc['signature']}")
+    if args.limit and len(docs) > args.limit:
+        print(f"... {len(docs) - args.limit} more")
+    print(f"{len(docs)} matches")
@@ -14,7 +14,7 @@
 """List commands and utilities."""
 
 from argparse import Namespace
-from typing import Any
+from typing import Any, Optional
 from pysui.sui.sui_txresults.package_meta import (
     SuiMoveField,
     SuiMoveModule,
@@ -24,6 +24,8 @@ from pysui.sui.sui_txresults.package_meta import (
     SuiMoveParameterType,
 )
 
+from pysui_gadgets.package.cmds.records import RecordWriter
+from pysui_gadgets.package.cmds.render import SignatureRenderer
 from pysui_gadgets.utils import filters
 
 
@@ -75,18 +77,41 @@ def _field_signature(field: SuiMoveField, field_str: str) -> str:
     return field_str
 
 
-def print_module_structs(modules: dict[str, SuiMoveModule], args: Namespace) -> None:
-    """."""
-    if args.includes:
-        modules = filters.filter_include_modules(
-            mods=modules, includes=args.includes)
-    elif args.excludes:
-        modules = filters.filter_modules_excluding(
-            mods=modules, excludes=args.excludes)
-
-    for mod_name, mod_def in modules.items():
+def print_module_structs(
+    modules: dict[str, SuiMoveModule],
+    args: Namespace,
+    writer: Optional[RecordWriter] = None,
+    renderer: Optional[SignatureRenderer] = None,
+) -> None:
+    """print_module_structs Show structs of package's modules.
+
+    :param modules: Package's modules dictionary
+    :type modules: dict[str, SuiMoveModule]
+    :param args: Filtering criteria and display form
+    :type args: Namespace
+    :param writer: Stream one record per struct to writer instead of printing text, defaults to None
+    :type writer: Optional[RecordWriter], optional
+    :param renderer: Renderer of field types shared across packages, defaults to a new one
+    :type renderer: Optional[SignatureRenderer], optional
+    """
+    query = filters.module_query(modules, args.includes, args.excludes)
+    if getattr(args, "abilities", None):
+        query = query.structs(filters.has_abilities(*args.abilities))
+
+    if writer is not None:
+        renderer = renderer or SignatureRenderer()
+        package_id = str(args.move_package_id)
+        for struct_hit in query.iter_structs():
+            writer.write({"package": package_id, **renderer.struct_record(*struct_hit)})
+        return
+
+    for mod_name, mod_def in query.iter_modules():
+        structs = list(query.structs_of(mod_def))
+        # Modules without a struct having the abilities are left out
+        if not structs and getattr(args, "abilities", None):
+            continue
         print(f"\nModule {mod_name}")
-        for struct_name, struct_def in mod_def.structs.items():
+        for struct_name, struct_def in structs:
             sig = _struct_parm_abilities(struct_def.type_parameters, "")
             sig += _struct_parm_types(struct_def.abilities.abilities, "")
             print(f"\nStruct: {struct_name} {sig} {{")
@@ -27,32 +27,129 @@ This is a utility for inspecting the metadata of a published package on SUI.
 import argparse
 import sys
 
-from typing import Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, Union
 
-from pysui import SuiConfig, SyncClient
+from pysui import ObjectID, SuiConfig, SyncClient
 from pysui.sui.sui_txresults import SuiMovePackage
 
 from pysui_gadgets.utils.cmdlines import package_parser
-from pysui_gadgets.package.cmds import lists, structs, funcs
+from pysui_gadgets.utils.package_cache import PackageCache, cached_entries, module_map, network_root
+from pysui_gadgets.package.cmds import lists, structs, funcs, search, graph, diff, records, render
 
 
 def package(client: SyncClient, args: argparse.Namespace) -> Union[ValueError, SuiMovePackage]:
-    """package Retrieve SUI move package from chain.
+    """package Retrieve SUI move package from cache or chain.
 
     :param client: Synchronous Client
     :type client: SuiClient
-    :param args: Holds the address of package
+    :param args: Holds the address of package and cache choice
     :type args: argparse.Namespace
     :raises ValueError: If error returned from client
     :return: Package's meta data
     :rtype: Union[ValueError, SuiMovePackage]
     """
-    result = client.get_package(args.move_package_id)
+    result = PackageCache(client, enabled=not args.no_cache, from_bytecode=args.from_bytecode).get_package(
+        args.move_package_id
+    )
     if result.is_ok():
         return result.result_data
     raise ValueError(f"Failed retrieving package {args.move_package_id} with return {result.result_string}")
 
 
+def raw_package(client: SyncClient, args: argparse.Namespace) -> dict:
+    """raw_package Retrieve SUI move package's normalized modules dictionary from cache or chain.
+
+    :param client: Synchronous Client
+    :type client: SuiClient
+    :param args: Holds the address of package and cache choice
+    :type args: argparse.Namespace
+    :raises ValueError: If error returned from client
+    :return: Package's normalized modules
+    :rtype: dict
+    """
+    result = PackageCache(client, enabled=not args.no_cache, from_bytecode=args.from_bytecode).raw_package(
+        args.move_package_id
+    )
+    if result.is_ok():
+        return result.result_data
+    raise ValueError(f"Failed retrieving package {args.move_package_id} with return {result.result_string}")
+
+
+def module_names(client: SyncClient, package_id: ObjectID) -> list[str]:
+    """module_names Retrieve only the module names of a SUI move package.
+
+    Reads the package object's BCS module map instead of normalizing every module.
+
+    :param client: Synchronous Client
+    :type client: SuiClient
+    :param package_id: The address of package
+    :type package_id: ObjectID
+    :raises ValueError: If error returned from client or object is not a package
+    :return: Package's module names
+    :rtype: list[str]
+    """
+    return list(module_map(client, package_id).keys())
+
+
+def fetch_packages(
+    client: SyncClient, args: argparse.Namespace, fetch: Callable[[SyncClient, argparse.Namespace], Any]
+) -> Iterator[tuple[argparse.Namespace, Union[ValueError, Any]]]:
+    """fetch_packages Concurrently fetch each package of args.
+
+    :param client: Synchronous Client
+    :type client: SuiClient
+    :param args: Holds the addresses of packages and the number of concurrent fetches
+    :type args: argparse.Namespace
+    :param fetch: Called with the client and a copy of args holding a single package address
+    :type fetch: Callable[[SyncClient, argparse.Namespace], Any]
+    :return: Per package args and the fetch result, or the ValueError raised, in package order
+    :rtype: Iterator[tuple[argparse.Namespace, Union[ValueError, Any]]]
+    """
+    package_args = [argparse.Namespace(**{**vars(args), "move_package_id": x}) for x in args.move_package_id]
+
+    def _fetch(pargs: argparse.Namespace) -> Union[ValueError, Any]:
+        try:
+            return fetch(client, pargs)
+        except ValueError as verr:
+            return verr
+
+    with ThreadPoolExecutor(max_workers=max(1, min(args.workers, len(package_args)))) as executor:
+        yield from zip(package_args, executor.map(_fetch, package_args))
+
+
+def package_search(cfg: SuiConfig, args: argparse.Namespace) -> None:
+    """package_search Search the cached packages, caching any packages of args first.
+
+    :param cfg: The configuration of the network searched
+    :type cfg: SuiConfig
+    :param args: Holds the optional package addresses and the search criteria
+    :type args: argparse.Namespace
+    """
+    packages = None
+    if args.move_package_id:
+        # The search reads the cache, so it is always written
+        args.no_cache = False
+        for _, result in fetch_packages(SyncClient(cfg), args, raw_package):
+            if isinstance(result, ValueError):
+                print(f"{result}")
+        packages = {x.value for x in args.move_package_id}
+
+    root = network_root(cfg.rpc_url)
+    index = search.SearchIndex.load(root / search.INDEX_FILE)
+    if index.update(cached_entries(root)):
+        index.save()
+    docs = index.search(
+        text=args.text,
+        param=args.param,
+        returns=args.returns,
+        abilities=args.abilities,
+        kind=args.kind,
+        packages=packages,
+    )
+    search.print_search_results(docs, args)
+
+
 def main() -> None:
     """Main entry point."""
     arg_line = sys.argv[1:].copy()
@@ -67,21 +164,68 @@ def main() -> None:
     else:
         cfg = SuiConfig.default_config()
 
-    sui_package = package(SyncClient(cfg), parsed)
     cmd = parsed.subcommand
     vars(parsed).pop("subcommand")
-
-    match cmd:
-        case "listmods":
-            lists.print_module_list(sui_package.modules, parsed)
-        case "genfuncs":
-            parsed.excludes = set(parsed.excludes) if parsed.excludes else set()
-            parsed.includes = set(parsed.includes) if parsed.includes else set()
-            funcs.print_function_signatures(sui_package.modules, parsed)
-        case "genstructs":
-            parsed.excludes = set(parsed.excludes) if parsed.excludes else set()
-            parsed.includes = set(parsed.includes) if parsed.includes else set()
-            structs.print_module_structs(sui_package.modules, parsed)
+    if cmd == "search":
+        package_search(cfg, parsed)
+        return
+
+    client = SyncClient(cfg)
+    if cmd == "structgraph":
+        struct_graph = graph.StructGraph(
+            client, workers=parsed.workers, use_cache=not parsed.no_cache, from_bytecode=parsed.from_bytecode
+        ).build(
+            [x.value for x in parsed.move_package_id],
+            includes=set(parsed.includes or []),
+            struct_names=set(parsed.struct_names or []),
+            max_depth=parsed.max_depth,
+        )
+        graph.print_struct_graph(struct_graph, parsed)
+        return
+    if cmd == "diff":
+        (_, old_result), (_, new_result) = fetch_packages(client, parsed, raw_package)
+        for result in (old_result, new_result):
+            if isinstance(result, ValueError):
+                print(f"{result}")
+                return
+        diff.print_abi_diff(diff.AbiDiff.compare(old_result, new_result), parsed)
+        return
+    parsed.excludes = set(getattr(parsed, "excludes", None) or [])
+    parsed.includes = set(getattr(parsed, "includes", None) or [])
+
+    # Name only queries skip fetching the normalized package
+    if cmd == "listmods":
+        fetch = lambda c, a: module_names(c, a.move_package_id)  # pylint: disable=unnecessary-lambda-assignment
+    else:
+        fetch = package
+
+    if cmd in ("genfuncs", "genstructs") and parsed.output_format in records.FORMATS:
+        with records.RecordWriter(parsed.output_format) as writer:
+            renderer = render.SignatureRenderer()
+            for pargs, result in fetch_packages(client, parsed, fetch):
+                if isinstance(result, ValueError):
+                    print(f"{result}", file=sys.stderr)
+                elif cmd == "genfuncs":
+                    funcs.print_function_signatures(result.modules, pargs, writer, renderer)
+                else:
+                    structs.print_module_structs(result.modules, pargs, writer, renderer)
+                # Each package's records are out before the next is waited on
+                writer.flush()
+        return
+
+    for pargs, result in fetch_packages(client, parsed, fetch):
+        if isinstance(result, ValueError):
+            print(f"{result}")
+            continue
+        match cmd:
+            case "listmods":
+                lists.print_module_list(result, pargs)
+            case "genfuncs":
+                print(f"\nPackage: {pargs.move_package_id}")
+                funcs.print_function_signatures(result.modules, pargs)
+            case "genstructs":
+                print(f"\nPackage: {pargs.move_package_id}")
+                structs.print_module_structs(result.modules, pargs)
 
 
 if __name__ == "__main__":
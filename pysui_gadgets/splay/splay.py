@@ -15,6 +15,7 @@
 
 import sys
 import base64
+import logging
 from typing import Callable, Optional, Union
 from pysui import (
     SyncClient,
@@ -26,12 +27,14 @@ from pysui import (
 )
 from pysui.sui.sui_txn import SyncTransaction
 from pysui.sui.sui_types import bcs
-from pysui.sui.sui_utils import partition
 from pysui.sui.sui_txresults.single_tx import SuiCoinObjects, SuiCoinObject
 from pysui.sui.sui_txresults.complex_tx import TxInspectionResult
 
 from pysui_gadgets.utils.cmdlines import splay_parser
 from pysui_gadgets.utils.exec_helpers import add_owner_to_gas_object
+from pysui_gadgets.utils.chunking import ChunkController, merge_ceiling, merge_in_chunks
+from pysui_gadgets.utils.bulk import BulkSigner, bulk_merge
+from pysui_gadgets.utils.templates import MergeTemplate
 
 # Maximum coin inputs to merge to balance cost
 
@@ -82,6 +85,9 @@ def _coin_merge(
     coins: list[ObjectID],
     threshold: int,
     call_fn: Callable[[SyncTransaction, Optional[str]], SuiRpcResult],
+    controller: Optional[ChunkController] = None,
+    signer: Optional[BulkSigner] = None,
+    template: Optional[MergeTemplate] = None,
 ) -> Union[SuiCoinObject, SuiRpcResult]:
     """Coin merge as defined or all for owner."""
     merge_required = True
@@ -113,26 +119,20 @@ def _coin_merge(
 
     if merge_required:
         print(f"Merging {len(from_coins)} coins to {to_coin.object_id}")
-        if len(from_coins) <= threshold:
+        if signer:
+            _, from_coins = bulk_merge(client, owner, from_coins, threshold, signer)
+
+        def _submit(chunk: list) -> SuiRpcResult:
+            if template:
+                return template.execute(chunk, to_coin.object_id)
             txn = SyncTransaction(client=client, initial_sender=owner)
-            _ = txn.merge_coins(merge_to=txn.gas, merge_from=from_coins)
-            res = call_fn(txn, to_coin.object_id)
-            if not res.is_ok():
-                print("Failure on coin merge")
-                return res
-        else:
-            converted = 0
-            for chunk in list(partition(from_coins, threshold)):
-                txn = SyncTransaction(client=client, initial_sender=owner)
-                _ = txn.merge_coins(merge_to=txn.gas, merge_from=chunk)
-                res = call_fn(txn, to_coin.object_id)
-                if res.is_ok():
-                    converted += len(chunk)
-                else:
-                    print(
-                        f"Failure on coin in range {converted} -> {res.result_string}"
-                    )
-                    return res
+            _ = txn.merge_coins(merge_to=txn.gas, merge_from=chunk)
+            return call_fn(txn, to_coin.object_id)
+
+        converted, res = merge_in_chunks(from_coins, controller or ChunkController.fixed(threshold), _submit)
+        if res:
+            print(f"Failure on coin in range {converted} -> {res.result_string}")
+            return res
     return to_coin
 
 
@@ -174,6 +174,52 @@ def _splay_out(
     return result
 
 
+def splay_coins(
+    client: SyncClient,
+    owner: SuiAddress,
+    coins: Optional[list[ObjectID]],
+    threshold: int,
+    self_count: int,
+    addresses: Optional[list[SuiAddress]],
+    *,
+    inspect: bool = False,
+    controller: Optional[ChunkController] = None,
+    signer: Optional[BulkSigner] = None,
+    template: Optional[MergeTemplate] = None,
+) -> SuiRpcResult:
+    """splay_coins Merge the owner's coins to a primary and split it across addresses.
+
+    :param client: Synchronous Client
+    :type client: SyncClient
+    :param owner: Owner of the coins
+    :type owner: SuiAddress
+    :param coins: Explicit coins to merge, the first is the primary, or None for all of the owner's
+    :type coins: Optional[list[ObjectID]]
+    :param threshold: Coins merged per transaction
+    :type threshold: int
+    :param self_count: Coins split to the owner, or 0 to split to addresses
+    :type self_count: int
+    :param addresses: Addresses split to, or None for every configured address
+    :type addresses: Optional[list[SuiAddress]]
+    :param inspect: Inspect the transactions instead of executing them, defaults to False
+    :type inspect: bool, optional
+    :param controller: Chunk size controller, defaults to fixed threshold chunks
+    :type controller: Optional[ChunkController], optional
+    :param signer: Parallel signer of independent merge chunks, defaults to None
+    :type signer: Optional[BulkSigner], optional
+    :param template: Merge transaction template, defaults to None
+    :type template: Optional[MergeTemplate], optional
+    :return: The failed merge or the splay result
+    :rtype: SuiRpcResult
+    """
+    call_fn = _inspect_only if inspect else _execute
+    primary = _coin_merge(client, owner, coins, threshold, call_fn, controller, signer, template)
+    if isinstance(primary, SuiRpcResult):
+        return primary
+    print(f"Ready to splay {primary.object_id}")
+    return _splay_out(client, owner, primary, self_count, addresses, call_fn)
+
+
 def main():
     """Main entry point."""
     # Parse module meta data pulling out relevant content
@@ -191,31 +237,35 @@ def main():
         cfg = SuiConfig.default_config()
     # Setyup client
     client = SyncClient(cfg)
-    # Merge any/all coins
-    primary = _coin_merge(
+    controller = None
+    signer = None
+    if parsed.adaptive or parsed.bulk:
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if parsed.adaptive:
+        controller = ChunkController(parsed.threshold, maximum=merge_ceiling(client))
+    template = None
+    if not parsed.inspect:
+        template = MergeTemplate(client, parsed.owner)
+        if parsed.bulk:
+            signer = BulkSigner(cfg, parsed.owner, parsed.workers)
+    # Merge any/all coins and splay the primary
+    res = splay_coins(
         client,
         parsed.owner,
         parsed.coins,
         parsed.threshold,
-        _inspect_only if parsed.inspect else _execute,
+        parsed.self_count,
+        parsed.addresses,
+        inspect=parsed.inspect,
+        controller=controller,
+        signer=signer,
+        template=template,
     )
-    if isinstance(primary, SuiRpcResult):
-        print(f"Failed {primary.result_string}")
-    else:
-        print(f"Ready to splay {primary.object_id}")
-        res = _splay_out(
-            client,
-            parsed.owner,
-            primary,
-            parsed.self_count,
-            parsed.addresses,
-            _inspect_only if parsed.inspect else _execute,
-        )
-        if isinstance(res, SuiRpcResult):
-            if res.is_ok():
-                print(res.result_data.to_json(indent=2))
-            else:
-                print(res.result_string)
+    if isinstance(res, SuiRpcResult):
+        if res.is_ok():
+            print(res.result_data.to_json(indent=2))
+        else:
+            print(res.result_string)
 
 
 if __name__ == "__main__":
@@ -15,20 +15,49 @@
 
 
 import sys
+import time
+import logging
 import argparse
+from typing import Optional
 
 
-from pysui import SyncClient, SuiConfig, handle_result
-from pysui.sui.sui_txn import SyncTransaction
-from pysui.sui.sui_utils import partition
+from pysui import SyncClient, SuiConfig, SuiAddress, SuiRpcResult, handle_result
+from pysui.sui.sui_types.scalars import SuiString
+from pysui.sui.sui_builders.get_builders import GetAllCoinBalances, GetCoinTypeBalance
 from pysui_gadgets.utils.cmdlines import to_one_parser
 from pysui_gadgets.utils.exec_helpers import add_owner_to_gas_object
+from pysui_gadgets.utils.chunking import ChunkController, merge_ceiling, merge_in_chunks
+from pysui_gadgets.utils.bulk import BulkSigner, bulk_merge
+from pysui_gadgets.utils.templates import MergeTemplate
 
 
-def _join_coins(client: SyncClient, args: argparse.Namespace):
-    """Using PayAllSui builder, join all mists from all gas object to one for an address."""
+_SUI_COIN_TYPES: set[str] = {"0x2::sui::SUI", f"0x{'0' * 63}2::sui::SUI"}
+
+
+def _other_coin_types(client: SyncClient, address: SuiAddress) -> dict[str, list]:
+    """Fetch coins of every non SUI coin type the address holds more than one of."""
+    balances = handle_result(client.execute(GetAllCoinBalances(owner=address))).items
+    return {
+        x.coin_type: handle_result(client.get_coin(SuiString(x.coin_type), address, True)).data
+        for x in balances
+        if x.coin_type not in _SUI_COIN_TYPES and int(x.coin_object_count) > 1
+    }
+
+
+def join_coins(client: SyncClient, args: argparse.Namespace):
+    """join_coins Merge all of an address's SUI coins, and optionally every other coin type, to one coin each.
+
+    Coins are merged in chunks, fixed at the merge threshold or sized by an AIMD controller with
+    --adaptive, gas paid by the primary coin. With --bulk the coins are first merged in parallel
+    signed chunks.
+
+    :param client: Synchronous Client
+    :type client: SyncClient
+    :param args: Holds the address, primary coin, merge threshold and merge options
+    :type args: argparse.Namespace
+    """
     gas_res: list = handle_result(client.get_gas(args.address, True)).data
-    if len(gas_res) < 2:
+    if not gas_res or (len(gas_res) < 2 and not args.all_types):
         print("Can't join with less than 2 coins")
         return
     # Resolve primary by argument or selection
@@ -40,28 +69,99 @@ def _join_coins(client: SyncClient, args: argparse.Namespace):
         gas_res = gas_res[1:]
     owner = args.address.address
     gas_res = [add_owner_to_gas_object(owner, x) for x in gas_res]
-    converted = 0
+    bulk_merged = 0
+    if args.bulk and len(gas_res) > 1:
+        # Independent chunks signed in parallel, then fold the chunk heads to primary
+        signer = BulkSigner(client.config, args.address, args.workers)
+        bulk_merged, gas_res = bulk_merge(client, args.address, gas_res, args.merge_threshold, signer)
 
-    if len(gas_res) <= args.merge_threshold:
-        txn = SyncTransaction(client=client, initial_sender=args.address)
-        _ = txn.merge_coins(merge_to=txn.gas, merge_from=gas_res)
-        result = txn.execute(use_gas_object=primary.object_id)
+    # Entries of (coin type, coin) where None is SUI merged to the gas coin
+    entries: list[tuple] = [(None, x) for x in gas_res]
+    merge_to: dict = {None: None}
+    if args.all_types:
+        for coin_type, coins in _other_coin_types(client, args.address).items():
+            merge_to[coin_type] = coins[0].object_id
+            entries.extend((coin_type, add_owner_to_gas_object(owner, x)) for x in coins[1:])
+
+    template = MergeTemplate(client, args.address)
+
+    def _submit(chunk: list) -> SuiRpcResult:
+        # One MergeCoins per coin type in the chunk, gas paid once by primary
+        groups: dict = {}
+        for coin_type, coin in chunk:
+            groups.setdefault(coin_type, []).append(coin)
+        return template.execute_groups([(merge_to[x], y) for x, y in groups.items()], primary.object_id)
+
+    if args.adaptive:
+        ceiling = merge_ceiling(client)
+        # Every coin type in a chunk adds its merge to coin as an input
+        controller = ChunkController(args.merge_threshold, maximum=ceiling // 2 if args.all_types else ceiling)
     else:
-        # Partition the gas_res into _MAX_INPUTS chunks
-        for chunk in list(partition(gas_res, args.merge_threshold)):
-            chunk_count = len(chunk)
-            txn = SyncTransaction(client=client, initial_sender=args.address)
-            _ = txn.merge_coins(merge_to=txn.gas, merge_from=chunk)
-            result = txn.execute(use_gas_object=primary.object_id)
-            if result.is_ok():
-                converted += chunk_count
-            else:
-                print(f"Failure on coin in range {converted} -> {result.result_string}")
-                return
-    print(f"Succesfully merged {converted} coins to {primary.object_id}")
+        controller = ChunkController.fixed(args.merge_threshold)
+    converted, failed = merge_in_chunks(entries, controller, _submit)
+    if failed:
+        print(f"Failure on coin in range {bulk_merged + converted} -> {failed.result_string}")
+        return
+    print(f"Succesfully merged {bulk_merged + converted} coins to {primary.object_id}")
+    for coin_type, coin_id in merge_to.items():
+        if coin_type:
+            print(f"Merged {coin_type} coins to {coin_id}")
     print(handle_result(client.get_object(primary.object_id)).to_json(indent=2))
 
 
+def _coin_count(client: SyncClient, args: argparse.Namespace) -> Optional[int]:
+    """Count of coins the watcher consolidates, None if the node could not be queried.
+
+    With all coin types each type's coins beyond the one merged to are counted, a single
+    coin of a type leaves nothing to consolidate.
+    """
+    if args.all_types:
+        result = client.execute(GetAllCoinBalances(owner=args.address))
+        if result.is_ok():
+            return sum(int(x.coin_object_count) - 1 for x in result.result_data.items)
+    else:
+        result = client.execute(GetCoinTypeBalance(owner=args.address))
+        if result.is_ok():
+            return int(result.result_data.coin_object_count)
+    print(f"Unable to fetch coin count: {result.result_string}")
+    return None
+
+
+def _consolidate(client: SyncClient, args: argparse.Namespace, count: int) -> Optional[int]:
+    """Join coins, reporting rather than raising errors, and return the coin count afterwards."""
+    print(f"{count} coins at {time.strftime('%Y-%m-%d %H:%M:%S')}, consolidating")
+    try:
+        join_coins(client, args)
+    except Exception as exc:  # pylint: disable=broad-exception-caught
+        print(f"Consolidation failed: {exc}")
+    return _coin_count(client, args)
+
+
+def _watch(client: SyncClient, args: argparse.Namespace):
+    """Poll coin count, backing off while it is steady, and consolidate past the threshold."""
+    interval = args.interval
+    last_count: Optional[int] = None
+    print(f"Watching {args.address.address} for {args.fragment_threshold} or more coins")
+    while True:
+        count = _coin_count(client, args)
+        if count is not None and count >= args.fragment_threshold:
+            last_count = _consolidate(client, args, count)
+            # Back off while consolidation is failing or cannot lower the count
+            if last_count is None or last_count >= count:
+                interval = min(interval * 2, args.max_interval)
+                print(f"Coin count not reduced, retrying in {interval}s")
+            else:
+                interval = args.interval
+        else:
+            # Poll quickly while coins are arriving, back off while steady or unreachable
+            if count is not None and (last_count is None or count > last_count):
+                interval = args.interval
+            else:
+                interval = min(interval * 2, args.max_interval)
+            last_count = count
+        time.sleep(interval)
+
+
 def main():
     """Main entry point."""
     # Parse module meta data pulling out relevant content
@@ -73,13 +173,21 @@ def main():
         cfg_file = True
         arg_line = arg_line[1:]
     parsed = to_one_parser(arg_line)
+    if parsed.adaptive or parsed.bulk:
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
     if cfg_file:
         cfg = SuiConfig.sui_base_config()
     else:
         cfg = SuiConfig.default_config()
 
     # Run the job
-    _join_coins(SyncClient(cfg), parsed)
+    if parsed.watch:
+        try:
+            _watch(SyncClient(cfg), parsed)
+        except KeyboardInterrupt:
+            print("Watch stopped")
+    else:
+        join_coins(SyncClient(cfg), parsed)
 
 
 if __name__ == "__main__":
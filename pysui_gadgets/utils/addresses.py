@@ -0,0 +1,27 @@
+#    Copyright  Frank V. Castellucci
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+# -*- coding: utf-8 -*-
+
+"""pysui-gadget: address helpers."""
+
+
+def short_address(address: str) -> str:
+    """Short form 0x address, leading zeros removed, of a hex address with or without 0x.
+
+    The same package may be referred to in either form, compare addresses in this one.
+
+    :param address: The hex address
+    :type address: str
+    :return: The short form address
+    :rtype: str
+    """
+    return "0x" + ((address[2:] if address.startswith("0x") else address).lstrip("0") or "0")
@@ -0,0 +1,151 @@
+#    Copyright  Frank V. Castellucci
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+# -*- coding: utf-8 -*-
+
+"""pysui-gadget: bulk transaction signing.
+
+Builds independent merge transactions up front, signs their serialized bytes
+across a process pool and submits the pre-signed bytes.
+"""
+
+import base64
+import logging
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from pysui import SuiAddress, SuiConfig, SyncClient
+from pysui.sui.sui_builders.base_builder import SuiRequestType
+from pysui.sui.sui_builders.exec_builders import ExecuteTransaction
+from pysui.sui.sui_crypto import keypair_from_keystring
+from pysui.sui.sui_txresults.single_tx import SuiCoinObject
+from pysui.sui.sui_types.collections import SuiArray
+from pysui.sui.sui_types.scalars import SuiSignature
+
+from pysui_gadgets.utils.templates import MergeTemplate, object_reference
+
+logger = logging.getLogger("pysui_gadgets.bulk")
+
+# Headroom over the dry-run estimate applied to every chunk's budget
+_BUDGET_MARGIN: float = 1.2
+
+
+def _sign_batch(keystring: str, tx_batch: list[str]) -> list[str]:
+    """Sign a batch of base64 transaction bytes in a worker process."""
+    keypair = keypair_from_keystring(keystring)
+    return [keypair.new_sign_secure(tx_bytes).value for tx_bytes in tx_batch]
+
+
+class BulkSigner:
+    """Signs transaction bytes for an address across a process pool."""
+
+    def __init__(self, config: SuiConfig, address: SuiAddress, workers: Optional[int] = None):
+        """Initialize signer.
+
+        :param config: The configuration holding the address keypair
+        :type config: SuiConfig
+        :param address: The signing address
+        :type address: SuiAddress
+        :param workers: Number of signing processes, defaults to os.cpu_count()
+        :type workers: Optional[int], optional
+        """
+        self.address = address
+        self.workers = workers or os.cpu_count() or 1
+        self._keystring = config.keypair_for_address(address).serialize()
+
+    def sign(self, tx_bytes: list[str]) -> list[str]:
+        """Sign base64 transaction bytes, preserving order.
+
+        :param tx_bytes: The base64 transaction data to sign
+        :type tx_bytes: list[str]
+        :return: The base64 signatures
+        :rtype: list[str]
+        """
+        if len(tx_bytes) < 2 or self.workers == 1:
+            return _sign_batch(self._keystring, tx_bytes)
+        batch_size = math.ceil(len(tx_bytes) / self.workers)
+        batches = [tx_bytes[i : i + batch_size] for i in range(0, len(tx_bytes), batch_size)]
+        signatures: list[str] = []
+        with ProcessPoolExecutor(max_workers=len(batches)) as executor:
+            for signed in executor.map(_sign_batch, [self._keystring] * len(batches), batches):
+                signatures.extend(signed)
+        return signatures
+
+
+def bulk_merge(
+    client: SyncClient,
+    owner: SuiAddress,
+    coins: list[SuiCoinObject],
+    chunk_size: int,
+    signer: BulkSigner,
+) -> tuple[int, list[str]]:
+    """Merge coins in chunks where each chunk pays gas with, and merges to, its richest coin.
+
+    The chunks share no objects so all transactions are built and signed before any is
+    submitted. Coins of chunks that are too poor to pay, or whose transaction fails, are
+    returned with the chunk heads for the caller to merge conventionally.
+
+    :param client: The client to submit with
+    :type client: SyncClient
+    :param owner: The owner and signer of the coins
+    :type owner: SuiAddress
+    :param coins: The coins to merge, with owner set (see add_owner_to_gas_object)
+    :type coins: list[SuiCoinObject]
+    :param chunk_size: Coins merged per transaction, including the paying coin
+    :type chunk_size: int
+    :param signer: The process pool signer
+    :type signer: BulkSigner
+    :return: Count of coins merged in bulk and coin ids still to be merged
+    :rtype: tuple[int, list[str]]
+    """
+    if len(coins) < 2:
+        return 0, [x.object_id for x in coins]
+    template = MergeTemplate(client, owner)
+    chunk_size = max(2, chunk_size)
+    ordered = sorted(coins, key=lambda x: int(x.balance), reverse=True)
+    chunks = [ordered[i : i + chunk_size] for i in range(0, len(ordered), chunk_size)]
+
+    # One dry-run of a full chunk establishes the budget for all
+    try:
+        budget = int(template.budget(template.kind_bytes(chunks[0][1:])) * _BUDGET_MARGIN)
+    except ValueError as verr:
+        logger.warning("Bulk merge %s", verr)
+        return 0, [x.object_id for x in coins]
+
+    remaining: list[str] = []
+    built: list[tuple[list[SuiCoinObject], str]] = []
+    for chunk in chunks:
+        remaining.append(chunk[0].object_id)
+        if len(chunk) == 1 or int(chunk[0].balance) < budget:
+            remaining.extend(x.object_id for x in chunk[1:])
+        else:
+            tx_data = template.transaction_bytes(template.kind_bytes(chunk[1:]), object_reference(chunk[0]), budget)
+            built.append((chunk, base64.b64encode(tx_data).decode()))
+
+    merged = 0
+    signatures = signer.sign([x[1] for x in built])
+    for (chunk, tx_b64), signature in zip(built, signatures):
+        result = client.execute(
+            ExecuteTransaction(
+                tx_bytes=tx_b64,
+                signatures=SuiArray([SuiSignature(signature)]),
+                request_type=SuiRequestType.WAITFORLOCALEXECUTION,
+            )
+        )
+        if not result.is_ok() or not result.result_data.succeeded:
+            reason = result.result_string if not result.is_ok() else result.result_data.status
+            logger.warning("Bulk merge to %s failed: %s", chunk[0].object_id, reason)
+            remaining.extend(x.object_id for x in chunk[1:])
+        else:
+            merged += len(chunk) - 1
+    return merged, remaining
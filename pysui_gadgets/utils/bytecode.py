@@ -0,0 +1,450 @@
+#    Copyright  Frank V. Castellucci
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+# -*- coding: utf-8 -*-
+
+"""pysui-gadget: Move module bytecode deserialization.
+
+Deserializes many modules across a process pool. Modules are sent to workers as
+raw bytes in one batch per worker. Unpickling deserialized tables costs about as
+much as deserializing them, so workers can instead apply an analysis and return
+only its, compact, result.
+
+Results can be cached on disk keyed by the sha256 of each module's bytecode, so
+modules seen before, such as framework dependencies, are not decoded again.
+
+Modules are given either as bytes or as paths of compiled ``.mv`` files, which
+are memory mapped and read in place rather than copied into memory.
+
+With no deserialization form, modules are read lazily: only the table directory
+is parsed up front and each table is decoded when first accessed.
+
+Compiled modules of Move projects are cached by a hash of the project's manifest,
+lock file and sources, and those of its local dependencies, with the version of
+the sui binary, so unchanged projects are not rebuilt.
+"""
+
+import base64
+import functools
+import hashlib
+import math
+import mmap
+import os
+import pickle
+import re
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, Union, get_type_hints
+
+import pysui.version
+from pysui.sui.sui_constants import PYSUI_EXEC_ENV
+from pysui.sui_move.bin_reader.module_reader import ModuleReader
+from pysui.sui_move.bin_reader.reader import BinaryReader
+from pysui.sui_move.module.deserialize import Deserialize, RawModuleContent, deserialize
+
+try:
+    # Table type to (deserializer, RawModuleContent attribute), private to pysui so may go away
+    from pysui.sui_move.module.deserialize import _DESERIALIZE_JUMP
+except ImportError:
+    _DESERIALIZE_JUMP = {}
+
+from pysui_gadgets.utils.package_cache import atomic_write, default_cache_dir, read_entry, write_entry
+from pysui_gadgets.version import __version__ as gadget_ver
+
+# Below this much bytecode, process start up and pickling cost more than the pool saves
+_POOL_THRESHOLD: int = 256 * 1024
+
+
+# Module bytecode, or the path of a compiled module file
+ModuleSource = Union[bytes, Path]
+
+
+class _MappedReader(BinaryReader):
+    """Reads directly from a memory mapped file instead of a copy of its bytes."""
+
+    def __init__(self, source: str, data: mmap.mmap) -> None:
+        """Use the map itself as the stream, it reads, seeks and tells as BytesIO does."""
+        # BinaryReader would copy data into a BytesIO, so it is given no bytes and its stream replaced
+        super().__init__(source, b"")
+        self.length = len(data)
+        self.reader = data
+
+
+class MappedModuleReader(ModuleReader, _MappedReader):
+    """ModuleReader over a memory mapped compiled module file."""
+
+
+# RawModuleContent attribute to its table type and deserializer, in RawModuleContent order
+_JUMPS: dict[str, tuple] = {y[1]: (x, y[0]) for x, y in _DESERIALIZE_JUMP.items() if y[0] is not None}
+_TABLES: dict[str, tuple] = {x: _JUMPS[x] for x in get_type_hints(RawModuleContent) if x in _JUMPS}
+
+
+class LazyModuleContent:
+    """Module tables, with RawModuleContent's attributes, each decoded on first access.
+
+    Only valid while the reader's bytes are, see deserialize_modules.
+    """
+
+    def __init__(self, reader: ModuleReader):
+        """Initialize from a reader, which has parsed the table directory.
+
+        :param reader: The module reader
+        :type reader: ModuleReader
+        """
+        self.reader = reader
+        self.magic = reader.MAGIC_WORD
+        self.version = reader.version
+        self.module_self = reader.self_index
+
+    def __getattr__(self, name: str) -> Any:
+        """Decode the table for a RawModuleContent attribute and keep it."""
+        if not _TABLES and not name.startswith("_") and name in get_type_hints(RawModuleContent):
+            # Without pysui's table handlers every table is decoded on the first access
+            self.__dict__.update(vars(deserialize(self.reader, Deserialize.ALL)))
+            return self.__dict__.get(name)
+        if name not in _TABLES:
+            raise AttributeError(f"{type(self).__name__} has no attribute {name}")
+        table_type, handler = _TABLES[name]
+        content = self.reader.build_content_for(table_type, handler)
+        setattr(self, name, content)
+        return content
+
+    def table_sizes(self) -> dict[str, int]:
+        """Byte size of every table, from the directory without decoding.
+
+        :return: RawModuleContent attribute to table size, 0 when absent, empty without pysui's table handlers
+        :rtype: dict[str, int]
+        """
+        cross_reference = self.reader.cross_reference
+        return {x: cross_reference[y[0]].length if y[0] in cross_reference else 0 for x, y in _TABLES.items()}
+
+
+@contextmanager
+def _module_reader(module: ModuleSource) -> Iterator[ModuleReader]:
+    """Reader of module bytes, or of a memory mapped module file kept open for the context."""
+    if isinstance(module, Path):
+        with open(module, "rb") as mfile, mmap.mmap(mfile.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield MappedModuleReader(str(module), mapped)
+    else:
+        yield ModuleReader("bytes", module)
+
+
+def deserialize_bytes(module: bytes, form: Deserialize = Deserialize.ALL) -> RawModuleContent:
+    """Deserialize one module's bytecode.
+
+    :param module: The module bytecode
+    :type module: bytes
+    :param form: Tables to deserialize, defaults to Deserialize.ALL
+    :type form: Deserialize, optional
+    :raises ValueError: If module is not valid Move bytecode
+    :return: The deserialized tables
+    :rtype: RawModuleContent
+    """
+    with _module_reader(module) as reader:
+        return deserialize(reader, form)
+
+
+def deserialize_file(module: Path, form: Deserialize = Deserialize.ALL) -> RawModuleContent:
+    """Deserialize a compiled module file through a memory map.
+
+    :param module: The .mv file path
+    :type module: Path
+    :param form: Tables to deserialize, defaults to Deserialize.ALL
+    :type form: Deserialize, optional
+    :raises ValueError: If module is empty or not valid Move bytecode
+    :return: The deserialized tables
+    :rtype: RawModuleContent
+    """
+    with _module_reader(module) as reader:
+        return deserialize(reader, form)
+
+
+def module_digest(module: ModuleSource) -> str:
+    """Hex sha256 of a module's bytecode, files are hashed through a memory map.
+
+    :param module: The module bytecode or .mv file path
+    :type module: ModuleSource
+    :return: The digest
+    :rtype: str
+    """
+    if isinstance(module, Path):
+        with open(module, "rb") as mfile, mmap.mmap(mfile.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return hashlib.sha256(mapped).hexdigest()
+    return hashlib.sha256(module).hexdigest()
+
+
+def _deserialize_batch(
+    modules: list[ModuleSource], form: Optional[Deserialize], analyze: Optional[Callable[[Any], Any]]
+) -> list[Any]:
+    """Deserialize, and optionally analyze, a batch of modules in a worker process."""
+    results: list[Any] = []
+    for module in modules:
+        with _module_reader(module) as reader:
+            content = LazyModuleContent(reader) if form is None else deserialize(reader, form)
+            results.append(content if analyze is None else analyze(content))
+    return results
+
+
+def _size(module: ModuleSource) -> int:
+    """Bytecode size of a module."""
+    return module.stat().st_size if isinstance(module, Path) else len(module)
+
+
+class ModuleCache:
+    """On disk cache of deserialized modules, or their analysis, keyed by bytecode hash."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, enabled: bool = True):
+        """Initialize cache.
+
+        :param cache_dir: Cache root, defaults to default_cache_dir()
+        :type cache_dir: Optional[Path], optional
+        :param enabled: When False never read or write, defaults to True
+        :type enabled: bool, optional
+        """
+        self.enabled = enabled
+        # Pickled tables are only valid for the deserializer and classes that wrote them
+        self.root = (cache_dir or default_cache_dir()) / "modules" / f"{pysui.version.__version__}-{gadget_ver}"
+
+    def _entry(self, digest: str, form: Optional[Deserialize], analyze: Optional[Callable]) -> Path:
+        """Entry path of a module's result for a deserialization form and analysis."""
+        kind = "LAZY" if form is None else form.name
+        if analyze is not None:
+            kind += f"-{analyze.__module__}.{analyze.__qualname__}"
+        return self.root / digest[:2] / f"{digest}.{kind}.pickle"
+
+    def get(self, digest: str, form: Optional[Deserialize], analyze: Optional[Callable] = None) -> Optional[Any]:
+        """Cached result for a module, None if not cached or unreadable.
+
+        :param digest: The module's bytecode digest, see module_digest
+        :type digest: str
+        :param form: Tables deserialized, None when lazily
+        :type form: Optional[Deserialize]
+        :param analyze: Analysis applied to the tables, defaults to None
+        :type analyze: Optional[Callable], optional
+        :return: The deserialized tables or their analysis
+        :rtype: Optional[Any]
+        """
+        if not self.enabled:
+            return None
+        try:
+            return pickle.loads(self._entry(digest, form, analyze).read_bytes())
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, IndexError, TypeError):
+            return None
+
+    def put(self, digest: str, form: Optional[Deserialize], analyze: Optional[Callable], result: Any) -> None:
+        """Store a module's result atomically.
+
+        :param digest: The module's bytecode digest, see module_digest
+        :type digest: str
+        :param form: Tables deserialized, None when lazily
+        :type form: Optional[Deserialize]
+        :param analyze: Analysis applied to the tables
+        :type analyze: Optional[Callable]
+        :param result: The deserialized tables or their analysis
+        :type result: Any
+        """
+        if not self.enabled:
+            return
+        with atomic_write(self._entry(digest, form, analyze), "wb") as tmp:
+            pickle.dump(result, tmp, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def deserialize_modules(
+    modules: list[ModuleSource],
+    workers: Optional[int] = None,
+    form: Optional[Deserialize] = Deserialize.ALL,
+    analyze: Optional[Callable[[Any], Any]] = None,
+    cache: Optional[ModuleCache] = None,
+) -> list[Any]:
+    """Deserialize modules' bytecode, across a process pool when there is enough.
+
+    :param modules: The modules' bytecode or .mv file paths
+    :type modules: list[ModuleSource]
+    :param workers: Number of processes, defaults to os.cpu_count()
+    :type workers: Optional[int], optional
+    :param form: Tables to deserialize, None to read tables lazily, defaults to Deserialize.ALL
+    :type form: Optional[Deserialize], optional
+    :param analyze: Module level function applied to each module's RawModuleContent, or LazyModuleContent,
+        in the worker, defaults to None
+    :type analyze: Optional[Callable[[Any], Any]], optional
+    :param cache: Only modules not in the cache are deserialized, defaults to None
+    :type cache: Optional[ModuleCache], optional
+    :raises ValueError: If a module is not valid Move bytecode, or form is None without analyze
+    :return: The deserialized tables, or their analysis when analyze is given, in modules order
+    :rtype: list[Any]
+    """
+    if form is None and analyze is None:
+        raise ValueError("Lazily read modules must be analyzed while their bytes are open")
+    # Positions of each distinct module, first source of each
+    positions: dict[str, list[int]] = {}
+    sources: dict[str, ModuleSource] = {}
+    for index, module in enumerate(modules):
+        digest = module_digest(module)
+        positions.setdefault(digest, []).append(index)
+        sources.setdefault(digest, module)
+    found: dict[str, Any] = {}
+    if cache:
+        found = {x: y for x in positions if (y := cache.get(x, form, analyze)) is not None}
+    pending = [x for x in positions if x not in found]
+    pending_sources = [sources[x] for x in pending]
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    if workers <= 1 or sum(_size(x) for x in pending_sources) < _POOL_THRESHOLD:
+        decoded = _deserialize_batch(pending_sources, form, analyze)
+    else:
+        batch_size = math.ceil(len(pending) / workers)
+        batches = [pending_sources[i : i + batch_size] for i in range(0, len(pending), batch_size)]
+        decoded = []
+        with ProcessPoolExecutor(max_workers=len(batches)) as executor:
+            for batch in executor.map(_deserialize_batch, batches, [form] * len(batches), [analyze] * len(batches)):
+                decoded.extend(batch)
+    for digest, result in zip(pending, decoded):
+        found[digest] = result
+        if cache:
+            cache.put(digest, form, analyze, result)
+    results: list[Any] = [None] * len(modules)
+    for digest, indexes in positions.items():
+        for index in indexes:
+            results[index] = found[digest]
+    return results
+
+
+def build_modules(build_dir: Path, dependencies: bool = False) -> list[Path]:
+    """Compiled module files of a sui move build output.
+
+    :param build_dir: A project, its build directory, a package's build directory or a bytecode_modules directory
+    :type build_dir: Path
+    :param dependencies: Include the modules of dependencies, defaults to False
+    :type dependencies: bool, optional
+    :return: The .mv file paths, sorted
+    :rtype: list[Path]
+    """
+    if build_dir.name == "bytecode_modules":
+        roots = [build_dir]
+    else:
+        roots = sorted(build_dir.glob("**/bytecode_modules"))
+    modules: list[Path] = []
+    for root in roots:
+        modules.extend(sorted(root.glob("*.mv")))
+        if dependencies:
+            modules.extend(sorted(root.glob("dependencies/*/*.mv")))
+    return modules
+
+
+def base64_modules(modules_b64: list[str]) -> list[bytes]:
+    """Decode base64 encoded modules.
+
+    :param modules_b64: The base64 encoded modules
+    :type modules_b64: list[str]
+    :return: The modules' bytecode
+    :rtype: list[bytes]
+    """
+    return [base64.b64decode(x) for x in modules_b64]
+
+
+# Project files, besides sources, a build depends on
+_PROJECT_FILES: tuple[str, ...] = ("Move.toml", "Move.lock")
+
+
+# Local path dependencies in a Move.toml, e.g. Dep = { local = "../dep" }
+_LOCAL_DEPENDENCY = re.compile(r'\blocal\s*=\s*"([^"]+)"')
+
+
+def _local_dependencies(project: Path) -> list[Path]:
+    """Folders of a Move project's local path dependencies."""
+    manifest = project / "Move.toml"
+    if not manifest.is_file():
+        return []
+    return [(project / x).resolve() for x in _LOCAL_DEPENDENCY.findall(manifest.read_text(encoding="utf8"))]
+
+
+@functools.lru_cache(maxsize=None)
+def sui_version() -> str:
+    """Version reported by the sui binary that builds projects, empty if it can not be run.
+
+    Run once per process.
+
+    :return: The sui --version output
+    :rtype: str
+    """
+    binary = os.environ.get(PYSUI_EXEC_ENV) or shutil.which("sui")
+    if not binary:
+        return ""
+    try:
+        result = subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=60, check=False)
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return result.stdout.strip()
+
+
+def source_digest(project: Path, toolchain: str = "") -> str:
+    """Hex sha256 of a Move project's location, manifest, lock file and sources, and those of its local dependencies.
+
+    :param project: The project folder
+    :type project: Path
+    :param toolchain: Identifies the compiler building the project, defaults to ""
+    :type toolchain: str, optional
+    :return: The digest
+    :rtype: str
+    """
+    digest = hashlib.sha256(toolchain.encode() + b"\0")
+    pending = [project.expanduser().resolve()]
+    seen: set[Path] = set()
+    while pending:
+        package = pending.pop()
+        if package in seen:
+            continue
+        seen.add(package)
+        digest.update(str(package).encode() + b"\0")
+        files = [package / x for x in _PROJECT_FILES if (package / x).is_file()]
+        files.extend(sorted(x for x in (package / "sources").rglob("*") if x.is_file()))
+        for source in files:
+            digest.update(source.relative_to(package).as_posix().encode() + b"\0")
+            digest.update(source.read_bytes())
+            digest.update(b"\0")
+        pending.extend(reversed(_local_dependencies(package)))
+    return digest.hexdigest()
+
+
+class BuildCache:
+    """On disk cache of Move projects' compiled modules keyed by source digest and sui version."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, enabled: bool = True):
+        """Initialize cache.
+
+        :param cache_dir: Cache root, defaults to default_cache_dir()
+        :type cache_dir: Optional[Path], optional
+        :param enabled: When False always build and never write, defaults to True
+        :type enabled: bool, optional
+        """
+        self.enabled = enabled
+        self.root = (cache_dir or default_cache_dir()) / "builds"
+
+    def modules(self, project: Path, build: Callable[[Path], list[str]]) -> list[str]:
+        """Base64 modules of a project, built only when its sources changed since last built.
+
+        :param project: The project folder
+        :type project: Path
+        :param build: Builds the project returning its base64 modules
+        :type build: Callable[[Path], list[str]]
+        :return: The base64 encoded modules
+        :rtype: list[str]
+        """
+        if not self.enabled:
+            return build(project)
+        entry = self.root / f"{source_digest(project, sui_version())}.json"
+        modules = read_entry(entry) if entry.exists() else None
+        if modules is None:
+            modules = build(project)
+            write_entry(entry, modules)
+        return modules
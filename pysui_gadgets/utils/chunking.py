@@ -0,0 +1,188 @@
+#    Copyright  Frank V. Castellucci
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+# -*- coding: utf-8 -*-
+
+"""pysui-gadget: coin merge chunk sizing.
+
+Provides an additive increase/multiplicative decrease (AIMD) controller for the
+number of coins merged per transaction and a driver that consumes coins with it.
+"""
+
+import logging
+import time
+from typing import Callable, Optional
+
+from pysui import SuiRpcResult, SyncClient
+from pysui.sui.sui_txresults.complex_tx import Effects
+
+logger = logging.getLogger("pysui_gadgets.chunking")
+
+
+class ChunkController:
+    """Grows chunk size while transactions succeed quickly, shrinks it on failures or spikes."""
+
+    def __init__(
+        self,
+        initial: int,
+        *,
+        minimum: int = 1,
+        maximum: Optional[int] = None,
+        increase: int = 1,
+        decrease: float = 0.5,
+        spike_factor: float = 2.0,
+        smoothing: float = 0.2,
+    ):
+        """Initialize controller.
+
+        :param initial: Starting chunk size
+        :type initial: int
+        :param minimum: Smallest chunk size, defaults to 1
+        :type minimum: int, optional
+        :param maximum: Largest chunk size, defaults to initial
+        :type maximum: Optional[int], optional
+        :param increase: Coins added to chunk size after a good transaction, defaults to 1
+        :type increase: int, optional
+        :param decrease: Chunk size multiplier on failure or spike, defaults to 0.5
+        :type decrease: float, optional
+        :param spike_factor: Ratio over smoothed latency or per coin gas considered a spike, defaults to 2.0
+        :type spike_factor: float, optional
+        :param smoothing: Weight of newest observation in the moving averages, defaults to 0.2
+        :type smoothing: float, optional
+        """
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum or initial)
+        self.size = min(max(initial, self.minimum), self.maximum)
+        self.increase = increase
+        self.decrease = decrease
+        self.spike_factor = spike_factor
+        self.smoothing = smoothing
+        self._latency: Optional[float] = None
+        self._coin_gas: Optional[float] = None
+
+    @classmethod
+    def fixed(cls, size: int) -> "ChunkController":
+        """Controller that never changes size and does not retry failures."""
+        return cls(size, minimum=size, maximum=size)
+
+    @property
+    def can_shrink(self) -> bool:
+        """True if a failed chunk can be retried at a smaller size."""
+        return self.size > self.minimum
+
+    def _smooth(self, average: Optional[float], observed: float) -> float:
+        """Exponentially weighted moving average."""
+        if average is None:
+            return observed
+        return average + self.smoothing * (observed - average)
+
+    def _resize(self, new_size: int, reason: str) -> None:
+        """Apply bounded size change and log the decision."""
+        new_size = min(max(new_size, self.minimum), self.maximum)
+        if new_size != self.size:
+            logger.info("Chunk size %d -> %d: %s", self.size, new_size, reason)
+            self.size = new_size
+
+    def record(
+        self,
+        chunk_len: int,
+        elapsed: float,
+        succeeded: bool,
+        gas_used: Optional[int] = None,
+    ) -> int:
+        """Feed the outcome of a chunk transaction to the controller.
+
+        :param chunk_len: Number of coins in the chunk
+        :type chunk_len: int
+        :param elapsed: Seconds taken to build and submit the transaction
+        :type elapsed: float
+        :param succeeded: Whether the chunk was merged
+        :type succeeded: bool
+        :param gas_used: Total gas used by the transaction, defaults to None
+        :type gas_used: Optional[int], optional
+        :return: The chunk size to use next
+        :rtype: int
+        """
+        if not succeeded:
+            self._resize(int(self.size * self.decrease), f"failure merging {chunk_len} coins")
+            return self.size
+        reasons = []
+        if self._latency is not None and elapsed > self._latency * self.spike_factor:
+            reasons.append(f"latency {elapsed:.3f}s over average {self._latency:.3f}s")
+        self._latency = self._smooth(self._latency, elapsed)
+        if gas_used:
+            coin_gas = gas_used / chunk_len
+            if self._coin_gas is not None and coin_gas > self._coin_gas * self.spike_factor:
+                reasons.append(f"gas per coin {coin_gas:.0f} over average {self._coin_gas:.0f}")
+            self._coin_gas = self._smooth(self._coin_gas, coin_gas)
+        if reasons:
+            self._resize(int(self.size * self.decrease), ", ".join(reasons))
+        elif chunk_len >= self.size:
+            self._resize(self.size + self.increase, f"merged {chunk_len} coins in {elapsed:.3f}s")
+        return self.size
+
+
+def merge_ceiling(client: SyncClient) -> int:
+    """Largest count of coins a single merge command may take under protocol constraints."""
+    constraints = client.protocol.transaction_constraints
+    # One input is reserved for the coin being merged to
+    return max(1, min(constraints.max_arguments, constraints.max_input_objects - 1))
+
+
+def _outcome(result: SuiRpcResult) -> tuple[bool, bool, Optional[int]]:
+    """Resolve success, whether the transaction executed, and gas used from execution or inspection results."""
+    if not result.is_ok():
+        return False, False, None
+    effects = getattr(result.result_data, "effects", None)
+    if isinstance(effects, Effects):
+        return effects.status.succeeded, True, effects.gas_used.total
+    return True, True, None
+
+
+def merge_in_chunks(
+    coins: list,
+    controller: ChunkController,
+    submit: Callable[[list], SuiRpcResult],
+) -> tuple[int, Optional[SuiRpcResult]]:
+    """Submit coins in controller sized chunks until all are merged.
+
+    A chunk that fails to build or submit is retried at the reduced size until the controller
+    can shrink no further. A chunk that executed and failed has charged gas, changing the version
+    of the gas coin the remaining chunks were built against, so merging stops there.
+
+    :param coins: The coins to merge
+    :type coins: list
+    :param controller: Chunk size controller
+    :type controller: ChunkController
+    :param submit: Builds and submits the transaction for a chunk
+    :type submit: Callable[[list], SuiRpcResult]
+    :return: Count of coins merged and the failing result, if any
+    :rtype: tuple[int, Optional[SuiRpcResult]]
+    """
+    converted = 0
+    while converted < len(coins):
+        chunk = coins[converted : converted + controller.size]
+        start = time.perf_counter()
+        try:
+            result = submit(chunk)
+        except ValueError as verr:
+            result = SuiRpcResult(False, str(verr), None)
+        elapsed = time.perf_counter() - start
+        succeeded, executed, gas_used = _outcome(result)
+        if succeeded:
+            converted += len(chunk)
+        elif executed or not controller.can_shrink:
+            if result.is_ok():
+                status = getattr(result.result_data, "status", "Execution failed")
+                result = SuiRpcResult(False, status, result.result_data)
+            return converted, result
+        controller.record(len(chunk), elapsed, succeeded, gas_used)
+    return converted, None
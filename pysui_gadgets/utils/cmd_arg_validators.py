@@ -16,7 +16,7 @@
 import sys
 import argparse
 from pathlib import Path
-from typing import Any, Sequence
+from typing import Any, Callable, Sequence
 from pysui import ObjectID, SuiAddress
 
 
@@ -28,6 +28,18 @@ def check_positive(value: str) -> int:
     return ivalue
 
 
+def check_min(minimum: int) -> Callable[[str], int]:
+    """Check for integers no less than minimum."""
+
+    def _check(value: str) -> int:
+        ivalue = int(value)
+        if ivalue < minimum:
+            raise argparse.ArgumentTypeError(f"{value} must be an int value of at least {minimum}")
+        return ivalue
+
+    return _check
+
+
 class ValidateAddress(argparse.Action):
     """Address validator."""
 
@@ -86,3 +98,27 @@ class ValidatePackageDir(argparse.Action):
         if not ppath.exists():
             parser.error(f"{str(ppath)} does not exist.")
         setattr(namespace, self.dest, ppath)
+
+
+class ValidatePackageFile(argparse.Action):
+    """Read ObjectIDs, one per line, from a file."""
+
+    def __call__(
+        self,
+        parser: argparse.ArgumentParser,
+        namespace: argparse.Namespace,
+        values: str | Sequence[Any] | None,
+        option_string: str | None = ...,
+    ) -> None:
+        """Validate."""
+        ppath = Path(values)
+        if not ppath.exists():
+            parser.error(f"{str(ppath)} does not exist.")
+        lines = [x.split("#", 1)[0].strip() for x in ppath.read_text(encoding="utf8").splitlines()]
+        try:
+            values = [ObjectID(x) for x in lines if x]
+        except ValueError as verr:
+            parser.error(f"{str(ppath)} contains an invalid address: {verr}")
+        if not values:
+            parser.error(f"{str(ppath)} contains no addresses.")
+        setattr(namespace, self.dest, values)
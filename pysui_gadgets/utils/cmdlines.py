@@ -14,7 +14,14 @@
 """pysui-gadget: DSL package command line parser."""
 import argparse
 
-from pysui_gadgets.utils.cmd_arg_validators import ValidateObjectID, ValidateAddress, ValidatePackageDir, check_positive
+from pysui_gadgets.utils.cmd_arg_validators import (
+    ValidateObjectID,
+    ValidateAddress,
+    ValidatePackageDir,
+    ValidatePackageFile,
+    check_positive,
+    check_min,
+)
 
 # For dsl gadget
 def dsl_parser(in_args: list) -> argparse.Namespace:
@@ -43,7 +50,7 @@ def dsl_parser(in_args: list) -> argparse.Namespace:
         required=False,
         nargs="+",
         type=str,
-        help="Exclude modules from DL generation",
+        help="Exclude modules from DL generation, glob patterns allowed",
     )
     command_group.add_argument(
         "-i",
@@ -52,7 +59,7 @@ def dsl_parser(in_args: list) -> argparse.Namespace:
         required=False,
         nargs="+",
         type=str,
-        help="Only include modules for DSL generation",
+        help="Only include modules for DSL generation, glob patterns allowed",
     )
 
     parser.add_argument(
@@ -79,6 +86,13 @@ def dsl_parser(in_args: list) -> argparse.Namespace:
         action="store_true",
         help="Generate async module otherwise default to synchrounous",
     )
+    parser.add_argument(
+        "--no-cache",
+        dest="no_cache",
+        required=False,
+        action="store_true",
+        help="Fetch package metadata from chain without reading or writing the local cache",
+    )
     return parser.parse_args(in_args if in_args else ["--help"])
 
 
@@ -114,7 +128,89 @@ def to_one_parser(in_args: list) -> argparse.Namespace:
         help="Sets the number of coins to merge at a time. Defaults to 10.",
         type=check_positive,
     )
-    return parser.parse_args(in_args if in_args else ["--help"])
+    parser.add_argument(
+        "--all-types",
+        dest="all_types",
+        required=False,
+        action="store_true",
+        help="Also merge coins of every other coin type owned, packed in the same transactions.",
+    )
+    parser.add_argument(
+        "--watch",
+        required=False,
+        action="store_true",
+        help="Keep running, consolidating whenever the coin count reaches the fragment threshold.",
+    )
+    parser.add_argument(
+        "--fragment-threshold",
+        dest="fragment_threshold",
+        required=False,
+        default=50,
+        help="Coin count that triggers consolidation in --watch mode, with --all-types the coins beyond one per type. "
+        "Defaults to 50.",
+        type=check_positive,
+    )
+    parser.add_argument(
+        "--interval",
+        required=False,
+        default=15,
+        help="Seconds between polls while coins are arriving in --watch mode. Defaults to 15.",
+        type=check_min(1),
+    )
+    parser.add_argument(
+        "--max-interval",
+        dest="max_interval",
+        required=False,
+        default=600,
+        help="Longest backoff in seconds between polls in --watch mode. Defaults to 600.",
+        type=check_min(1),
+    )
+    parser.add_argument(
+        "--adaptive",
+        required=False,
+        action="store_true",
+        help="Grow or shrink the merge threshold based on observed latency, gas and failures.",
+    )
+    parser.add_argument(
+        "--bulk",
+        dest="bulk",
+        required=False,
+        action="store_true",
+        help="Build all merge chunks up front and sign them in a process pool.",
+    )
+    parser.add_argument(
+        "--workers",
+        dest="workers",
+        required=False,
+        default=None,
+        help="Number of signing processes for --bulk. Defaults to cpu count.",
+        type=check_positive,
+    )
+    parsed = parser.parse_args(in_args if in_args else ["--help"])
+    if parsed.max_interval < parsed.interval:
+        parser.error("--max-interval must not be less than --interval")
+    return parsed
+
+
+def _add_package_ids(subp: argparse.ArgumentParser, required: bool = True) -> None:
+    """Add the package id or package file arguments of a package subcommand."""
+    id_group = subp.add_mutually_exclusive_group(required=required)
+    id_group.add_argument(
+        "-m",
+        "--move-package-id",
+        dest="move_package_id",
+        nargs="+",
+        help="One or more move package ObjectIDs on the chain",
+        action=ValidateObjectID,
+    )
+    id_group.add_argument(
+        "-f",
+        "--package-file",
+        dest="move_package_id",
+        metavar="PACKAGE_FILE",
+        help="File of move package ObjectIDs, one per line",
+        action=ValidatePackageFile,
+    )
 
 
 # for package gadget
@@ -126,22 +222,43 @@ def package_parser(in_args: list) -> argparse.Namespace:
     :return: Parse results
     :rtype: argparse.Namespace
     """
-    parser = argparse.ArgumentParser(add_help=True, usage="%(prog)s command [--command_options]")
+    parser = argparse.ArgumentParser(
+        add_help=True, usage="%(prog)s [--no-cache] [--from-bytecode] [-w WORKERS] command [--command_options]"
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="no_cache",
+        required=False,
+        action="store_true",
+        help="Fetch package metadata from chain without reading or writing the local cache",
+    )
+    parser.add_argument(
+        "--from-bytecode",
+        dest="from_bytecode",
+        required=False,
+        action="store_true",
+        help="Fetch module bytecode and normalize locally instead of fetching normalized modules",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        dest="workers",
+        required=False,
+        default=8,
+        help="Maximum packages fetched concurrently. Defaults to 8.",
+        type=check_positive,
+    )
 
     subparser = parser.add_subparsers(title="commands", help="")
 
     # Simple listing of modules in package
     subp = subparser.add_parser("listmods", help="List package's modules")
-    subp.add_argument(
-        "-m", "--move-package-id", required=True, help="The move package ObjectID on the chain", action=ValidateObjectID
-    )
+    _add_package_ids(subp)
     subp.set_defaults(subcommand="listmods")
 
     # Generate public entry or all function signatures for one or more package modules
     subp = subparser.add_parser("genfuncs", help="Generate module's function signatures")
-    subp.add_argument(
-        "-m", "--move-package-id", required=True, help="The move package ObjectID on the chain", action=ValidateObjectID
-    )
+    _add_package_ids(subp)
     subp.add_argument(
         "-n",
         "--nonentry-funcs-included",
@@ -150,6 +267,23 @@ def package_parser(in_args: list) -> argparse.Namespace:
         action="store_true",
         help="Include functions that are not entry points in signature generations",
     )
+    subp.add_argument(
+        "--format",
+        dest="output_format",
+        required=False,
+        default="text",
+        choices=["text", "json", "ndjson"],
+        help="Output format. Defaults to text.",
+    )
+    subp.add_argument(
+        "-t",
+        "--takes-type",
+        dest="takes",
+        required=False,
+        nargs="+",
+        type=str,
+        help="Only functions with a parameter of one of these type names, glob patterns allowed (e.g. 'Coin' 'Pool*')",
+    )
     command_group = subp.add_mutually_exclusive_group()
     command_group.add_argument(
         "-e",
@@ -158,7 +292,7 @@ def package_parser(in_args: list) -> argparse.Namespace:
         required=False,
         nargs="+",
         type=str,
-        help="Exclude modules from signature generation",
+        help="Exclude modules from signature generation, glob patterns allowed",
     )
     command_group.add_argument(
         "-i",
@@ -167,15 +301,13 @@ def package_parser(in_args: list) -> argparse.Namespace:
         required=False,
         nargs="+",
         type=str,
-        help="Only include modules for signature generation",
+        help="Only include modules for signature generation, glob patterns allowed",
     )
     subp.set_defaults(subcommand="genfuncs")
 
     # Informational displays about a package modules structures
     subp = subparser.add_parser("genstructs", help="Show module's struct information")
-    subp.add_argument(
-        "-m", "--move-package-id", required=True, help="The move package ObjectID on the chain", action=ValidateObjectID
-    )
+    _add_package_ids(subp)
     subp.add_argument(
         "-s",
         "--short-display",
@@ -184,6 +316,23 @@ def package_parser(in_args: list) -> argparse.Namespace:
         action="store_true",
         help="Print structure short form",
     )
+    subp.add_argument(
+        "--format",
+        dest="output_format",
+        required=False,
+        default="text",
+        choices=["text", "json", "ndjson"],
+        help="Output format. Defaults to text.",
+    )
+    subp.add_argument(
+        "-a",
+        "--abilities",
+        dest="abilities",
+        required=False,
+        nargs="+",
+        choices=["copy", "drop", "store", "key"],
+        help="Only structs having all of these abilities",
+    )
     command_group = subp.add_mutually_exclusive_group()
     command_group.add_argument(
         "-e",
@@ -192,7 +341,7 @@ def package_parser(in_args: list) -> argparse.Namespace:
         required=False,
         nargs="+",
         type=str,
-        help="Exclude modules from signature generation",
+        help="Exclude modules from signature generation, glob patterns allowed",
     )
     command_group.add_argument(
         "-i",
@@ -201,10 +350,116 @@ def package_parser(in_args: list) -> argparse.Namespace:
         required=False,
         nargs="+",
         type=str,
-        help="Only include modules for signature generation",
+        help="Only include modules for signature generation, glob patterns allowed",
     )
     subp.set_defaults(subcommand="genstructs")
 
+    # Search functions and structs of cached packages
+    subp = subparser.add_parser("search", help="Search functions and structs of packages")
+    _add_package_ids(subp, required=False)
+    subp.add_argument(
+        "-q",
+        "--query",
+        dest="text",
+        required=False,
+        help="Words that must all appear in module, name, signature or types",
+    )
+    subp.add_argument(
+        "-p",
+        "--param",
+        required=False,
+        help="Type a function parameter contains, e.g. '&mut Pool<T>'",
+    )
+    subp.add_argument(
+        "-r",
+        "--returns",
+        required=False,
+        help="Type a function return contains",
+    )
+    subp.add_argument(
+        "-a",
+        "--abilities",
+        required=False,
+        nargs="+",
+        choices=["copy", "drop", "store", "key"],
+        help="Abilities a struct has at least",
+    )
+    subp.add_argument(
+        "-k",
+        "--kind",
+        required=False,
+        choices=["function", "struct"],
+        help="Only search functions or structs",
+    )
+    subp.add_argument(
+        "-l",
+        "--limit",
+        required=False,
+        default=50,
+        help="Maximum matches printed, 0 for all. Defaults to 50.",
+        type=check_positive,
+    )
+    subp.set_defaults(subcommand="search")
+
+    # Transitive struct dependencies across packages
+    subp = subparser.add_parser("structgraph", help="Show the struct dependency graph of package's modules")
+    _add_package_ids(subp)
+    subp.add_argument(
+        "-i",
+        "--include-modules",
+        dest="includes",
+        required=False,
+        nargs="+",
+        type=str,
+        help="Only start from structs of these modules, glob patterns allowed",
+    )
+    subp.add_argument(
+        "-s",
+        "--structs",
+        dest="struct_names",
+        required=False,
+        nargs="+",
+        type=str,
+        help="Only start from these structs",
+    )
+    subp.add_argument(
+        "-d",
+        "--max-depth",
+        dest="max_depth",
+        required=False,
+        default=None,
+        help="Stop following struct references after this many hops",
+        type=check_positive,
+    )
+    subp.add_argument(
+        "--format",
+        dest="graph_format",
+        required=False,
+        default="text",
+        choices=["text", "dot", "json"],
+        help="Output format. Defaults to text.",
+    )
+    subp.set_defaults(subcommand="structgraph")
+
+    # Exposed function and struct differences between two packages
+    subp = subparser.add_parser("diff", help="Show function and struct changes between two packages")
+    subp.add_argument(
+        "move_package_id",
+        nargs=2,
+        metavar=("OLD_PACKAGE_ID", "NEW_PACKAGE_ID"),
+        help="The old and new move package ObjectIDs on the chain",
+        action=ValidateObjectID,
+    )
+    subp.add_argument(
+        "--format",
+        dest="diff_format",
+        required=False,
+        default="text",
+        choices=["text", "json"],
+        help="Output format. Defaults to text.",
+    )
+    subp.set_defaults(subcommand="diff")
+
     return parser.parse_args(in_args if in_args else ["--help"])
 
 
@@ -237,8 +492,74 @@ def module_parser(in_args: list) -> argparse.Namespace:
         "--package-address",
         dest="chn_package",
         required=False,
+        nargs="+",
         action=ValidateObjectID,
-        help="Ingest modules from chain package address",
+        help="Ingest modules from one or more chain package addresses",
+    )
+    command_group.add_argument(
+        "-b",
+        "--build-dir",
+        dest="build_dir",
+        required=False,
+        action=ValidatePackageDir,
+        help="Ingest compiled .mv modules from a sui move build output, without building",
+    )
+    parser.add_argument(
+        "-d",
+        "--dependencies",
+        dest="dependencies",
+        required=False,
+        action="store_true",
+        help="With --build-dir also ingest the modules of dependencies",
+    )
+    parser.add_argument(
+        "-i",
+        "--include-modules",
+        dest="includes",
+        required=False,
+        nargs="+",
+        type=str,
+        help="Only analyze modules with these names, glob patterns allowed",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        dest="workers",
+        required=False,
+        default=None,
+        help="Processes deserializing modules. Defaults to the number of CPUs.",
+        type=check_positive,
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="no_cache",
+        required=False,
+        action="store_true",
+        help="Rebuild projects and deserialize every module instead of reusing cached results. Builds are reused "
+        "while the project's and its local dependencies' sources and the sui version are unchanged, changes to "
+        "git dependencies not pinned by Move.lock need this option",
+    )
+    parser.add_argument(
+        "-x",
+        "--xref",
+        dest="xref",
+        required=False,
+        nargs="?",
+        const="*",
+        metavar="PATTERN",
+        help="Show calls, callers and struct accesses of functions and structs whose address::module::name "
+        "matches the glob PATTERN (default all)",
+    )
+    parser.add_argument(
+        "--profile",
+        dest="profile",
+        required=False,
+        nargs="?",
+        const=20,
+        type=check_positive,
+        metavar="TOP",
+        help="Rank functions by static cost estimate showing the TOP most costly (default 20, 0 for all), "
+        "with instruction classes, loops, call fan out and module table sizes",
     )
 
     return parser.parse_args(in_args if in_args else ["--help"])
@@ -291,6 +612,28 @@ def splay_parser(in_args: list) -> argparse.Namespace:
         help="Sets the number of coins to merge at a time. Defaults to 10.",
         type=check_positive,
     )
+    parser.add_argument(
+        "--adaptive",
+        dest="adaptive",
+        required=False,
+        action="store_true",
+        help="Grow or shrink the merge threshold based on observed latency, gas and failures.",
+    )
+    parser.add_argument(
+        "--bulk",
+        dest="bulk",
+        required=False,
+        action="store_true",
+        help="Build all merge chunks up front and sign them in a process pool.",
+    )
+    parser.add_argument(
+        "--workers",
+        dest="workers",
+        required=False,
+        default=None,
+        help="Number of signing processes for --bulk. Defaults to cpu count.",
+        type=check_positive,
+    )
     parser.add_argument(
         "-i", "--inspect", help="inspect and do not execute", required=False, action="store_true", dest="inspect"
     )
@@ -326,3 +669,151 @@ def vh_parser(in_args: list) -> argparse.Namespace:
     )
 
     return parser.parse_args(in_args if in_args else ["--help"])
+
+
+# for simulator
+def simulator_parser(in_args: list) -> argparse.Namespace:
+    """simulator_parser Simple command args for running gadgets against the in-memory ledger."""
+    parser = argparse.ArgumentParser(
+        add_help=True,
+        usage="%(prog)s [--command_options]",
+        description="Run to-one, splay or gas pooled transactions against an in-memory ledger and report timings",
+    )
+    parser.add_argument(
+        "-g",
+        "--gadget",
+        dest="gadget",
+        required=False,
+        default="to-one",
+        choices=["to-one", "splay", "pool"],
+        help="The gadget to run. Defaults to to-one.",
+    )
+    parser.add_argument(
+        "-c",
+        "--coins",
+        dest="coins",
+        required=False,
+        default=1000,
+        help="Number of coins minted to the owner. Defaults to 1000.",
+        type=check_positive,
+    )
+    parser.add_argument(
+        "-a",
+        "--addresses",
+        dest="addresses",
+        required=False,
+        default=1,
+        help="Number of addresses, the first owns the coins. Defaults to 1.",
+        type=check_positive,
+    )
+    parser.add_argument(
+        "-m",
+        "--merge-threshold",
+        dest="threshold",
+        required=False,
+        default=500,
+        help="Sets the number of coins to merge at a time. Defaults to 500.",
+        type=check_positive,
+    )
+    parser.add_argument(
+        "--adaptive",
+        dest="adaptive",
+        required=False,
+        action="store_true",
+        help="Grow or shrink the merge threshold based on observed latency, gas and failures.",
+    )
+    parser.add_argument(
+        "--bulk",
+        dest="bulk",
+        required=False,
+        action="store_true",
+        help="Build all merge chunks up front and sign them in a process pool.",
+    )
+    parser.add_argument(
+        "--workers",
+        dest="workers",
+        required=False,
+        default=None,
+        help="Number of signing processes for --bulk, or threads and pooled gas coins for pool. Defaults to cpu count.",
+        type=check_positive,
+    )
+    parser.add_argument(
+        "--transactions",
+        dest="transactions",
+        required=False,
+        default=100,
+        help="Number of transactions submitted by the pool gadget. Defaults to 100.",
+        type=check_positive,
+    )
+    parser.add_argument(
+        "--latency", dest="latency", required=False, default=0.0, type=float, help="Seconds added to every RPC call."
+    )
+    parser.add_argument(
+        "--jitter", dest="jitter", required=False, default=0.0, type=float, help="Maximum random seconds added."
+    )
+    parser.add_argument(
+        "--failure-rate",
+        dest="failure_rate",
+        required=False,
+        default=0.0,
+        type=float,
+        help="Probability of a transaction execution failing.",
+    )
+    parser.add_argument("--seed", dest="seed", required=False, default=None, type=int, help="Random seed.")
+    return parser.parse_args(in_args)
+
+
+# for frag gadget
+def frag_parser(in_args: list) -> argparse.Namespace:
+    """frag_parser Simple command args for coin fragmentation report."""
+    parser = argparse.ArgumentParser(
+        add_help=True,
+        usage="%(prog)s [--command_options]",
+        description="Report coin count, dust and balance distribution per address",
+    )
+    parser.add_argument(
+        "-a",
+        "--addresses",
+        dest="addresses",
+        required=False,
+        nargs="+",
+        help="Addresses to report on. Defaults to all addresses in configuration.",
+        action=ValidateAddress,
+    )
+    parser.add_argument(
+        "-t",
+        "--coin-type",
+        dest="coin_type",
+        required=False,
+        default="0x2::sui::SUI",
+        help="The coin type to report on. Defaults to 0x2::sui::SUI.",
+    )
+    parser.add_argument(
+        "-d",
+        "--dust",
+        dest="dust",
+        required=False,
+        default=1_000_000,
+        help="Coins with balance below this are dust. Defaults to 1000000.",
+        type=check_positive,
+    )
+    parser.add_argument(
+        "-m",
+        "--merge-threshold",
+        dest="merge_threshold",
+        required=False,
+        default=10,
+        help="Coins merged per transaction when projecting to-one transactions. Defaults to 10.",
+        type=check_positive,
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        dest="workers",
+        required=False,
+        default=8,
+        help="Maximum concurrent address fetches. Defaults to 8.",
+        type=check_positive,
+    )
+    parser.add_argument("-j", "--json", dest="json", required=False, action="store_true", help="Output as JSON.")
+    return parser.parse_args(in_args)
@@ -13,15 +13,26 @@
 
 """pysui-gadget: module, struct and function general utilities.
 
-Provides low level filtering options of raw return of modules, structs and functions.
+Provides low level filtering options of raw return of modules, structs and functions,
+and a lazy query over a package's modules composed from precompiled predicates::
+
+    query = Query(package.modules).modules(name_matches("pool*")).functions(is_entry() & takes_type("Coin"))
+    for mod_name, func_name, func_def in query.iter_functions():
+        ...
 """
 
+import fnmatch
 import functools
-from typing import Iterator
+import re
+from typing import Any, Callable, Iterator, Optional
 from pysui.sui.sui_txresults.package_meta import (
     SuiMoveFunction,
     SuiMoveModule,
     SuiMoveStruct,
+    SuiMoveVector,
+    SuiParameterReference,
+    SuiParameterStruct,
+    SuiMoveScalarArgument,
 )
 
 _MODULE_TUPLE_NAME_POS: int = 0
@@ -51,7 +62,7 @@ def entry_functions_only(funcs: tuple[str, SuiMoveFunction]) -> bool:
 
 def mod_with_entry_points(mods: tuple[str, SuiMoveModule]) -> bool:
     """."""
-    return list((filter(entry_functions_only, mods[_MODULE_TUPLE_MODULE_POS].exposed_functions.items())))
+    return any(x.is_entry for x in mods[_MODULE_TUPLE_MODULE_POS].exposed_functions.values())
 
 
 def struct_abilities_with(abilities: set[str], structs: tuple[str, SuiMoveStruct]) -> bool:
@@ -163,3 +174,236 @@ def filter_modules_excluding(
     return filter_modules_with_entry_points(
         mods=filter_exclude_modules(mods=mods, excludes=excludes), nonentries=nonentries
     )
+
+
+# Query
+
+
+class Predicate:
+    """Test of a (name, definition) pair, composable with &, | and ~."""
+
+    def __init__(self, test: Callable[[str, Any], bool]):
+        """Initialize with the test function.
+
+        :param test: Called with the name and the module, function or struct definition
+        :type test: Callable[[str, Any], bool]
+        """
+        self.test = test
+
+    def __call__(self, name: str, definition: Any) -> bool:
+        """Apply the test."""
+        return self.test(name, definition)
+
+    def __and__(self, other: "Predicate") -> "Predicate":
+        """Both tests, the second only evaluated if the first passes."""
+        first, second = self.test, other.test
+        return Predicate(lambda n, d: first(n, d) and second(n, d))
+
+    def __or__(self, other: "Predicate") -> "Predicate":
+        """Either test, the second only evaluated if the first fails."""
+        first, second = self.test, other.test
+        return Predicate(lambda n, d: first(n, d) or second(n, d))
+
+    def __invert__(self) -> "Predicate":
+        """Negated test."""
+        test = self.test
+        return Predicate(lambda n, d: not test(n, d))
+
+
+def _pattern(patterns: tuple[str, ...], regex: bool) -> Callable[[str], Any]:
+    """Single compiled full match of any of the patterns, a set lookup when all are plain names."""
+    if not regex and not any(x in y for y in patterns for x in "*?["):
+        return frozenset(patterns).__contains__
+    sources = patterns if regex else [fnmatch.translate(x) for x in patterns]
+    return re.compile("|".join(f"(?:{x})" for x in sources)).fullmatch
+
+
+def name_matches(*patterns: str, regex: bool = False) -> Predicate:
+    """Name matches any glob pattern, or regular expression when regex.
+
+    :param patterns: Glob patterns (plain names match exactly) or regular expressions
+    :type patterns: str
+    :param regex: Patterns are regular expressions, defaults to False
+    :type regex: bool, optional
+    :return: The predicate
+    :rtype: Predicate
+    """
+    match = _pattern(patterns, regex)
+    return Predicate(lambda n, _d: bool(match(n)))
+
+
+def is_entry() -> Predicate:
+    """Function is an entry function."""
+    return Predicate(lambda _n, d: d.is_entry)
+
+
+def visibility_is(*visibilities: str) -> Predicate:
+    """Function visibility is one of visibilities, e.g. 'Public' or 'Friend'."""
+    wanted = frozenset(visibilities)
+    return Predicate(lambda _n, d: d.visibility in wanted)
+
+
+def has_abilities(*abilities: str) -> Predicate:
+    """Struct has every ability, names are case insensitive."""
+    wanted = frozenset(x.capitalize() for x in abilities)
+    return Predicate(lambda _n, d: wanted.issubset(d.abilities.abilities))
+
+
+def _type_names(parm: Any) -> Iterator[str]:
+    """Struct and scalar type names a function parameter or return type mentions."""
+    # Exact type dispatch, isinstance on the dataclass_json ABCs is slow
+    kind = type(parm)
+    if kind is str:
+        yield parm
+    elif kind is SuiMoveScalarArgument:
+        yield parm.scalar_type
+    elif kind is SuiParameterReference:
+        yield from _type_names(parm.reference_to)
+    elif kind is SuiMoveVector:
+        yield from _type_names(parm.vector_of)
+    elif kind is SuiParameterStruct:
+        yield parm.name
+        for type_arg in parm.type_arguments or []:
+            yield from _type_names(type_arg)
+
+
+def takes_type(*patterns: str, regex: bool = False) -> Predicate:
+    """Function has a parameter mentioning a type name matching any pattern, e.g. 'Coin' or 'Pool*'."""
+    match = _pattern(patterns, regex)
+    return Predicate(lambda _n, d: any(match(x) for parm in d.parameters for x in _type_names(parm)))
+
+
+def returns_type(*patterns: str, regex: bool = False) -> Predicate:
+    """Function has a return mentioning a type name matching any pattern."""
+    match = _pattern(patterns, regex)
+    return Predicate(lambda _n, d: any(match(x) for parm in d.returns for x in _type_names(parm)))
+
+
+def _all(predicates: tuple[Predicate, ...]) -> Optional[Predicate]:
+    """Conjunction of predicates, None when there are none."""
+    return functools.reduce(lambda x, y: x & y, predicates) if predicates else None
+
+
+class Query:
+    """Lazily evaluated query over a package's modules, functions and structs.
+
+    Each refinement returns a new query, nothing is evaluated until iterated.
+    """
+
+    def __init__(
+        self,
+        modules: dict[str, SuiMoveModule],
+        *,
+        module_test: Optional[Predicate] = None,
+        function_test: Optional[Predicate] = None,
+        struct_test: Optional[Predicate] = None,
+    ):
+        """Initialize query.
+
+        :param modules: SuiMovePackage modules dictionary
+        :type modules: dict[str, SuiMoveModule]
+        :param module_test: Modules must pass, defaults to None (all)
+        :type module_test: Optional[Predicate], optional
+        :param function_test: Exposed functions must pass, defaults to None (all)
+        :type function_test: Optional[Predicate], optional
+        :param struct_test: Structs must pass, defaults to None (all)
+        :type struct_test: Optional[Predicate], optional
+        """
+        self._modules = modules
+        self._module_test = module_test
+        self._function_test = function_test
+        self._struct_test = struct_test
+
+    def _refine(self, attr: str, predicates: tuple[Predicate, ...]) -> "Query":
+        """Copy of the query with predicates and-ed to one test."""
+        tests = {
+            "module_test": self._module_test,
+            "function_test": self._function_test,
+            "struct_test": self._struct_test,
+        }
+        tests[attr] = _all(tuple(x for x in (tests[attr],) + predicates if x is not None))
+        return Query(self._modules, **tests)
+
+    def modules(self, *predicates: Predicate) -> "Query":
+        """Refine to modules passing every predicate."""
+        return self._refine("module_test", predicates)
+
+    def functions(self, *predicates: Predicate) -> "Query":
+        """Refine to exposed functions passing every predicate."""
+        return self._refine("function_test", predicates)
+
+    def structs(self, *predicates: Predicate) -> "Query":
+        """Refine to structs passing every predicate."""
+        return self._refine("struct_test", predicates)
+
+    def with_functions(self) -> "Query":
+        """Refine to modules with at least one function passing the function predicates."""
+        test = self._function_test
+        if test is None:
+            return self.modules(Predicate(lambda _n, d: bool(d.exposed_functions)))
+        return self.modules(Predicate(lambda _n, d: any(test(x, y) for x, y in d.exposed_functions.items())))
+
+    def iter_modules(self) -> Iterator[tuple[str, SuiMoveModule]]:
+        """Modules passing the module predicates.
+
+        :return: Pairs of module name and definition
+        :rtype: Iterator[tuple[str, SuiMoveModule]]
+        """
+        test = self._module_test
+        return iter(self._modules.items()) if test is None else ((x, y) for x, y in self._modules.items() if test(x, y))
+
+    def iter_functions(self) -> Iterator[tuple[str, str, SuiMoveFunction]]:
+        """Functions passing the function predicates, of modules passing the module predicates.
+
+        :return: Triples of module name, function name and definition
+        :rtype: Iterator[tuple[str, str, SuiMoveFunction]]
+        """
+        test = self._function_test
+        for mod_name, mod_def in self.iter_modules():
+            for func_name, func_def in mod_def.exposed_functions.items():
+                if test is None or test(func_name, func_def):
+                    yield mod_name, func_name, func_def
+
+    def iter_structs(self) -> Iterator[tuple[str, str, SuiMoveStruct]]:
+        """Structs passing the struct predicates, of modules passing the module predicates.
+
+        :return: Triples of module name, struct name and definition
+        :rtype: Iterator[tuple[str, str, SuiMoveStruct]]
+        """
+        test = self._struct_test
+        for mod_name, mod_def in self.iter_modules():
+            for struct_name, struct_def in mod_def.structs.items():
+                if test is None or test(struct_name, struct_def):
+                    yield mod_name, struct_name, struct_def
+
+    def functions_of(self, module: SuiMoveModule) -> Iterator[tuple[str, SuiMoveFunction]]:
+        """Functions of one module passing the function predicates."""
+        test = self._function_test
+        return ((x, y) for x, y in module.exposed_functions.items() if test is None or test(x, y))
+
+    def structs_of(self, module: SuiMoveModule) -> Iterator[tuple[str, SuiMoveStruct]]:
+        """Structs of one module passing the struct predicates."""
+        test = self._struct_test
+        return ((x, y) for x, y in module.structs.items() if test is None or test(x, y))
+
+
+def module_query(
+    mods: dict[str, SuiMoveModule], includes: Optional[set[str]] = None, excludes: Optional[set[str]] = None
+) -> Query:
+    """Query of modules named by, or not named by, glob patterns.
+
+    :param mods: SuiMovePackage modules dictionary
+    :type mods: dict[str, SuiMoveModule]
+    :param includes: Only modules matching these patterns, defaults to None
+    :type includes: Optional[set[str]], optional
+    :param excludes: Modules not matching these patterns, used when no includes, defaults to None
+    :type excludes: Optional[set[str]], optional
+    :return: The query
+    :rtype: Query
+    """
+    query = Query(mods)
+    if includes:
+        return query.modules(name_matches(*includes))
+    if excludes:
+        return query.modules(~name_matches(*excludes))
+    return query
@@ -0,0 +1,231 @@
+#    Copyright  Frank V. Castellucci
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+# -*- coding: utf-8 -*-
+
+"""pysui-gadget: gas coin pool.
+
+Keeps a set of gas coins for an address and leases each exclusively to one
+transaction at a time, so independent transactions can be in flight together
+without equivocating on a shared gas coin::
+
+    pool = GasPool(client, owner, size=8)
+    with pool.lease() as gas:
+        txn = SyncTransaction(client=client, initial_sender=owner)
+        ...
+        pool.settle(gas, txn.execute(use_gas_object=gas.object_id))
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from pysui import SuiAddress, SuiRpcResult, SyncClient, handle_result
+from pysui.sui.sui_txn import SyncTransaction
+from pysui.sui.sui_txresults.complex_tx import Effects
+from pysui.sui.sui_txresults.single_tx import ObjectRead
+
+logger = logging.getLogger("pysui_gadgets.gas_pool")
+
+
+@dataclass
+class PooledCoin:
+    """Gas coin held by the pool."""
+
+    object_id: str
+    version: int
+    digest: str
+    balance: int
+    leased: bool = False
+
+
+class GasPool:
+    """Leases gas coins of an owner exclusively to concurrent transaction builders."""
+
+    def __init__(
+        self,
+        client: SyncClient,
+        owner: SuiAddress,
+        size: int,
+        *,
+        min_balance: int = 0,
+        auto_rebalance: bool = True,
+    ):
+        """Initialize pool and fill it from the owner's coins.
+
+        :param client: The client used to fetch and split coins
+        :type client: SyncClient
+        :param owner: The owner of the gas coins
+        :type owner: SuiAddress
+        :param size: The number of gas coins to maintain
+        :type size: int
+        :param min_balance: Balance below which a coin triggers a rebalance, defaults to 0
+        :type min_balance: int, optional
+        :param auto_rebalance: Rebalance when the last lease is returned and a coin is low, defaults to True
+        :type auto_rebalance: bool, optional
+        """
+        self.client = client
+        self.owner = owner
+        self.size = max(1, size)
+        self.min_balance = min_balance
+        self.auto_rebalance = auto_rebalance
+        self.coins: dict[str, PooledCoin] = {}
+        self._cond = threading.Condition()
+        self._leased = 0
+        # Leases held per thread, a holder must not wait for leases to be returned
+        self._holders: dict[int, int] = {}
+        self._needs_rebalance = False
+        self._rebalancing = False
+        self.fill()
+
+    def _fetch(self) -> list[PooledCoin]:
+        """Owner's gas coins, richest first."""
+        coins = [
+            PooledCoin(x.object_id, int(x.version), x.digest, int(x.balance))
+            for x in handle_result(self.client.get_gas(self.owner, True)).data
+        ]
+        return sorted(coins, key=lambda x: x.balance, reverse=True)
+
+    def _split(self, coin: PooledCoin, count: int, merge_from: Optional[list[PooledCoin]] = None) -> SuiRpcResult:
+        """Merge merge_from into coin then divide it into count equal coins, paying with coin."""
+        txn = SyncTransaction(client=self.client, initial_sender=self.owner)
+        if merge_from:
+            txn.merge_coins(merge_to=txn.gas, merge_from=[x.object_id for x in merge_from])
+        if count > 1:
+            txn.split_coin_equal(coin=txn.gas, split_count=count)
+        return txn.execute(use_gas_object=coin.object_id)
+
+    def fill(self) -> int:
+        """Load the richest coins of owner, splitting the richest if fewer than size exist.
+
+        :raises ValueError: If the owner has no gas coins or the split fails
+        :return: The number of coins in the pool
+        :rtype: int
+        """
+        coins = self._fetch()
+        if not coins:
+            raise ValueError(f"{self.owner.address} has no gas coins to pool")
+        if len(coins) < self.size:
+            result = self._split(coins[0], self.size - len(coins) + 1)
+            if not result.is_ok() or not result.result_data.succeeded:
+                raise ValueError(f"Unable to split {coins[0].object_id} for pool: {result.result_string}")
+            coins = self._fetch()
+        with self._cond:
+            self.coins = {x.object_id: x for x in coins[: self.size]}
+            self._cond.notify_all()
+        return len(self.coins)
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[PooledCoin]:
+        """Exclusively lease the richest idle coin for the duration of the block.
+
+        :param timeout: Seconds to wait for an idle coin, defaults to None (wait forever)
+        :type timeout: Optional[float], optional
+        :raises TimeoutError: If no coin became idle within timeout
+        :return: The leased coin, pass its object_id as use_gas_object
+        :rtype: Iterator[PooledCoin]
+        """
+        with self._cond:
+            if not self._cond.wait_for(self._idle, timeout):
+                raise TimeoutError(f"No gas coin available in {timeout} seconds")
+            coin = max(self._idle(), key=lambda x: x.balance)
+            coin.leased = True
+            self._leased += 1
+            holder = threading.get_ident()
+            self._holders[holder] = self._holders.get(holder, 0) + 1
+        try:
+            yield coin
+        finally:
+            with self._cond:
+                coin.leased = False
+                self._leased -= 1
+                self._holders[holder] -= 1
+                if not self._holders[holder]:
+                    del self._holders[holder]
+                rebalance = (
+                    self.auto_rebalance and self._needs_rebalance and not self._rebalancing and not self._leased
+                )
+            if rebalance:
+                self.rebalance()
+            with self._cond:
+                self._cond.notify_all()
+
+    def _idle(self) -> list[PooledCoin]:
+        """Coins not currently leased, empty while a rebalance is pending."""
+        if self._rebalancing or (self._needs_rebalance and self.auto_rebalance):
+            return []
+        return [x for x in self.coins.values() if not x.leased]
+
+    def settle(self, coin: PooledCoin, result: SuiRpcResult) -> None:
+        """Refresh a leased coin's reference and balance from the transaction result.
+
+        The balance is reduced by the gas charged, amounts the transaction itself takes
+        from the gas coin are not tracked. When the result carries no effects the coin is
+        refetched from the chain, and dropped from the pool if it no longer exists.
+
+        :param coin: The leased coin used as gas
+        :type coin: PooledCoin
+        :param result: The result of executing the transaction
+        :type result: SuiRpcResult
+        """
+        effects = getattr(result.result_data, "effects", None) if result.is_ok() else None
+        if isinstance(effects, Effects) and effects.gas_object.reference.object_id == coin.object_id:
+            coin.version = effects.gas_object.reference.version
+            coin.digest = effects.gas_object.reference.digest
+            coin.balance -= effects.gas_used.total_after_rebate
+        else:
+            fetched = self.client.get_object(coin.object_id)
+            if fetched.is_ok() and isinstance(fetched.result_data, ObjectRead):
+                coin.version = int(fetched.result_data.version)
+                coin.digest = fetched.result_data.digest
+                coin.balance = int(fetched.result_data.content.balance)
+            else:
+                reason = fetched.result_string if not fetched.is_ok() else type(fetched.result_data).__name__
+                logger.warning("Dropping %s from pool: %s", coin.object_id, reason)
+                with self._cond:
+                    self.coins.pop(coin.object_id, None)
+                    self._needs_rebalance = True
+                return
+        if coin.balance < self.min_balance:
+            with self._cond:
+                # Only worth rebalancing if an even split lifts every coin to the minimum
+                if sum(x.balance for x in self.coins.values()) >= self.min_balance * self.size:
+                    self._needs_rebalance = True
+                else:
+                    logger.warning("Gas pool of %s is below minimum balance", self.owner.address)
+
+    def rebalance(self) -> None:
+        """Merge the pool into its richest coin and split it back into equal coins.
+
+        Waits for outstanding leases to be returned before submitting, so it must not be
+        called by a thread holding a lease.
+
+        :raises RuntimeError: If the calling thread holds a lease
+        """
+        with self._cond:
+            if self._holders.get(threading.get_ident()):
+                raise RuntimeError("Gas pool rebalance called while holding a lease")
+            self._rebalancing = True
+            self._cond.wait_for(lambda: not self._leased)
+            coins = sorted(self.coins.values(), key=lambda x: x.balance, reverse=True)
+        try:
+            if coins:
+                logger.info("Rebalancing %d gas coins into %d", len(coins), self.size)
+                result = self._split(coins[0], self.size, coins[1:])
+                if not result.is_ok() or not result.result_data.succeeded:
+                    logger.warning("Rebalance failed: %s", result.result_string)
+            self.fill()
+        finally:
+            with self._cond:
+                self._needs_rebalance = self._rebalancing = False
+                self._cond.notify_all()
@@ -0,0 +1,192 @@
+#    Copyright  Frank V. Castellucci
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+# -*- coding: utf-8 -*-
+
+"""pysui-gadget: normalize modules from bytecode.
+
+Produces the same JSON shape as the fullnode's normalized module endpoints from
+a package's BCS module map, so it can be used wherever the RPC result is used
+(SuiMovePackage.factory, the package cache) at a fraction of the transfer.
+"""
+
+from typing import Union
+
+from pysui.sui_move.model.common_types import Ability, AbilitySet, SignatureType, StructTag, Visibility
+from pysui.sui_move.module.deserialize import RawModuleContent, from_base64
+
+# Normalized names of the primitive signature tokens
+_PRIMITIVES: dict[SignatureType, str] = {
+    SignatureType.boolean: "Bool",
+    SignatureType.u8: "U8",
+    SignatureType.u16: "U16",
+    SignatureType.u32: "U32",
+    SignatureType.u64: "U64",
+    SignatureType.u128: "U128",
+    SignatureType.u256: "U256",
+    SignatureType.Address: "Address",
+    SignatureType.Signer: "Signer",
+}
+
+_VISIBILITY: dict[Visibility, str] = {
+    Visibility.Private: "Private",
+    Visibility.Public: "Public",
+    # Pre entry flag modules marked entry functions as script visibility
+    Visibility.Script: "Public",
+    Visibility.FriendPrivate: "Friend",
+}
+
+# Normalized ability order
+_ABILITIES: list[Ability] = [Ability.Copy, Ability.Drop, Ability.Store, Ability.Key]
+
+
+def _address(hex_address: str) -> str:
+    """Short form address as used by the normalized JSON."""
+    return "0x" + (hex_address.lstrip("0") or "0")
+
+
+def _abilities(ability_set: Union[AbilitySet, int]) -> dict:
+    """Normalized ability set."""
+    bits = ability_set.as_bitset if isinstance(ability_set, AbilitySet) else ability_set
+    return {"abilities": [x.name for x in _ABILITIES if bits & x]}
+
+
+class _Normalizer:
+    """Resolves the index references of one module's tables."""
+
+    def __init__(self, raw: RawModuleContent):
+        """Initialize with the deserialized module tables."""
+        self.raw = raw
+
+    def identifier(self, index: int) -> str:
+        """Identifier at index."""
+        return self.raw.identifiers[index].identifier
+
+    def module_id(self, index: int) -> dict:
+        """Address and name of module handle at index."""
+        handle = self.raw.module_handles[index]
+        return {
+            "address": _address(self.raw.addresses[handle.address_index].address),
+            "name": self.identifier(handle.identifier_index),
+        }
+
+    def struct_type(self, handle_index: int, type_arguments: list) -> dict:
+        """Normalized struct reference to struct handle at index."""
+        handle = self.raw.structure_handles[handle_index]
+        module = self.module_id(handle.module_handle_index)
+        return {
+            "Struct": {
+                "address": module["address"],
+                "module": module["name"],
+                "name": self.identifier(handle.identifier_index),
+                "typeArguments": [self.signature_token(x) for x in type_arguments],
+            }
+        }
+
+    def signature_token(self, token: list) -> Union[str, dict]:
+        """Normalized type of a deserialized signature token."""
+        sig_type = token[0]
+        if sig_type in _PRIMITIVES:
+            return _PRIMITIVES[sig_type]
+        match sig_type:
+            case SignatureType.Reference:
+                return {"Reference": self.signature_token(token[1])}
+            case SignatureType.MutableReference:
+                return {"MutableReference": self.signature_token(token[1])}
+            case SignatureType.Vector:
+                return {"Vector": self.signature_token(token[1])}
+            case SignatureType.TypeParameter:
+                return {"TypeParameter": token[1]}
+            case SignatureType.Struct:
+                return self.struct_type(token[1], [])
+            case SignatureType.StructInstantiation:
+                return self.struct_type(token[1], token[2:])
+        raise ValueError(f"Unknown signature token {sig_type}")
+
+    def signature(self, index: int) -> list:
+        """Normalized types of signature at index."""
+        return [self.signature_token(x) for x in self.raw.signatures[index].sig_tokens]
+
+    def structs(self) -> dict[str, dict]:
+        """Normalized structs defined by the module."""
+        structs: dict[str, dict] = {}
+        for definition in self.raw.structure_definitions:
+            handle = self.raw.structure_handles[definition.struct_handle_index]
+            fields = definition.fields if definition.tag == StructTag.HasFields else []
+            structs[self.identifier(handle.identifier_index)] = {
+                "abilities": _abilities(handle.abilities),
+                "typeParameters": [
+                    {"constraints": _abilities(x.constraints), "isPhantom": bool(x.is_phantom)}
+                    for x in handle.type_parameters
+                ],
+                "fields": [
+                    {"name": self.identifier(x.identifier_index), "type": self.signature_token(x.field_type)}
+                    for x in fields
+                ],
+            }
+        return structs
+
+    def exposed_functions(self) -> dict[str, dict]:
+        """Normalized functions callable from outside the module, public, friend or entry."""
+        functions: dict[str, dict] = {}
+        for definition in self.raw.function_definitions:
+            is_entry = bool(definition.flag.is_entry()) or definition.visibility == Visibility.Script
+            if definition.visibility == Visibility.Private and not is_entry:
+                continue
+            handle = self.raw.function_handles[definition.function_handle_index]
+            functions[self.identifier(handle.identifier_index)] = {
+                "visibility": _VISIBILITY[definition.visibility],
+                "isEntry": is_entry,
+                "typeParameters": [_abilities(x) for x in (handle.type_params or [])],
+                "parameters": self.signature(handle.parameters_signature_index),
+                "return": self.signature(handle.returns_signature_index),
+            }
+        return functions
+
+    def module(self) -> dict:
+        """Normalized module."""
+        module_id = self.module_id(self.raw.module_self)
+        return {
+            "fileFormatVersion": self.raw.version,
+            "address": module_id["address"],
+            "name": module_id["name"],
+            "friends": [
+                {
+                    "address": _address(self.raw.addresses[x.address_index].address),
+                    "name": self.identifier(x.identifier_index),
+                }
+                for x in self.raw.friends
+            ],
+            "structs": self.structs(),
+            "exposedFunctions": self.exposed_functions(),
+        }
+
+
+def normalize_module(raw: RawModuleContent) -> dict:
+    """Normalized module JSON from deserialized module tables.
+
+    :param raw: Fully deserialized module
+    :type raw: RawModuleContent
+    :return: Dictionary shaped as sui_getNormalizedMoveModule results
+    :rtype: dict
+    """
+    return _Normalizer(raw).module()
+
+
+def normalize_package(module_map: dict[str, str]) -> dict:
+    """Normalized package JSON from a package's module map.
+
+    :param module_map: Module name to base64 module bytecode
+    :type module_map: dict[str, str]
+    :return: Dictionary shaped as sui_getNormalizedMoveModulesByPackage results
+    :rtype: dict
+    """
+    return {name: normalize_module(from_base64(module_b64)) for name, module_b64 in module_map.items()}
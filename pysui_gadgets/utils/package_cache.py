@@ -0,0 +1,275 @@
+#    Copyright  Frank V. Castellucci
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+# -*- coding: utf-8 -*-
+
+"""pysui-gadget: on disk cache of normalized package metadata.
+
+Entries are keyed by network, package id, package object version and source, the
+fullnode's normalization or the local one from bytecode. A published
+version never changes, while system packages (0x1, 0x2, 0x3) are upgraded in place
+with a new version, so a small object read decides which entry is current. Each
+entry carries the sha256 of its content and is discarded if it does not match.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional, Union
+
+from pysui import ObjectID, SuiRpcResult, SyncClient
+from pysui.sui.sui_builders.get_builders import GetObject, GetPackage
+from pysui.sui.sui_txresults import SuiMovePackage
+
+from pysui_gadgets.utils.normalize import normalize_package
+
+# Override cache location with this environment variable
+CACHE_ENV: str = "PYSUI_GADGETS_CACHE"
+
+
+def default_cache_dir() -> Path:
+    """Cache root, from environment or under the user's cache directory."""
+    if os.environ.get(CACHE_ENV):
+        return Path(os.environ[CACHE_ENV]).expanduser()
+    return Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "pysui_gadgets"
+
+
+# Entry name suffix of packages normalized locally from bytecode
+BYTECODE_SUFFIX: str = ".bytecode"
+
+# Object read options returning only the reference of an object
+_REFERENCE_ONLY: dict = {
+    "showType": False,
+    "showOwner": False,
+    "showPreviousTransaction": False,
+    "showDisplay": False,
+    "showContent": False,
+    "showBcs": False,
+    "showStorageRebate": False,
+}
+
+
+def network_root(rpc_url: str, cache_dir: Optional[Path] = None) -> Path:
+    """Cache directory of the packages fetched from rpc_url.
+
+    :param rpc_url: The fullnode url
+    :type rpc_url: str
+    :param cache_dir: Cache root, defaults to default_cache_dir()
+    :type cache_dir: Optional[Path], optional
+    :return: The network's package directory
+    :rtype: Path
+    """
+    network = hashlib.sha256(str(rpc_url).encode()).hexdigest()[:16]
+    return (cache_dir or default_cache_dir()) / "packages" / network
+
+
+def read_entry(entry: Path) -> Optional[dict]:
+    """Read a cache entry's normalized package, None if missing or corrupt.
+
+    :param entry: The entry path
+    :type entry: Path
+    :return: The normalized package dictionary
+    :rtype: Optional[dict]
+    """
+    try:
+        stored = json.loads(entry.read_text(encoding="utf8"))
+        content = json.dumps(stored["data"], sort_keys=True)
+        if hashlib.sha256(content.encode()).hexdigest() == stored["sha256"]:
+            return stored["data"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+@contextmanager
+def atomic_write(path: Path, mode: str = "w") -> Iterator[IO]:
+    """Temporary file beside path, moved over path when the block completes and removed if it raises.
+
+    :param path: The file to replace
+    :type path: Path
+    :param mode: Text "w" or binary "wb" mode, defaults to "w"
+    :type mode: str, optional
+    :return: The open temporary file
+    :rtype: Iterator[IO]
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    encoding = None if "b" in mode else "utf8"
+    with tempfile.NamedTemporaryFile(mode, dir=path.parent, delete=False, encoding=encoding) as tmp:
+        try:
+            yield tmp
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+    os.replace(tmp.name, path)
+
+
+def write_entry(entry: Path, data: Any) -> None:
+    """Write a cache entry atomically with the sha256 of its content, see read_entry.
+
+    :param entry: The entry path
+    :type entry: Path
+    :param data: JSON serializable content
+    :type data: Any
+    """
+    content = json.dumps(data, sort_keys=True)
+    with atomic_write(entry) as tmp:
+        json.dump({"sha256": hashlib.sha256(content.encode()).hexdigest(), "data": data}, tmp)
+
+
+def cached_entries(root: Path) -> dict[str, Path]:
+    """Newest cache entry of each package under a network root.
+
+    :param root: The network's package directory, see network_root
+    :type root: Path
+    :return: Package id to its newest version's entry, the fullnode's when both sources are cached
+    :rtype: dict[str, Path]
+    """
+    newest: dict[str, tuple[tuple[int, bool], Path]] = {}
+    for entry in root.glob("*@*.json"):
+        package_id, tail = entry.stem.rsplit("@", 1)
+        version = tail.removesuffix(BYTECODE_SUFFIX)
+        rank = (int(version), version == tail) if version.isdigit() else None
+        if rank and rank >= newest.get(package_id, ((-1, False), None))[0]:
+            newest[package_id] = (rank, entry)
+    return {x: y[1] for x, y in newest.items()}
+
+
+class RawGetObject(GetObject):
+    """GetObject returning the unparsed JSON result."""
+
+    def handle_return(self, indata: dict) -> dict:
+        """Return the result as is."""
+        return indata
+
+
+class RawGetPackage(GetPackage):
+    """GetPackage returning the unparsed JSON result."""
+
+    def handle_return(self, indata: dict) -> dict:
+        """Return the result as is."""
+        return indata
+
+
+def module_map(client: SyncClient, package_id: Union[str, ObjectID]) -> dict[str, str]:
+    """Module name to base64 bytecode from the package object's BCS.
+
+    :param client: The client to read with
+    :type client: SyncClient
+    :param package_id: The package id
+    :type package_id: Union[str, ObjectID]
+    :raises ValueError: If the read fails or the object is not a package
+    :return: The package module map
+    :rtype: dict[str, str]
+    """
+    result = client.execute(RawGetObject(object_id=package_id, options=GetObject.package_options()))
+    if result.is_ok():
+        modules = result.result_data.get("data", {}).get("bcs", {}).get("moduleMap")
+        if modules is not None:
+            return modules
+        raise ValueError(f"ObjectID {package_id} is not a valid package")
+    raise ValueError(f"Failed retrieving package {package_id} with return {result.result_string}")
+
+
+class PackageCache:
+    """Fetches normalized package metadata through an on disk cache."""
+
+    def __init__(
+        self,
+        client: SyncClient,
+        cache_dir: Optional[Path] = None,
+        enabled: bool = True,
+        from_bytecode: bool = False,
+    ):
+        """Initialize cache.
+
+        :param client: The client used on cache misses
+        :type client: SyncClient
+        :param cache_dir: Cache root, defaults to default_cache_dir()
+        :type cache_dir: Optional[Path], optional
+        :param enabled: When False always fetch and never write, defaults to True
+        :type enabled: bool, optional
+        :param from_bytecode: Normalize misses locally from module bytecode, defaults to False
+        :type from_bytecode: bool, optional
+        """
+        self.client = client
+        self.enabled = enabled
+        self.from_bytecode = from_bytecode
+        self.root = network_root(client.config.rpc_url, cache_dir)
+
+    @staticmethod
+    def _id(package_id: Union[str, ObjectID]) -> str:
+        """Plain string package id."""
+        return package_id.value if isinstance(package_id, ObjectID) else str(package_id)
+
+    def _version(self, package_id: str) -> Optional[int]:
+        """Current version of the package object, None if it can not be read."""
+        result = self.client.execute(RawGetObject(object_id=package_id, options=_REFERENCE_ONLY))
+        if result.is_ok() and "data" in result.result_data:
+            return int(result.result_data["data"]["version"])
+        return None
+
+    def _entry(self, package_id: str, version: Optional[int]) -> Optional[Path]:
+        """Entry path for version, or the newest entry of the package when version is unknown."""
+        tail = f"{BYTECODE_SUFFIX if self.from_bytecode else ''}.json"
+        if version is not None:
+            return self.root / f"{package_id}@{version}{tail}"
+        versions = [x.name[len(package_id) + 1 : -len(tail)] for x in self.root.glob(f"{package_id}@*{tail}")]
+        versions = sorted(int(x) for x in versions if x.isdigit())
+        return self.root / f"{package_id}@{versions[-1]}{tail}" if versions else None
+
+    def _fetch(self, package_id: str) -> SuiRpcResult:
+        """Normalized package from the fullnode, or from the package bytecode."""
+        if self.from_bytecode:
+            try:
+                return SuiRpcResult(True, None, normalize_package(module_map(self.client, package_id)))
+            except ValueError as verr:
+                return SuiRpcResult(False, str(verr))
+        return self.client.execute(RawGetPackage(package=ObjectID(package_id)))
+
+    def raw_package(self, package_id: Union[str, ObjectID]) -> SuiRpcResult:
+        """Normalized package JSON, from cache when the package version is cached.
+
+        :param package_id: The package id
+        :type package_id: Union[str, ObjectID]
+        :return: Result with the normalized modules dictionary
+        :rtype: SuiRpcResult
+        """
+        package_id = self._id(package_id)
+        version = None
+        if self.enabled:
+            version = self._version(package_id)
+            entry = self._entry(package_id, version)
+            data = read_entry(entry) if entry else None
+            if data is not None:
+                return SuiRpcResult(True, None, data)
+        result = self._fetch(package_id)
+        if result.is_ok() and version is not None:
+            write_entry(self._entry(package_id, version), result.result_data)
+        return result
+
+    def get_package(self, package_id: Union[str, ObjectID]) -> SuiRpcResult:
+        """Drop in for SyncClient.get_package served through the cache.
+
+        :param package_id: The package id
+        :type package_id: Union[str, ObjectID]
+        :return: Result with the SuiMovePackage
+        :rtype: SuiRpcResult
+        """
+        result = self.raw_package(package_id)
+        if result.is_ok():
+            # factory mutates its input
+            return SuiRpcResult(True, None, SuiMovePackage.factory(copy.deepcopy(result.result_data)))
+        return result
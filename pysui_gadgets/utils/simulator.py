@@ -0,0 +1,690 @@
+#    Copyright  Frank V. Castellucci
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+# -*- coding: utf-8 -*-
+
+"""pysui-gadget: in-memory ledger simulator.
+
+Provides a SyncClient that answers the subset of JSON RPC used by the coin gadgets
+(coins, objects, dry-run, inspect and execute) from an in-memory coin ledger, with
+configurable latency and failure injection, so gadgets can be exercised offline::
+
+    python -m pysui_gadgets.utils.simulator -g to-one -c 100000 -m 500
+"""
+
+import base64
+import copy
+import hashlib
+import os
+import random
+import sys
+import threading
+import time
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import base58
+from pysui import SuiConfig, SyncClient, SuiAddress
+from pysui.abstracts.client_keypair import SignatureScheme
+from pysui.sui.sui_builders.base_builder import SuiBaseBuilder, SuiRequestType
+from pysui.sui.sui_clients.common import SuiRpcResult
+from pysui.sui.sui_txresults.single_tx import ProtocolConfig
+from pysui.sui.sui_types import bcs
+
+from pysui_gadgets.utils.cmdlines import simulator_parser
+
+SUI_COIN_TYPE: str = "0x2::sui::SUI"
+
+_DIVIDE_AND_KEEP: str = "0x2::pay::divide_and_keep"
+_DIVIDE_INTO_N: str = "0x2::coin::divide_into_n"
+_VECTOR_REMOVE: str = "0x1::vector::remove"
+_VECTOR_DESTROY_EMPTY: str = "0x1::vector::destroy_empty"
+
+# Normalized signatures for the framework functions the gadgets call
+_COIN_T0: dict = {
+    "Struct": {"address": "0x2", "module": "coin", "name": "Coin", "typeArguments": [{"TypeParameter": 0}]}
+}
+_TX_CONTEXT: dict = {
+    "MutableReference": {"Struct": {"address": "0x2", "module": "tx_context", "name": "TxContext", "typeArguments": []}}
+}
+_FUNCTIONS: dict[str, dict] = {
+    _DIVIDE_AND_KEEP: {"parameters": [{"MutableReference": _COIN_T0}, "U64", _TX_CONTEXT], "return": []},
+    _DIVIDE_INTO_N: {
+        "parameters": [{"MutableReference": _COIN_T0}, "U64", _TX_CONTEXT],
+        "return": [{"Vector": _COIN_T0}],
+    },
+    _VECTOR_REMOVE: {
+        "parameters": [{"MutableReference": {"Vector": {"TypeParameter": 0}}}, "U64"],
+        "return": [{"TypeParameter": 0}],
+    },
+    _VECTOR_DESTROY_EMPTY: {"parameters": [{"Vector": {"TypeParameter": 0}}], "return": []},
+}
+
+_PROTOCOL_ATTRIBUTES: dict = {
+    "max_arguments": {"u32": "512"},
+    "max_input_objects": {"u64": "2048"},
+    "max_num_transferred_move_object_ids": {"u64": "2048"},
+    "max_programmable_tx_commands": {"u32": "1024"},
+    "max_pure_argument_size": {"u32": "16384"},
+    "max_tx_size_bytes": {"u64": "131072"},
+    "max_type_argument_depth": {"u32": "16"},
+    "max_type_arguments": {"u32": "16"},
+    "max_tx_gas": {"u64": "50000000000"},
+}
+
+# Simulated gas schedule in gas units, multiplied by the gas price
+_BASE_COST: int = 1000
+_INPUT_COST: int = 50
+_COMMAND_COST: int = 100
+_STORAGE_COST: int = 988000
+_STORAGE_REBATE: int = 978120
+
+
+class SimulationError(Exception):
+    """Raised when a simulated transaction aborts."""
+
+
+@dataclass
+class SimCoin:
+    """A coin in the simulated ledger."""
+
+    object_id: str
+    version: int
+    digest: str
+    balance: int
+    owner: str
+    coin_type: str = SUI_COIN_TYPE
+    previous_transaction: str = ""
+
+    def reference(self) -> dict:
+        """JSON object reference."""
+        return {"objectId": self.object_id, "version": self.version, "digest": self.digest}
+
+    def as_coin(self) -> dict:
+        """JSON form returned by suix_getCoins."""
+        return {
+            "coinType": self.coin_type,
+            "coinObjectId": self.object_id,
+            "version": str(self.version),
+            "digest": self.digest,
+            "balance": str(self.balance),
+            "previousTransaction": self.previous_transaction,
+        }
+
+    def as_object(self) -> dict:
+        """JSON form returned by sui_getObject."""
+        obj_type = f"0x2::coin::Coin<{self.coin_type}>"
+        return {
+            "objectId": self.object_id,
+            "version": str(self.version),
+            "digest": self.digest,
+            "type": obj_type,
+            "owner": {"AddressOwner": self.owner},
+            "previousTransaction": self.previous_transaction,
+            "storageRebate": str(_STORAGE_COST),
+            "content": {
+                "dataType": "moveObject",
+                "type": obj_type,
+                "hasPublicTransfer": True,
+                "fields": {"balance": str(self.balance), "id": {"id": self.object_id}},
+            },
+        }
+
+
+def _scalar(value: Any) -> Any:
+    """Unwrap pysui scalar parameter types, SuiNullType becomes None."""
+    return getattr(value, "value", value)
+
+
+def _digest(*parts: Any) -> str:
+    """Deterministic base58 digest of parts."""
+    return base58.b58encode(hashlib.sha256("|".join(str(x) for x in parts).encode()).digest()).decode()
+
+
+class CoinLedger:
+    """In-memory coin ledger applying programmable transactions."""
+
+    def __init__(self):
+        """Initialize empty ledger."""
+        self.coins: dict[str, SimCoin] = {}
+        self.transactions: int = 0
+        self._next_id: int = 0x1000
+
+    def _new_id(self) -> str:
+        """Allocate an object id."""
+        self._next_id += 1
+        return f"0x{self._next_id:064x}"
+
+    def mint(self, owner: str, count: int, balance: int, coin_type: str = SUI_COIN_TYPE) -> list[SimCoin]:
+        """Create count coins of balance for owner."""
+        minted = []
+        for _ in range(count):
+            oid = self._new_id()
+            coin = SimCoin(oid, 1, _digest(oid, 1), balance, owner, coin_type, _digest("genesis"))
+            self.coins[oid] = coin
+            minted.append(coin)
+        return minted
+
+    def coins_for(self, owner: str, coin_type: Optional[str] = None) -> list[SimCoin]:
+        """Coins owned by owner, optionally of coin_type, in id order."""
+        return [
+            coin
+            for coin in self.coins.values()
+            if coin.owner == owner and (coin_type is None or coin.coin_type == coin_type)
+        ]
+
+    def _owned(self, oid: str, version: Optional[int], sender: str) -> SimCoin:
+        """Validate an owned object input."""
+        coin = self.coins.get(oid)
+        if coin is None:
+            raise SimulationError(f"Object {oid} does not exist")
+        if coin.owner != sender:
+            raise SimulationError(f"Object {oid} is not owned by {sender}")
+        if version is not None and coin.version != version:
+            raise SimulationError(
+                f"Object {oid} version {version} is not available for consumption, current version: {coin.version}"
+            )
+        return coin
+
+    # pylint: disable=too-many-locals,too-many-branches,too-many-statements
+    def run(
+        self,
+        kind: bcs.TransactionKind,
+        sender: str,
+        payment: list[bcs.ObjectReference],
+        budget: int,
+        gas_price: int,
+        commit: bool,
+    ) -> dict:
+        """Run a programmable transaction and return JSON effects.
+
+        :param kind: The transaction kind
+        :type kind: bcs.TransactionKind
+        :param sender: The transaction sender address
+        :type sender: str
+        :param payment: Gas payment references, empty for dry-run and inspection
+        :type payment: list[bcs.ObjectReference]
+        :param budget: The gas budget, 0 for unbounded
+        :type budget: int
+        :param gas_price: The gas price
+        :type gas_price: int
+        :param commit: Apply changes to the ledger
+        :type commit: bool
+        :raises SimulationError: If inputs are not valid for consumption
+        :return: Effects in JSON form
+        :rtype: dict
+        """
+        ptx: bcs.ProgrammableTransaction = kind.value
+        # Working copies of every object touched
+        work: dict[str, SimCoin] = {}
+        deleted: list[str] = []
+        created: list[str] = []
+
+        def _touch(coin: SimCoin) -> SimCoin:
+            if coin.object_id not in work:
+                work[coin.object_id] = copy.copy(coin)
+            return work[coin.object_id]
+
+        # Gas payment, smashing multiple payment coins into the first
+        gas: Optional[SimCoin] = None
+        for index, ref in enumerate(payment):
+            coin = _touch(self._owned(ref.ObjectID.to_address_str(), ref.SequenceNumber, sender))
+            if index == 0:
+                gas = coin
+            else:
+                gas.balance += coin.balance
+                deleted.append(coin.object_id)
+        if gas is None:
+            gas = SimCoin("0x" + "0" * 64, 0, _digest("gas"), budget or 2**63, sender)
+
+        inputs: list = []
+        for call_arg in ptx.Inputs:
+            if call_arg.enum_name == "Pure":
+                inputs.append(bytes(call_arg.value))
+            else:
+                ref = call_arg.value.value
+                inputs.append(_touch(self._owned(ref.ObjectID.to_address_str(), ref.SequenceNumber, sender)))
+
+        results: list[list] = []
+
+        def _arg(arg: bcs.Argument) -> Any:
+            match arg.enum_name:
+                case "GasCoin":
+                    return gas
+                case "Input":
+                    return inputs[arg.value]
+                case "Result":
+                    value = results[arg.value]
+                    return value[0] if len(value) == 1 else value
+                case "NestedResult":
+                    return results[arg.value[0]][arg.value[1]]
+            raise SimulationError(f"Unknown argument {arg.enum_name}")
+
+        def _split(coin: SimCoin, amount: int) -> SimCoin:
+            if coin.balance < amount:
+                raise SimulationError(f"Insufficient balance in {coin.object_id} to split {amount}")
+            coin.balance -= amount
+            oid = self._new_id()
+            new_coin = SimCoin(oid, 0, "", amount, sender, coin.coin_type)
+            work[oid] = new_coin
+            created.append(oid)
+            return new_coin
+
+        status: dict = {"status": "success"}
+        try:
+            for command in ptx.Command:
+                cmd = command.value
+                match command.enum_name:
+                    case "MergeCoins":
+                        to_coin: SimCoin = _arg(cmd.ToCoin)
+                        for from_arg in cmd.FromCoins:
+                            from_coin: SimCoin = _arg(from_arg)
+                            if from_coin is to_coin or from_coin.coin_type != to_coin.coin_type:
+                                raise SimulationError(f"Can not merge {from_coin.object_id}")
+                            to_coin.balance += from_coin.balance
+                            from_coin.balance = 0
+                            deleted.append(from_coin.object_id)
+                        results.append([])
+                    case "SplitCoin":
+                        from_coin = _arg(cmd.FromCoin)
+                        amounts = [int.from_bytes(_arg(x), "little") for x in cmd.Amount]
+                        results.append([_split(from_coin, amount) for amount in amounts])
+                    case "TransferObjects":
+                        recipient = "0x" + _arg(cmd.Address).hex()
+                        for obj_arg in cmd.Objects:
+                            _arg(obj_arg).owner = recipient
+                        results.append([])
+                    case "MoveCall":
+                        target = f"0x{cmd.Package.to_str().lstrip('0') or '0'}::{cmd.Module}::{cmd.Function}"
+                        args = [_arg(x) for x in cmd.Arguments]
+                        match target:
+                            case "0x2::pay::divide_and_keep" | "0x2::coin::divide_into_n":
+                                coin, count = args[0], int.from_bytes(args[1], "little")
+                                if count < 1:
+                                    raise SimulationError("Divide by zero")
+                                part = coin.balance // count
+                                parts = [_split(coin, part) for _ in range(count - 1)]
+                                results.append([] if target == _DIVIDE_AND_KEEP else [parts])
+                            case "0x1::vector::remove":
+                                results.append([args[0].pop(int.from_bytes(args[1], "little"))])
+                            case "0x1::vector::destroy_empty":
+                                if args[0]:
+                                    raise SimulationError("Vector not empty")
+                                results.append([])
+                            case _:
+                                raise SimulationError(f"Simulator does not support {target}")
+                    case _:
+                        raise SimulationError(f"Simulator does not support {command.enum_name}")
+        except (SimulationError, IndexError, AttributeError, TypeError) as sexc:
+            status = {"status": "failure", "error": str(sexc)}
+
+        # Charge gas
+        computation = gas_price * (_BASE_COST + _INPUT_COST * len(ptx.Inputs) + _COMMAND_COST * len(ptx.Command))
+        storage = _STORAGE_COST * (len(created) + 1 if status["status"] == "success" else 1)
+        rebate = _STORAGE_REBATE * (len(deleted) + 1 if status["status"] == "success" else 1)
+        if budget and computation + storage > budget:
+            status = {"status": "failure", "error": "InsufficientGas"}
+        if status["status"] != "success":
+            # Discard everything but the gas charge
+            work = {gas.object_id: gas} if payment else {}
+            created, deleted = [], []
+            gas.balance = self.coins[gas.object_id].balance if payment else gas.balance
+        gas.balance = max(0, gas.balance - min(gas.balance, computation + storage - rebate))
+
+        # Lamport version and new digests for all changed objects
+        self.transactions += commit
+        tx_digest = _digest("tx", self.transactions, sender, len(work), time.perf_counter_ns())
+        lamport = max([x.version for x in work.values()] + [0]) + 1
+
+        def owner_ref(coin: SimCoin) -> dict:
+            return {"owner": {"AddressOwner": coin.owner}, "reference": coin.reference()}
+
+        mutated, created_refs, deleted_refs = [], [], []
+        for oid, coin in work.items():
+            coin.version = lamport
+            coin.digest = _digest(oid, lamport)
+            coin.previous_transaction = tx_digest
+            if oid in deleted:
+                deleted_refs.append({"objectId": oid, "version": lamport, "digest": _digest("deleted")})
+            elif oid in created:
+                created_refs.append(owner_ref(coin))
+            else:
+                mutated.append(owner_ref(coin))
+        if commit:
+            for oid, coin in work.items():
+                if oid in deleted:
+                    self.coins.pop(oid, None)
+                else:
+                    self.coins[oid] = coin
+        return {
+            "messageVersion": "v1",
+            "status": status,
+            "executedEpoch": "0",
+            "gasUsed": {
+                "computationCost": str(computation),
+                "storageCost": str(storage),
+                "storageRebate": str(rebate),
+                "nonRefundableStorageFee": "0",
+            },
+            "transactionDigest": tx_digest,
+            "gasObject": owner_ref(gas),
+            "mutated": mutated,
+            "created": created_refs,
+            "deleted": deleted_refs,
+            "dependencies": [],
+        }
+
+    # pylint: enable=too-many-locals,too-many-branches,too-many-statements
+
+
+class SimulatedClient(SyncClient):
+    """SyncClient whose RPC calls are answered by a CoinLedger."""
+
+    def __init__(
+        self,
+        config: SuiConfig,
+        ledger: Optional[CoinLedger] = None,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        gas_price: int = 1000,
+        seed: Optional[int] = None,
+    ):
+        """Initialize simulated client.
+
+        :param config: Configuration holding the keypairs of simulated addresses
+        :type config: SuiConfig
+        :param ledger: The coin ledger, defaults to empty ledger
+        :type ledger: Optional[CoinLedger], optional
+        :param latency: Seconds added to every RPC call, defaults to 0.0
+        :type latency: float, optional
+        :param jitter: Maximum random seconds added to latency, defaults to 0.0
+        :type jitter: float, optional
+        :param failure_rate: Probability of a transaction execution failing, defaults to 0.0
+        :type failure_rate: float, optional
+        :param gas_price: Reference gas price, defaults to 1000
+        :type gas_price: int, optional
+        :param seed: Random seed for jitter and failures, defaults to None
+        :type seed: Optional[int], optional
+        """
+        self.ledger = ledger or CoinLedger()
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.calls: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._simulated_gas_price = gas_price
+        super().__init__(config, SuiRequestType.WAITFORLOCALEXECUTION)
+
+    def _fetch_common_descriptors(self) -> None:
+        """Answer the descriptors SyncClient fetches on initialization from the simulation."""
+        self._gas_price = self._simulated_gas_price
+        self._rpc_version = self._RPC_REQUIRED_VERSION
+        self._protocol = ProtocolConfig.loader(
+            {
+                "maxSupportedProtocolVersion": "1",
+                "minSupportedProtocolVersion": "1",
+                "protocolVersion": "1",
+                "featureFlags": {},
+                "attributes": copy.deepcopy(_PROTOCOL_ATTRIBUTES),
+            }
+        )
+
+
+    def close(self) -> None:
+        """Nothing to close."""
+        self._transport_open = False
+
+    def _coin_page(self, coins: list[SimCoin], cursor: Any, limit: Any) -> dict:
+        """Paginate coins as the fullnode does."""
+        limit = int(_scalar(limit) or self.max_gets)
+        start = 0
+        cursor = _scalar(cursor)
+        if cursor:
+            cursor = str(cursor)
+            ids = [x.object_id for x in coins]
+            start = ids.index(cursor) + 1 if cursor in ids else len(ids)
+        page = coins[start : start + limit]
+        has_next = start + limit < len(coins)
+        return {
+            "data": [x.as_coin() for x in page],
+            "nextCursor": page[-1].object_id if has_next and page else None,
+            "hasNextPage": has_next,
+        }
+
+    def _object(self, object_id: Any) -> dict:
+        """JSON sui_getObject result."""
+        oid = str(_scalar(object_id))
+        coin = self.ledger.coins.get(oid)
+        if coin:
+            return {"data": coin.as_object()}
+        return {"error": {"code": "notExists", "object_id": oid}}
+
+    def _transaction(self, tx_bytes: Any, commit: bool) -> dict:
+        """Run serialized TransactionData."""
+        tx_data: bcs.TransactionData = bcs.TransactionData.deserialize(
+            base64.b64decode(str(_scalar(tx_bytes)))
+        )
+        tx_v1: bcs.TransactionDataV1 = tx_data.value
+        gas_data: bcs.GasData = tx_v1.GasData
+        return self.ledger.run(
+            tx_v1.TransactionKind,
+            tx_v1.Sender.to_address_str(),
+            gas_data.Payment,
+            gas_data.Budget if commit else 0,
+            gas_data.Price,
+            commit,
+        )
+
+    def _route(self, builder: SuiBaseBuilder) -> Any:
+        """Produce the JSON RPC result for builder."""
+        params = vars(builder)
+        match builder.method:
+            case "suix_getBalance" | "suix_getCoins" | "suix_getAllCoins":
+                owner = str(getattr(params["owner"], "address", params["owner"]))
+                coin_type = _scalar(params.get("coin_type")) or None
+                coins = self.ledger.coins_for(owner, coin_type)
+                if builder.method == "suix_getBalance":
+                    return {
+                        "coinType": coin_type,
+                        "coinObjectCount": len(coins),
+                        "totalBalance": str(sum(x.balance for x in coins)),
+                        "lockedBalance": {},
+                    }
+                return self._coin_page(coins, params.get("cursor"), params.get("limit"))
+            case "suix_getAllBalances":
+                owner = str(getattr(params["owner"], "address", params["owner"]))
+                balances: dict[str, list[SimCoin]] = {}
+                for coin in self.ledger.coins_for(owner):
+                    balances.setdefault(coin.coin_type, []).append(coin)
+                return [
+                    {
+                        "coinType": coin_type,
+                        "coinObjectCount": len(coins),
+                        "totalBalance": str(sum(x.balance for x in coins)),
+                        "lockedBalance": {},
+                    }
+                    for coin_type, coins in balances.items()
+                ]
+            case "sui_getObject":
+                return self._object(params["object_id"])
+            case "sui_multiGetObjects":
+                return [self._object(x) for x in getattr(params["object_ids"], "array", params["object_ids"])]
+            case "sui_getNormalizedMoveFunction":
+                target = f"{params['package']}::{params['module_name']}::{params['function_name']}"
+                if target not in _FUNCTIONS:
+                    raise SimulationError(f"Simulator does not support {target}")
+                return {"visibility": "Public", "isEntry": False, "typeParameters": [{"abilities": []}]} | _FUNCTIONS[
+                    target
+                ]
+            case "sui_dryRunTransactionBlock":
+                effects = self._transaction(params["tx_bytes"], False)
+                return {"effects": effects, "events": [], "input": {}, "objectChanges": [], "balanceChanges": []}
+            case "sui_executeTransactionBlock":
+                effects = self._transaction(params["tx_bytes"], True)
+                return {
+                    "digest": effects["transactionDigest"],
+                    "effects": effects,
+                    "objectChanges": [],
+                    "balanceChanges": [],
+                    "confirmedLocalExecution": True,
+                }
+            case "sui_devInspectTransactionBlock":
+                kind = bcs.TransactionKind.deserialize(
+                    base64.b64decode(str(_scalar(params["tx_bytes"])))
+                )
+                sender = str(getattr(params["sender_address"], "address", params["sender_address"]))
+                effects = self.ledger.run(kind, sender, [], 0, self._gas_price, False)
+                return {"effects": effects, "events": [], "results": []}
+        raise SimulationError(f"Simulator does not support {builder.method}")
+
+    def _execute(self, builder: SuiBaseBuilder) -> SuiRpcResult:
+        """Answer builder from the ledger after simulated latency and failures."""
+        with self._lock:
+            self.calls[builder.method] = self.calls.get(builder.method, 0) + 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = (
+                builder.method == "sui_executeTransactionBlock"
+                and self.failure_rate
+                and self._random.random() < self.failure_rate
+            )
+        if delay:
+            time.sleep(delay)
+        if fail:
+            return SuiRpcResult(False, f"Simulated failure on {builder.method}", None)
+        try:
+            with self._lock:
+                result = self._route(builder)
+            return SuiRpcResult(True, None, {"jsonrpc": "2.0", "result": result})
+        except SimulationError as serr:
+            return SuiRpcResult(True, None, {"jsonrpc": "2.0", "error": {"code": -32002, "message": str(serr)}})
+
+
+def simulated_client(
+    address_count: int = 1,
+    coin_count: int = 0,
+    coin_balance: int = 1_000_000_000,
+    **kwargs,
+) -> tuple[SimulatedClient, list[SuiAddress]]:
+    """Create a simulated client with fresh addresses, the first funded with coin_count coins.
+
+    :param address_count: Number of addresses with keypairs, defaults to 1
+    :type address_count: int, optional
+    :param coin_count: Number of SUI coins minted to the first address, defaults to 0
+    :type coin_count: int, optional
+    :param coin_balance: Balance of each minted coin, defaults to 1_000_000_000
+    :type coin_balance: int, optional
+    :return: The client and the addresses of the configuration
+    :rtype: tuple[SimulatedClient, list[SuiAddress]]
+    """
+    cfg = SuiConfig.user_config(rpc_url="http://simulator")
+    addresses = [
+        cfg.create_new_keypair_and_address(scheme=SignatureScheme.ED25519, make_active=index == 0)[1]
+        for index in range(address_count)
+    ]
+    client = SimulatedClient(cfg, **kwargs)
+    client.ledger.mint(addresses[0].address, coin_count, coin_balance)
+    return client, addresses
+
+
+def pooled_transactions(client: SyncClient, owner: SuiAddress, count: int, workers: int) -> int:
+    """Submit count split and transfer to self transactions from worker threads, each paying with a leased gas coin.
+
+    :param client: The client
+    :type client: SyncClient
+    :param owner: Address sending the transactions
+    :type owner: SuiAddress
+    :param count: Number of transactions
+    :type count: int
+    :param workers: Number of threads and of gas coins in the pool
+    :type workers: int
+    :return: Number of transactions that succeeded
+    :rtype: int
+    """
+    # pylint: disable=import-outside-toplevel
+    from pysui.sui.sui_txn import SyncTransaction
+    from pysui_gadgets.utils.gas_pool import GasPool
+
+    pool = GasPool(client, owner, size=workers)
+
+    def _submit(_index: int) -> bool:
+        with pool.lease() as gas:
+            txn = SyncTransaction(client=client, initial_sender=owner)
+            txn.transfer_objects(transfers=[txn.split_coin(coin=txn.gas, amounts=[1000])], recipient=owner)
+            result = txn.execute(use_gas_object=gas.object_id)
+            pool.settle(gas, result)
+            return result.is_ok() and result.result_data.succeeded
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return sum(executor.map(_submit, range(count)))
+
+
+def main():
+    """Run a gadget against the simulator and report timings."""
+    # pylint: disable=import-outside-toplevel
+    from pysui_gadgets.to_one.to_one import join_coins
+    from pysui_gadgets.splay import splay
+
+    parsed = simulator_parser(sys.argv[1:])
+    client, addresses = simulated_client(
+        address_count=parsed.addresses,
+        coin_count=parsed.coins,
+        latency=parsed.latency,
+        jitter=parsed.jitter,
+        failure_rate=parsed.failure_rate,
+        seed=parsed.seed,
+    )
+    owner = addresses[0]
+    start = time.perf_counter()
+    if parsed.gadget == "to-one":
+        join_coins(
+            client,
+            Namespace(
+                address=owner,
+                primary=None,
+                merge_threshold=parsed.threshold,
+                adaptive=parsed.adaptive,
+                all_types=False,
+                bulk=parsed.bulk,
+                workers=parsed.workers,
+            ),
+        )
+    elif parsed.gadget == "pool":
+        succeeded = pooled_transactions(client, owner, parsed.transactions, parsed.workers or os.cpu_count() or 1)
+        print(f"{succeeded} of {parsed.transactions} pooled transactions succeeded")
+    else:
+        controller = None
+        if parsed.adaptive:
+            controller = splay.ChunkController(parsed.threshold, maximum=splay.merge_ceiling(client))
+        splay.splay_coins(
+            client,
+            owner,
+            None,
+            parsed.threshold,
+            0,
+            addresses[1:],
+            controller=controller,
+            signer=splay.BulkSigner(client.config, owner, parsed.workers) if parsed.bulk else None,
+            template=splay.MergeTemplate(client, owner),
+        )
+    elapsed = time.perf_counter() - start
+    print(f"{parsed.gadget} over {parsed.coins} coins: {client.ledger.transactions} transactions in {elapsed:.3f}s")
+    for owner_addr in addresses:
+        print(f"{owner_addr.address} holds {len(client.ledger.coins_for(owner_addr.address))} coins")
+    print(f"RPC calls: {client.calls}")
+
+
+if __name__ == "__main__":
+    main()
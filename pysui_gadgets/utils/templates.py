@@ -0,0 +1,233 @@
+#    Copyright  Frank V. Castellucci
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#        http://www.apache.org/licenses/LICENSE-2.0
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+# -*- coding: utf-8 -*-
+
+"""pysui-gadget: programmable transaction templates.
+
+A merge chunk is always the same programmable transaction, a MergeCoins of its
+inputs into the gas coin, or into the first input of each coin type group. The
+template serializes that skeleton once per chunk shape and splices in only the
+input object references for each chunk.
+"""
+
+import base64
+from typing import Any, Optional, Union
+
+import canoser
+from pysui import SuiAddress, SuiRpcResult, SyncClient
+from pysui.sui.sui_builders.base_builder import SuiRequestType
+from pysui.sui.sui_builders.exec_builders import DryRunTransaction, ExecuteTransaction
+from pysui.sui.sui_txresults.common import GenericRef
+from pysui.sui.sui_txresults.complex_tx import DryRunTxResult, Effects
+from pysui.sui.sui_txresults.single_tx import ObjectRead, SuiCoinObject
+from pysui.sui.sui_types import bcs
+from pysui.sui.sui_types.collections import SuiArray
+
+# Enum variant tags of the fixed parts
+_TX_DATA_V1: bytes = b"\x00"
+_PROGRAMMABLE_TX: bytes = b"\x00"
+_IMM_OR_OWNED_OBJECT: bytes = b"\x01\x00"
+_NO_EXPIRATION: bytes = b"\x00"
+
+
+def _uleb128(value: int) -> bytes:
+    """BCS vector length prefix."""
+    return canoser.Uint32.serialize_uint32_as_uleb128(value)
+
+
+def object_reference(coin: Union[SuiCoinObject, ObjectRead, GenericRef]) -> bcs.ObjectReference:
+    """BCS reference of a fetched coin, object or effects reference."""
+    return bcs.ObjectReference(
+        bcs.Address.from_str(coin.object_id), int(coin.version), bcs.Digest.from_str(coin.digest)
+    )
+
+
+class MergeTemplate:
+    """Merge-to-gas transaction serialized from cached fixed parts."""
+
+    def __init__(self, client: SyncClient, sender: SuiAddress):
+        """Initialize template.
+
+        :param client: The client used to resolve, dry-run and execute
+        :type client: SyncClient
+        :param sender: The sender and owner of the coins
+        :type sender: SuiAddress
+        """
+        self.client = client
+        self.sender = sender
+        self._sender = bcs.Address.from_str(sender.address).serialize()
+        self._commands: dict[tuple, bytes] = {}
+        self._gas_id: Optional[str] = None
+        self._gas: Optional[bcs.ObjectReference] = None
+
+    def _command(self, shape: tuple[tuple[bool, int], ...]) -> bytes:
+        """Serialized command vector for groups of (merge to gas, coin count), cached by shape."""
+        if shape not in self._commands:
+            commands = []
+            index = 0
+            for to_gas, count in shape:
+                if to_gas:
+                    merge_to = bcs.Argument("GasCoin")
+                else:
+                    merge_to = bcs.Argument("Input", index)
+                    index += 1
+                merge_from = [bcs.Argument("Input", x) for x in range(index, index + count)]
+                index += count
+                commands.append(bcs.Command("MergeCoins", bcs.MergeCoins(merge_to, merge_from)).serialize())
+            self._commands[shape] = _uleb128(len(commands)) + b"".join(commands)
+        return self._commands[shape]
+
+    def _references(self, coins: list) -> list[bcs.ObjectReference]:
+        """References for coins, fetching any given only by object id."""
+        unresolved = [x for x in coins if not hasattr(x, "digest")]
+        fetched: dict[str, ObjectRead] = {}
+        if unresolved:
+            result = self.client.get_objects_for([str(x) for x in unresolved])
+            if not result.is_ok():
+                raise ValueError(f"Unable to resolve coins: {result.result_string}")
+            fetched = {x.object_id: x for x in result.result_data if isinstance(x, ObjectRead)}
+            missing = [str(x) for x in unresolved if str(x) not in fetched]
+            if missing:
+                raise ValueError(f"Unable to resolve coins: {missing}")
+        return [object_reference(fetched[str(x)] if str(x) in fetched else x) for x in coins]
+
+    def kind_bytes(self, coins: list) -> bytes:
+        """Serialized TransactionKind merging coins to the gas coin.
+
+        :param coins: Coins with object references, or object ids to fetch
+        :type coins: list
+        :return: BCS TransactionKind
+        :rtype: bytes
+        """
+        return self.group_kind_bytes([(None, coins)])
+
+    def group_kind_bytes(self, groups: list[tuple[Optional[Any], list]]) -> bytes:
+        """Serialized TransactionKind with one MergeCoins per group.
+
+        :param groups: Pairs of the coin to merge to, None for the gas coin, and the coins to merge
+        :type groups: list[tuple[Optional[Any], list]]
+        :return: BCS TransactionKind
+        :rtype: bytes
+        """
+        objects = []
+        for merge_to, coins in groups:
+            if merge_to is not None:
+                objects.append(merge_to)
+            objects.extend(coins)
+        inputs = b"".join(_IMM_OR_OWNED_OBJECT + x.serialize() for x in self._references(objects))
+        shape = tuple((merge_to is None, len(coins)) for merge_to, coins in groups)
+        return _PROGRAMMABLE_TX + _uleb128(len(objects)) + inputs + self._command(shape)
+
+    def transaction_bytes(self, kind: bytes, gas: Optional[bcs.ObjectReference], budget: int) -> bytes:
+        """Serialized TransactionData for a kind paying with gas.
+
+        :param kind: BCS TransactionKind from kind_bytes
+        :type kind: bytes
+        :param gas: Gas payment reference, None for dry-run
+        :type gas: Optional[bcs.ObjectReference]
+        :param budget: The gas budget
+        :type budget: int
+        :return: BCS TransactionData
+        :rtype: bytes
+        """
+        payment = _uleb128(1) + gas.serialize() if gas else _uleb128(0)
+        return (
+            _TX_DATA_V1
+            + kind
+            + self._sender
+            + payment
+            + self._sender
+            + int(self.client.current_gas_price).to_bytes(8, "little")
+            + int(budget).to_bytes(8, "little")
+            + _NO_EXPIRATION
+        )
+
+    def budget(self, kind: bytes) -> int:
+        """Gas budget from a dry-run of a kind.
+
+        :param kind: BCS TransactionKind from kind_bytes
+        :type kind: bytes
+        :raises ValueError: If the dry-run fails
+        :return: Total gas used by the dry-run
+        :rtype: int
+        """
+        max_gas = self.client.protocol.transaction_constraints.max_tx_gas
+        result = self.client.execute(
+            DryRunTransaction(tx_bytes=base64.b64encode(self.transaction_bytes(kind, None, max_gas)).decode())
+        )
+        if not result.is_ok() or not isinstance(result.result_data, DryRunTxResult):
+            raise ValueError(f"Dry run failed, can't establish budget for transaction: {result.result_string}")
+        return result.result_data.effects.gas_used.total
+
+    def _gas_reference(self, gas_id: str) -> bcs.ObjectReference:
+        """Gas reference, from the previous execution's effects when paying with the same coin."""
+        if self._gas_id != gas_id or self._gas is None:
+            result = self.client.get_object(gas_id)
+            if not result.is_ok():
+                raise ValueError(f"Unable to fetch gas object {gas_id} error {result.result_string}")
+            self._gas_id = gas_id
+            self._gas = object_reference(result.result_data)
+        return self._gas
+
+    def execute(self, coins: list, gas_id: str) -> SuiRpcResult:
+        """Merge coins to gas_id, paying with gas_id.
+
+        :param coins: Coins with object references, or object ids to fetch
+        :type coins: list
+        :param gas_id: The coin merged to and paying for the transaction
+        :type gas_id: str
+        :raises ValueError: If the dry-run fails or the gas object can not be fetched
+        :return: The result of executing the transaction
+        :rtype: SuiRpcResult
+        """
+        return self.execute_kind(self.kind_bytes(coins), gas_id)
+
+    def execute_groups(self, groups: list[tuple[Optional[Any], list]], gas_id: str) -> SuiRpcResult:
+        """Merge each group in one transaction paying with gas_id.
+
+        :param groups: Pairs of the coin to merge to, None for the gas coin, and the coins to merge
+        :type groups: list[tuple[Optional[Any], list]]
+        :param gas_id: The coin paying for the transaction
+        :type gas_id: str
+        :raises ValueError: If the dry-run fails or the gas object can not be fetched
+        :return: The result of executing the transaction
+        :rtype: SuiRpcResult
+        """
+        return self.execute_kind(self.group_kind_bytes(groups), gas_id)
+
+    def execute_kind(self, kind: bytes, gas_id: str) -> SuiRpcResult:
+        """Dry-run for budget, sign and execute a kind paying with gas_id.
+
+        :param kind: BCS TransactionKind
+        :type kind: bytes
+        :param gas_id: The coin paying for the transaction
+        :type gas_id: str
+        :raises ValueError: If the dry-run fails or the gas object can not be fetched
+        :return: The result of executing the transaction
+        :rtype: SuiRpcResult
+        """
+        budget = self.budget(kind)
+        tx_b64 = base64.b64encode(self.transaction_bytes(kind, self._gas_reference(gas_id), budget)).decode()
+        signature = self.client.config.keypair_for_address(self.sender).new_sign_secure(tx_b64)
+        result = self.client.execute(
+            ExecuteTransaction(
+                tx_bytes=tx_b64,
+                signatures=SuiArray([signature]),
+                request_type=SuiRequestType.WAITFORLOCALEXECUTION,
+            )
+        )
+        effects = getattr(result.result_data, "effects", None) if result.is_ok() else None
+        if isinstance(effects, Effects) and effects.gas_object.reference.object_id == gas_id:
+            self._gas = object_reference(effects.gas_object.reference)
+        else:
+            self._gas = None
+        return result